@@ -0,0 +1,42 @@
+"""resume search indexes
+
+Revision ID: 09a36b45cd40
+Revises: fcdc42fc37ad
+Create Date: 2026-10-18 11:24:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '09a36b45cd40'
+down_revision: Union[str, Sequence[str], None] = 'fcdc42fc37ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE resumes ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(content, '')), 'B')"
+        ") STORED"
+    )
+    op.create_index(
+        'ix_resumes_title_trgm', 'resumes', ['title'],
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.create_index('ix_resumes_search_vector', 'resumes', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resumes_search_vector', table_name='resumes')
+    op.drop_index('ix_resumes_title_trgm', table_name='resumes')
+    op.drop_column('resumes', 'search_vector')
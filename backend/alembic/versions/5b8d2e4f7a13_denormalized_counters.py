@@ -0,0 +1,38 @@
+"""denormalized counters
+
+Revision ID: 5b8d2e4f7a13
+Revises: 3e1f0b7c9a42
+Create Date: 2026-10-18 15:02:44.391870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8d2e4f7a13'
+down_revision: Union[str, Sequence[str], None] = '3e1f0b7c9a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('resume_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('resumes', sa.Column('revision_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    # backfill; writes racing the migration are caught by `manage.py reconcile-counters`
+    op.execute(
+        "UPDATE users SET resume_count = (SELECT count(*) FROM resumes WHERE resumes.user_id = users.id)"
+    )
+    op.execute(
+        "UPDATE resumes SET revision_count = "
+        "(SELECT count(*) FROM resume_revisions WHERE resume_revisions.resume_id = resumes.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resumes', 'revision_count')
+    op.drop_column('users', 'resume_count')
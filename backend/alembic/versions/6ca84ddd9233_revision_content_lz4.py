@@ -0,0 +1,29 @@
+"""revision content lz4
+
+Revision ID: 6ca84ddd9233
+Revises: ff7eea1eea96
+Create Date: 2026-10-18 15:48:12.603387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6ca84ddd9233'
+down_revision: Union[str, Sequence[str], None] = 'ff7eea1eea96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # plain snapshots from the single-statement write path stay compressed until compacted
+    op.execute("ALTER TABLE resume_revisions ALTER COLUMN content SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE resume_revisions ALTER COLUMN content SET COMPRESSION default")
@@ -0,0 +1,30 @@
+"""revision content length
+
+Revision ID: 8c4a6f1d2e90
+Revises: 5b8d2e4f7a13
+Create Date: 2026-10-18 15:40:18.027316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4a6f1d2e90'
+down_revision: Union[str, Sequence[str], None] = '5b8d2e4f7a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_revisions', sa.Column('content_length', sa.Integer(), nullable=True))
+    # encoded rows stay NULL; the history metadata view decodes those on demand
+    op.execute("UPDATE resume_revisions SET content_length = length(content) WHERE content IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resume_revisions', 'content_length')
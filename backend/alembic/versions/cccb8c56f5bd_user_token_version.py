@@ -0,0 +1,28 @@
+"""user token version
+
+Revision ID: cccb8c56f5bd
+Revises: 09a36b45cd40
+Create Date: 2026-10-18 12:41:05.220931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cccb8c56f5bd'
+down_revision: Union[str, Sequence[str], None] = '09a36b45cd40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
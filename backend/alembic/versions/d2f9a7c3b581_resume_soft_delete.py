@@ -0,0 +1,42 @@
+"""resume soft delete
+
+Revision ID: d2f9a7c3b581
+Revises: 8c4a6f1d2e90
+Create Date: 2026-10-18 16:12:37.604128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f9a7c3b581'
+down_revision: Union[str, Sequence[str], None] = '8c4a6f1d2e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resumes', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # every read filters on deleted_at IS NULL; the full (user_id, id) index is replaced by a live-only one
+    op.create_index(
+        'ix_resumes_user_id_id_live', 'resumes', ['user_id', 'id'],
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.drop_index('ix_resumes_user_id_id', table_name='resumes')
+    op.create_index(
+        'ix_resumes_deleted_at', 'resumes', ['deleted_at'],
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM resumes WHERE deleted_at IS NOT NULL")
+    op.drop_index('ix_resumes_deleted_at', table_name='resumes')
+    op.create_index('ix_resumes_user_id_id', 'resumes', ['user_id', 'id'], unique=False)
+    op.drop_index('ix_resumes_user_id_id_live', table_name='resumes')
+    op.drop_column('resumes', 'deleted_at')
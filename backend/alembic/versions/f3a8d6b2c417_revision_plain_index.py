@@ -0,0 +1,32 @@
+"""revision plain index
+
+Revision ID: f3a8d6b2c417
+Revises: e7b3c1a9f046
+Create Date: 2026-10-19 10:22:05.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d6b2c417'
+down_revision: Union[str, Sequence[str], None] = 'e7b3c1a9f046'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the background compactor's work queue; rows leave it once encoded
+    op.create_index(
+        'ix_resume_revisions_plain', 'resume_revisions', ['resume_id', 'version'],
+        postgresql_where=sa.text("storage = 'plain'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resume_revisions_plain', table_name='resume_revisions')
@@ -0,0 +1,29 @@
+"""resume keyset indexes
+
+Revision ID: fcdc42fc37ad
+Revises: b15099d12d5b
+Create Date: 2026-10-18 10:02:11.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fcdc42fc37ad'
+down_revision: Union[str, Sequence[str], None] = 'b15099d12d5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (resume_id, version) seeks are served by uq_resume_revisions_resume_id_version
+    op.create_index('ix_resumes_user_id_id', 'resumes', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resumes_user_id_id', table_name='resumes')
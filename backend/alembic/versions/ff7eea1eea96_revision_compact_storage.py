@@ -0,0 +1,36 @@
+"""revision compact storage
+
+Revision ID: ff7eea1eea96
+Revises: cccb8c56f5bd
+Create Date: 2026-10-18 14:32:50.117406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ff7eea1eea96'
+down_revision: Union[str, Sequence[str], None] = 'cccb8c56f5bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_revisions', sa.Column('storage', sa.String(length=8), server_default=sa.text("'plain'"), nullable=False))
+    op.add_column('resume_revisions', sa.Column('base_version', sa.Integer(), nullable=True))
+    op.add_column('resume_revisions', sa.Column('payload', sa.LargeBinary(), nullable=True))
+    op.alter_column('resume_revisions', 'content', existing_type=sa.Text(), nullable=True)
+    # existing rows stay "plain"; convert them with `python manage.py compact-revisions`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # fails once rows have been encoded: their content column is NULL
+    op.alter_column('resume_revisions', 'content', existing_type=sa.Text(), nullable=False)
+    op.drop_column('resume_revisions', 'payload')
+    op.drop_column('resume_revisions', 'base_version')
+    op.drop_column('resume_revisions', 'storage')
@@ -0,0 +1,306 @@
+"""Admission control in front of the database-backed routes.
+
+Every request to the resume and jobs routers passes `admit` (a router-level
+dependency, so it resolves before the handler opens a session) and is:
+
+1. charged against the caller's token bucket (RATE_LIMIT_PER_SECOND, burst
+   RATE_LIMIT_BURST); an empty bucket is answered 429 with Retry-After;
+2. admitted through its route's gate when ADMISSION_ROUTE_LIMITS caps it;
+3. admitted through the worker-wide gate of ADMISSION_CAPACITY slots, sized
+   like the DB pool. Expensive requests (improve, history, search,
+   import/export) additionally hold a slot of the expensive gate, so they can
+   never take more than ADMISSION_EXPENSIVE_SHARE of the capacity, wait less
+   and are woken after cheap ones.
+
+A gate that stays full for the class's wait is answered 503 with Retry-After
+instead of queueing on the pool; a pool checkout that still times out
+(DB_POOL_TIMEOUT_SECONDS) gets the same answer from pool_timeout_handler.
+All state is per worker process.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import AsyncGenerator, AsyncIterator
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.types import Receive, Scope, Send
+
+from app.config import (
+    ADMISSION_CAPACITY, ADMISSION_ENABLED, ADMISSION_EXPENSIVE_SHARE, ADMISSION_EXPENSIVE_WAIT_SECONDS,
+    ADMISSION_RETRY_AFTER_SECONDS, ADMISSION_ROUTE_LIMITS, ADMISSION_WAIT_SECONDS,
+    RATE_LIMIT_BURST, RATE_LIMIT_PER_SECOND,
+)
+from app.metrics import admission_in_flight, admission_rejected, admission_wait
+from app.utils.cache import TTLCache
+from app.utils.current import Principal, get_principal
+
+logger = logging.getLogger(__name__)
+
+CHEAP, EXPENSIVE = 0, 1
+PRIORITY_NAMES = ("cheap", "expensive")
+
+# (method, route template) of the requests that hold a connection for long or scan a lot
+EXPENSIVE_ROUTES = frozenset({
+    ("POST", "/resume/{resume_id}/improve"),
+    ("GET", "/resume/{resume_id}/history"),
+    ("GET", "/resume/{resume_id}/history/{version}"),
+    ("GET", "/resume/export"),
+    ("POST", "/resume/import"),
+})
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Gate:
+    """Counting semaphore with a bounded wait; a freed slot goes to the highest-priority waiter.
+
+    Waiters hold plain futures of the running loop, so the gate is not bound to one event loop.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: tuple[deque[asyncio.Future], ...] = (deque(), deque())
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiters)
+
+    async def acquire(self, priority: int = CHEAP, timeout: float = 0.0) -> None:
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+        if timeout <= 0:
+            raise Overloaded()
+        queue = self._waiters[priority]
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait((waiter,), timeout=timeout)
+        except BaseException:
+            self._abandon(queue, waiter)
+            raise
+        if not waiter.done():
+            self._abandon(queue, waiter)
+            raise Overloaded()
+
+    def _abandon(self, queue: deque, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # the slot was handed over just as we gave up: pass it on
+            self.release()
+        else:
+            queue.remove(waiter)
+            waiter.cancel()
+
+    def release(self) -> None:
+        # a waiter takes the slot over, so `active` stays the same
+        for queue in self._waiters:
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.active -= 1
+
+
+class RateLimiter:
+    """Per-key token buckets; an idle key's bucket refills and is forgotten."""
+
+    def __init__(self, rate: float, burst: int, maxsize: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.rejected = 0
+        # a bucket left alone for burst / rate seconds is full again, i.e. as good as absent
+        self._buckets: TTLCache[int, tuple[float, float]] = TTLCache(maxsize, burst / rate if rate > 0 else 0)
+
+    def take(self, key: int) -> float:
+        """Take one token; returns 0 when admitted, else the seconds until a token is available."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        tokens = self.burst if bucket is None else min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        if tokens < 1:
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+def parse_route_limits(spec: str) -> dict[tuple[str, str], int]:
+    """"POST /resume/import=2,GET /resume/export=4" -> {("POST", "/resume/import"): 2, ...}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, limit = item.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        if not path or not limit.strip().isdigit():
+            raise ValueError(f"invalid route limit: {item!r}")
+        limits[(method.upper(), path.strip())] = int(limit)
+    return limits
+
+
+def classify(request: Request) -> int:
+    route = request.scope.get("route")
+    key = (request.method, getattr(route, "path", ""))
+    if key in EXPENSIVE_ROUTES:
+        return EXPENSIVE
+    if key == ("GET", "/resume") and request.query_params.get("q"):
+        return EXPENSIVE
+    return CHEAP
+
+
+class Admission:
+    def __init__(
+        self,
+        capacity: int,
+        expensive_share: float,
+        waits: tuple[float, float],
+        route_limits: dict[tuple[str, str], int],
+        limiter: RateLimiter,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.capacity = Gate(capacity)
+        self.expensive = Gate(max(int(capacity * expensive_share), 1))
+        self.waits = waits
+        self.routes = {key: Gate(limit) for key, limit in route_limits.items()}
+        self.limiter = limiter
+
+    async def enter(self, request: Request, priority: int) -> list[Gate]:
+        """Acquire the request's gates in order; returns them for release, raises Overloaded."""
+        route = getattr(request.scope.get("route"), "path", "")
+        gates = [self.routes.get((request.method, route)), self.expensive if priority == EXPENSIVE else None]
+        gates = [gate for gate in gates if gate is not None] + [self.capacity]
+        held = []
+        started = time.perf_counter()
+        try:
+            for gate in gates:
+                await gate.acquire(priority, self.waits[priority] - (time.perf_counter() - started))
+                held.append(gate)
+        except BaseException:
+            self.leave(held)
+            raise
+        admission_wait.labels(PRIORITY_NAMES[priority]).observe(time.perf_counter() - started)
+        return held
+
+    @staticmethod
+    def leave(gates: list[Gate]) -> None:
+        for gate in reversed(gates):
+            gate.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.capacity.active,
+            "waiting": self.capacity.waiting,
+            "expensive_in_flight": self.expensive.active,
+            "rate_limited": self.limiter.rejected,
+        }
+
+
+admission = Admission(
+    ADMISSION_CAPACITY,
+    ADMISSION_EXPENSIVE_SHARE,
+    (ADMISSION_WAIT_SECONDS, ADMISSION_EXPENSIVE_WAIT_SECONDS),
+    parse_route_limits(ADMISSION_ROUTE_LIMITS),
+    RateLimiter(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST),
+    ADMISSION_ENABLED,
+)
+
+
+def _overloaded(reason: str, priority: int) -> HTTPException:
+    admission_rejected.labels(reason, PRIORITY_NAMES[priority]).inc()
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, retry later",
+        headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+    )
+
+
+class Ticket:
+    """The gates an admitted request holds; released once, by the dependency or, when held, by its response."""
+
+    def __init__(self, gates: list[Gate]):
+        self._gates: list[Gate] | None = gates
+        self.held = False
+        admission_in_flight.inc()
+
+    def release(self) -> None:
+        if self._gates is not None:
+            Admission.leave(self._gates)
+            self._gates = None
+            admission_in_flight.dec()
+
+
+async def admit(request: Request, user: Principal = Depends(get_principal)) -> AsyncGenerator[None, None]:
+    if not admission.enabled:
+        yield
+        return
+    priority = classify(request)
+    wait = admission.limiter.take(user.id)
+    if wait:
+        admission_rejected.labels("rate", PRIORITY_NAMES[priority]).inc()
+        logger.info("Rate limited: user=%s %s %s", user.id, request.method, request.url.path)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+    try:
+        gates = await admission.enter(request, priority)
+    except Overloaded:
+        logger.warning("Shed %s request: user=%s %s %s stats=%s", PRIORITY_NAMES[priority], user.id,
+                       request.method, request.url.path, admission.stats())
+        raise _overloaded("queue", priority)
+    ticket = request.state.admission = Ticket(gates)
+    try:
+        yield
+    except BaseException:
+        # the response is never sent, so a HeldStreamingResponse can't release it either
+        ticket.release()
+        raise
+    if not ticket.held:
+        ticket.release()
+
+
+class HeldStreamingResponse(StreamingResponse):
+    """StreamingResponse that keeps the request's admission slots until it has been sent.
+
+    Dependencies exit before a StreamingResponse sends its body, so without this
+    a long export would count as finished as soon as it started. The slots are
+    released when sending ends for any reason: the body is exhausted, the
+    client disconnects or the stream fails.
+    """
+
+    def __init__(self, request: Request, content: AsyncIterator[bytes], **kwargs):
+        super().__init__(content, **kwargs)
+        self.ticket: Ticket | None = getattr(request.state, "admission", None)
+        if self.ticket is not None:
+            self.ticket.held = True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.ticket is not None:
+                self.ticket.release()
+
+
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError) -> JSONResponse:
+    """A checkout that outwaited DB_POOL_TIMEOUT_SECONDS: shed instead of answering 500."""
+    priority = classify(request)
+    admission_rejected.labels("pool", PRIORITY_NAMES[priority]).inc()
+    logger.warning("DB pool timeout: %s %s", request.method, request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, retry later"},
+        headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+    )
@@ -8,6 +8,104 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", "5432"))
 DB_NAME = os.getenv("DB_NAME", "postgres")
+# primary pool, per worker process; a checkout waiting longer than the timeout is answered 503
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "3"))
+# connections each engine opens (and warms with the hot statements) before /readyz reports ready
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", "4"))
 
 JWT_SECRET = os.getenv("JWT_SECRET","3gu05g0g3g35hg3503ghg33g53g53g53")
 ACCESS_TTL_SECONDS = int(os.getenv("ACCESS_TTL_SECONDS","86400"))
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "thread")  # "thread" or "process"
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "32"))
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# comma-separated "<logger>=<rate>", e.g. "app.routers.resume_router.reads=0.1"
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+REVISION_KEYFRAME_INTERVAL = int(os.getenv("REVISION_KEYFRAME_INTERVAL", "10"))
+REVISION_CACHE_SIZE = int(os.getenv("REVISION_CACHE_SIZE", "2048"))
+REVISION_CACHE_TTL_SECONDS = float(os.getenv("REVISION_CACHE_TTL_SECONDS", "3600"))
+# serialized GET /resume/{id}/history/{version} bodies (entries, not bytes)
+REVISION_BODY_CACHE_SIZE = int(os.getenv("REVISION_BODY_CACHE_SIZE", "1024"))
+
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "100"))
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# longest NDJSON line / CSV record accepted by an import; a longer one fails the import (413)
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(4 * 1024 * 1024)))
+
+# "module:attribute" of the improver class or instance used by improve jobs
+IMPROVER = os.getenv("IMPROVER", "app.improver:SuffixImprover")
+IMPROVE_WORKERS = int(os.getenv("IMPROVE_WORKERS", "4"))
+IMPROVE_QUEUE_LIMIT = int(os.getenv("IMPROVE_QUEUE_LIMIT", "100"))
+# an in-flight job older than this is considered abandoned (e.g. its worker process died)
+IMPROVE_JOB_TIMEOUT_SECONDS = float(os.getenv("IMPROVE_JOB_TIMEOUT_SECONDS", "300"))
+
+# "none", "redis://host:6379/0" (shared between workers, needs the redis package) or "memory"; memory is per
+# process and only invalidated in the worker that took the write, so it is refused with WEB_CONCURRENCY > 1
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "none")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+
+# per-request SQL statement counting (Server-Timing header, N+1 warnings); slow queries are logged either way
+SQL_PROFILING = os.getenv("SQL_PROFILING", "false").lower() in ("1", "true", "yes")
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+# gunicorn workers (gunicorn.conf.py reads the same variable)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "4"))
+
+METRICS_SAMPLE_SECONDS = float(os.getenv("METRICS_SAMPLE_SECONDS", "5"))
+
+# read replica for GET handlers; empty = read-only sessions against the primary
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST", "")
+DB_REPLICA_PORT = int(os.getenv("DB_REPLICA_PORT", str(DB_PORT)))
+READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", "10"))
+READ_STATEMENT_TIMEOUT_MS = int(os.getenv("READ_STATEMENT_TIMEOUT_MS", "5000"))
+# after a write the user's reads stay on the primary for this long (replication lag); with a replica and
+# WEB_CONCURRENCY > 1 the marker must be shared, i.e. RESPONSE_CACHE_BACKEND=redis://...
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+# list/history pages built from row tuples and encoded with orjson, skipping response_model validation
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+# background removal of tombstoned resumes and their revisions (app.db.purge)
+PURGE_ENABLED = os.getenv("PURGE_ENABLED", "true").lower() in ("1", "true", "yes")
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+# sleep between non-empty batches; bounds the delete rate (and WAL volume) per worker
+PURGE_PAUSE_SECONDS = float(os.getenv("PURGE_PAUSE_SECONDS", "0.2"))
+PURGE_IDLE_SECONDS = float(os.getenv("PURGE_IDLE_SECONDS", "30"))
+
+# admission control in front of the resume/jobs routes (app.admission), per worker process
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+# expensive requests (improve, history, search, import/export) may hold at most this share of the capacity
+ADMISSION_EXPENSIVE_SHARE = float(os.getenv("ADMISSION_EXPENSIVE_SHARE", "0.5"))
+ADMISSION_WAIT_SECONDS = float(os.getenv("ADMISSION_WAIT_SECONDS", "1"))
+ADMISSION_EXPENSIVE_WAIT_SECONDS = float(os.getenv("ADMISSION_EXPENSIVE_WAIT_SECONDS", "0.2"))
+# "METHOD /route/{template}=N,..." concurrency caps for single routes
+ADMISSION_ROUTE_LIMITS = os.getenv(
+    "ADMISSION_ROUTE_LIMITS", "POST /resume/import=2,GET /resume/export=4,POST /resume/{resume_id}/improve=8",
+)
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+# per-user token bucket; 0 disables
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "20"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "40"))
+
+# Idempotency-Key on create/batch/improve (app.db.idempotency)
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# a key still in flight after this long belongs to a crashed worker and may be taken over
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+# how long a duplicate waits for the in-flight original before it is answered 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_CACHE_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_CACHE_TTL_SECONDS", "600"))
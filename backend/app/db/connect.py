@@ -1,27 +1,84 @@
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
-from app.config import DB_USER,  DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
+from app.config import DB_USER,  DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME, SQL_PROFILING
+from app.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS
+from app.config import DB_REPLICA_HOST, DB_REPLICA_PORT, READ_POOL_SIZE, READ_STATEMENT_TIMEOUT_MS
+from app.db.profiler import install_profiler
+from app.metrics import TimedQueuePool, instrument_pool
 from urllib.parse import quote_plus
 POSTGRES_URL = (
     f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
-
-engine = create_async_engine(
-    POSTGRES_URL,
-    echo=False,
-    pool_size=10,
-    max_overflow=20,
+READ_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_REPLICA_HOST or DB_HOST}:"
+    f"{DB_REPLICA_PORT if DB_REPLICA_HOST else DB_PORT}/{DB_NAME}"
 )
 
+# Engines are created by init_engines() from the app lifespan, i.e. in the worker after fork:
+# pooled connections never cross a fork and each worker sizes its own pool.
+engine: AsyncEngine | None = None
+read_engine: AsyncEngine | None = None
+
+# bound by init_engines(); handlers and tasks only ever open sessions after startup
+AsyncSessionLocal = async_sessionmaker(expire_on_commit=False, class_=AsyncSession)
+ReadSessionLocal = async_sessionmaker(expire_on_commit=False, class_=AsyncSession)
+
+
+def create_read_engine(url: str) -> AsyncEngine:
+    """Engine for the replica, or for separate read-only connections to the primary when there is none.
+
+    The session settings make every transaction READ ONLY with a short statement timeout
+    without a per-request SET round trip.
+    """
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=READ_POOL_SIZE,
+        max_overflow=READ_POOL_SIZE,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        poolclass=TimedQueuePool,
+        connect_args={"server_settings": {
+            "default_transaction_read_only": "on",
+            "statement_timeout": str(READ_STATEMENT_TIMEOUT_MS),
+        }},
+    )
+
+
+def init_engines() -> tuple[AsyncEngine, AsyncEngine]:
+    """Create the primary and read engines (once per process) and bind the session factories."""
+    global engine, read_engine
+    if engine is None:
+        engine = create_async_engine(
+            POSTGRES_URL,
+            echo=False,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+            poolclass=TimedQueuePool,
+        )
+        instrument_pool(engine, "primary")
+
+        read_engine = create_read_engine(READ_URL)
+        instrument_pool(read_engine, "read")
+        if SQL_PROFILING:
+            install_profiler(engine)
+            install_profiler(read_engine)
+        AsyncSessionLocal.configure(bind=engine)
+        ReadSessionLocal.configure(bind=read_engine)
+    return engine, read_engine
+
+
+async def dispose_engines() -> None:
+    global engine, read_engine
+    for eng in (engine, read_engine):
+        if eng is not None:
+            await eng.dispose()
+    engine = read_engine = None
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    expire_on_commit=False,
-    class_=AsyncSession,
-)
 
 Base = declarative_base()
@@ -0,0 +1,74 @@
+"""Drift detection and repair for the denormalized counters.
+
+users.resume_count and resumes.revision_count are maintained by app.db.writes
+in the writing transaction. Anything that bypasses those helpers (manual SQL,
+a restored partial backup, the migration backfill racing live writes) leaves
+them off; reconcile_counters walks the parent table in id batches, compares
+each counter with a real count(*) and optionally rewrites the drifted ones.
+
+A repair locks the drifted parent rows before recounting. Writers update the
+parent row in the same transaction as the child insert/delete, so a writer
+either commits before the recount (and is counted) or applies its relative
+increment after the repair.
+"""
+from dataclasses import dataclass
+from typing import Literal
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Resume, ResumeRevision, User
+from app.db.writes import id_in
+
+Counter = Literal["users.resume_count", "resumes.revision_count"]
+
+# counter -> (parent, counter column, child foreign key, filters on the child rows, filters on the parents)
+COUNTERS: dict[str, tuple] = {
+    # tombstoned resumes are no longer counted
+    "users.resume_count": (User, User.resume_count, Resume.user_id, (Resume.live,), ()),
+    # a tombstoned resume's revisions are being purged, its counter is left behind
+    "resumes.revision_count": (Resume, Resume.revision_count, ResumeRevision.resume_id, (), (Resume.live,)),
+}
+
+
+@dataclass
+class Drift:
+    counter: str
+    id: int
+    stored: int
+    actual: int
+
+
+async def reconcile_counters(
+    db: AsyncSession, counter: Counter, batch_size: int = 1000, after: int = 0, fix: bool = False,
+) -> tuple[int, list[Drift], int]:
+    """Check one batch of parent rows with id > `after`.
+
+    Returns (checked, drifts, cursor); pass the cursor back until checked == 0.
+    With `fix` the drifted counters are rewritten; commit the session afterwards.
+    """
+    parent, column, child_fk, child_filters, parent_filters = COUNTERS[counter]
+    actual = select(func.count()).where(child_fk == parent.id, *child_filters).scalar_subquery()
+    stmt = (
+        select(parent.id, column, actual.label("actual"))
+        .where(parent.id > after, *parent_filters)
+        .order_by(parent.id)
+        .limit(batch_size)
+    )
+    rows = (await db.execute(stmt)).all()
+    drifts = [Drift(counter, row.id, row[1], row.actual) for row in rows if row[1] != row.actual]
+    if fix and drifts:
+        ids = [d.id for d in drifts]
+        dialect = db.bind.dialect.name
+        await db.execute(
+            select(parent.id).where(id_in(parent.id, ids, dialect)).order_by(parent.id).with_for_update()
+        )
+        # recounted after the lock, not the values read above
+        await db.execute(
+            update(parent)
+            .where(id_in(parent.id, ids, dialect))
+            .values({column.key: actual})
+            .execution_options(synchronize_session=False)
+        )
+    cursor = rows[-1].id if rows else after
+    return len(rows), drifts, cursor
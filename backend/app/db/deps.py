@@ -1,4 +1,4 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from app.db.connect import AsyncSessionLocal
 from typing import AsyncGenerator
 
@@ -12,3 +12,7 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
 
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """For handlers that outlive their dependencies, e.g. streaming responses that open their own session."""
+    return AsyncSessionLocal
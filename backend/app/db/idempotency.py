@@ -0,0 +1,296 @@
+"""Idempotency-Key support for the non-idempotent writes (create, batch, improve).
+
+A request carrying `Idempotency-Key` first claims (user_id, key) by inserting
+an in-flight row into idempotency_keys in its own, immediately committed
+transaction. Only the claimant runs the handler. IdempotentRoute then stores
+the rendered response (status, body, ETag/Location) on the row for
+IDEMPOTENCY_TTL_SECONDS and in the in-process replay_cache. A handler that
+raises, or a 5xx, releases the claim so that a retry runs again.
+
+A duplicate is answered from replay_cache without touching a session, or from
+the row on the first replay in another worker. A duplicate that arrives while
+the original is still running waits for it instead of executing: on an
+in-process future in the same worker, by polling the row in another one. The
+key is bound to the request's fingerprint, so reusing it for a different
+request is a 422.
+
+The claim commits before the write and the response is stored after it. A
+worker that dies in between leaves an in-flight row; after
+IDEMPOTENCY_LEASE_SECONDS a retry may take it over and run again.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Coroutine
+
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import (
+    IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_CACHE_TTL_SECONDS, IDEMPOTENCY_LEASE_SECONDS, IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+)
+from app.db.deps import get_session_factory
+from app.db.models import IdempotencyKey
+from app.utils.cache import TTLCache
+from app.utils.current import Principal, get_principal
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+STORED_HEADERS = ("content-type", "etag", "location")
+POLL_SECONDS = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+    def render(self) -> Response:
+        return Response(self.body, status_code=self.status_code, headers={**self.headers, REPLAYED_HEADER: "true"})
+
+
+class IdempotentReplay(Exception):
+    """Raised by the dependency to short-circuit the handler; IdempotentRoute returns the response."""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+# (user_id, key) -> completed response; (user_id, key) -> claim running in this worker
+replay_cache: TTLCache[tuple[int, str], StoredResponse] = TTLCache(
+    IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_CACHE_TTL_SECONDS,
+)
+_in_flight: dict[tuple[int, str], "Claim"] = {}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands DateTime(timezone=True) back naive
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def fingerprint(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256(f"{request.method} {request.url.path}?{request.url.query}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _stored(row: IdempotencyKey) -> StoredResponse:
+    return StoredResponse(row.fingerprint, row.status_code, json.loads(row.headers or "{}"), row.body or b"")
+
+
+def _replay(stored: StoredResponse, fp: str) -> IdempotentReplay:
+    if stored.fingerprint != fp:
+        raise _mismatch()
+    return IdempotentReplay(stored.render())
+
+
+def _mismatch() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="Idempotency-Key was already used for a different request",
+    )
+
+
+class Claim:
+    """The right to run the handler for one (user_id, key)."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], user_id: int, key: str, fp: str):
+        self.session_factory = session_factory
+        self.user_id = user_id
+        self.key = key
+        self.fingerprint = fp
+        self.done = asyncio.get_running_loop().create_future()
+
+    def _where(self):
+        return (
+            IdempotencyKey.user_id == self.user_id,
+            IdempotencyKey.key == self.key,
+            IdempotencyKey.status_code.is_(None),
+        )
+
+    async def complete(self, response: Response) -> None:
+        if response.status_code >= 500 or not hasattr(response, "body"):
+            await self.release()
+            return
+        stored = StoredResponse(
+            self.fingerprint, response.status_code,
+            {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            bytes(response.body),
+        )
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(IdempotencyKey).where(*self._where()).values(
+                        status_code=stored.status_code, headers=json.dumps(stored.headers), body=stored.body,
+                    )
+                )
+                await db.commit()
+        except Exception:
+            # the write itself went through; duplicates in this worker still replay from the cache
+            logger.exception("Idempotent response not stored: user=%s key=%r", self.user_id, self.key)
+        replay_cache.set((self.user_id, self.key), stored)
+        self._finish()
+
+    async def release(self) -> None:
+        """Give the key up without a response, so that a retry runs the request again."""
+        try:
+            async with self.session_factory() as db:
+                await db.execute(delete(IdempotencyKey).where(*self._where()))
+                await db.commit()
+        except Exception:
+            logger.exception("Idempotency claim not released: user=%s key=%r", self.user_id, self.key)
+        finally:
+            self._finish()
+
+    def _finish(self) -> None:
+        if _in_flight.get((self.user_id, self.key)) is self:
+            del _in_flight[(self.user_id, self.key)]
+        if not self.done.done():
+            self.done.set_result(None)
+
+
+async def _claim_or_fetch(
+    session_factory: async_sessionmaker[AsyncSession], user_id: int, key: str, fp: str,
+) -> IdempotencyKey | None:
+    """Insert the in-flight row; returns None when claimed, else the existing row."""
+    async with session_factory() as db:
+        now = _now()
+        lease_start = now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+        row = await db.get(IdempotencyKey, (user_id, key))
+        if row is not None and (
+            _aware(row.expires_at) <= now or (row.status_code is None and _aware(row.created_at) <= lease_start)
+        ):
+            logger.warning("Idempotency key expired or abandoned, taking over: user=%s key=%r", user_id, key)
+            await db.delete(row)
+            await db.flush()
+            row = None
+        if row is not None:
+            return row
+        db.add(IdempotencyKey(
+            user_id=user_id, key=key, fingerprint=fp,
+            created_at=now, expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+        ))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # a concurrent request claimed it first
+            await db.rollback()
+            # gone again if that request released it: report it in flight, the caller retries the claim
+            return await db.get(IdempotencyKey, (user_id, key)) or IdempotencyKey(fingerprint=fp)
+        return None
+
+
+async def idempotency(
+    request: Request,
+    idempotency_key: str | None = Header(None, min_length=1, max_length=255,
+                                         description="Replays the first response for the same key"),
+    user: Principal = Depends(get_principal),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> None:
+    """Route dependency: claim the key, or answer with the original response (IdempotentReplay)."""
+    if idempotency_key is None:
+        return
+    cache_key = (user.id, idempotency_key)
+    fp = fingerprint(request, await request.body())
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        stored = replay_cache.get(cache_key)
+        if stored is not None:
+            raise _replay(stored, fp)
+
+        running = _in_flight.get(cache_key)
+        if running is not None:
+            if running.fingerprint != fp:
+                raise _mismatch()
+            # same worker: wait for the original (it completes or releases the key)
+            await asyncio.wait((running.done,), timeout=max(deadline - time.monotonic(), 0))
+            if not running.done.done():
+                raise _still_running()
+            continue
+
+        row = await _claim_or_fetch(session_factory, user.id, idempotency_key, fp)
+        if row is None:
+            claim = _in_flight[cache_key] = Claim(session_factory, user.id, idempotency_key, fp)
+            request.state.idempotency = claim
+            return
+        if row.fingerprint != fp:
+            raise _mismatch()
+        if row.status_code is not None:
+            stored = _stored(row)
+            replay_cache.set(cache_key, stored)
+            raise IdempotentReplay(stored.render())
+        # running in another worker
+        if time.monotonic() >= deadline:
+            raise _still_running()
+        await asyncio.sleep(POLL_SECONDS)
+
+
+def _still_running() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still in progress",
+        headers={"Retry-After": "1"},
+    )
+
+
+class IdempotentRoute(APIRoute):
+    """Returns replays and stores the response of a request that claimed its Idempotency-Key.
+
+    Runs around FastAPI's handler, so it sees the rendered response after the
+    request's dependencies (and its session) have exited.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except IdempotentReplay as replay:
+                return replay.response
+            except BaseException:
+                claim = getattr(request.state, "idempotency", None)
+                if claim is not None:
+                    await claim.release()
+                raise
+            claim = getattr(request.state, "idempotency", None)
+            if claim is not None:
+                await claim.complete(response)
+            return response
+
+        return route_handler
+
+
+async def purge_expired_keys(db: AsyncSession, batch_size: int) -> int:
+    """Delete up to `batch_size` expired keys; returns the number removed."""
+    keys = (await db.execute(
+        select(IdempotencyKey.user_id, IdempotencyKey.key)
+        .where(IdempotencyKey.expires_at <= _now())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )).all()
+    if keys:
+        await db.execute(
+            delete(IdempotencyKey)
+            .where(
+                tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_([tuple(k) for k in keys]),
+                IdempotencyKey.expires_at <= _now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    return len(keys)
@@ -0,0 +1,285 @@
+"""Bulk import of resumes from NDJSON or CSV.
+
+NDJSON input is one resume per line, optionally with its earlier contents
+oldest first:
+
+    {"title": "...", "content": "...", "history": ["first draft", "second draft"]}
+
+The output of GET /resume/export is accepted as well: "resume" lines start a
+record and the "revision" lines after them become its history; other lines are
+ignored. CSV input needs a header with `title` and `content` columns and may
+have a `history` column holding a JSON array.
+
+A resume with N history entries is stored at version N + 1 with revisions
+1..N, encoded the same way compact_revisions() would. Records are validated
+and loaded in batches, each batch in its own transaction; on PostgreSQL a
+batch is two COPYs (ids are taken from the sequence up front), elsewhere an
+executemany INSERT with ids from max(id). After every committed batch the stats carry a checkpoint
+(number of input records consumed) that can be passed back as `skip` to resume
+an interrupted import.
+"""
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import IMPORT_BATCH_SIZE, IMPORT_MAX_LINE_BYTES
+from app.db.models import Resume, ResumeRevision
+from app.db.revisions import encode_history
+from app.db.writes import adjust_resume_count
+from app.schemas.requests import ResumeCreate
+from app.utils.streaming import LineTooLong
+
+ImportFormat = Literal["ndjson", "csv"]
+
+IMPORT_MAX_ERRORS = 100
+TITLE_MAX_LENGTH = Resume.__table__.c.title.type.length
+
+RESUME_COLUMNS = ("id", "title", "content", "user_id", "version", "revision_count")
+REVISION_COLUMNS = ("resume_id", "version", "content", "storage", "base_version", "payload", "content_length")
+
+
+class ImportFormatError(ValueError):
+    """The input as a whole can't be read (e.g. a CSV without the required columns)."""
+
+
+@dataclass
+class ImportStats:
+    records: int = 0      # input records consumed, including skipped and invalid ones
+    skipped: int = 0
+    imported: int = 0
+    revisions: int = 0
+    invalid: int = 0
+    checkpoint: int = 0   # records consumed up to the last committed batch
+    errors: list[dict] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.imported / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_error(self, record: int, error: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"record": record, "error": error})
+
+
+@dataclass
+class ImportRecord:
+    title: str
+    content: str
+    history: list[str]
+
+
+async def _ndjson_records(lines: AsyncIterator[bytes]) -> AsyncIterator[dict | str]:
+    """Yield raw resume dicts, or an error message for a record that can't be parsed."""
+    pending: dict | None = None
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            if pending is not None:
+                yield pending
+                pending = None
+            yield "Invalid JSON"
+            continue
+        if not isinstance(obj, dict):
+            if pending is not None:
+                yield pending
+                pending = None
+            yield "Expected a JSON object"
+            continue
+        kind = obj.get("type", "resume")
+        if kind == "revision":
+            if pending is not None:
+                pending.setdefault("_revisions", []).append(obj)
+            continue
+        if kind != "resume":
+            continue
+        if pending is not None:
+            yield pending
+        pending = obj
+    if pending is not None:
+        yield pending
+
+
+async def _csv_records(lines: AsyncIterator[bytes]) -> AsyncIterator[dict | str]:
+    header: list[str] | None = None
+    parts: list[str] = []
+    size = quotes = 0
+    async for line in lines:
+        text = line.decode("utf-8-sig" if header is None and not parts else "utf-8")
+        parts.append(text)
+        size += len(line) + 1
+        quotes += text.count('"')
+        # a record is complete once its quotes are balanced; otherwise a quoted field spans lines
+        if quotes % 2:
+            if size > IMPORT_MAX_LINE_BYTES:
+                raise LineTooLong(IMPORT_MAX_LINE_BYTES)
+            continue
+        record = "\n".join(parts)
+        parts.clear()
+        size = quotes = 0
+        if not record.strip():
+            continue
+        row = next(csv.reader(io.StringIO(record)))
+        if header is None:
+            header = [name.strip() for name in row]
+            if not {"title", "content"} <= set(header):
+                raise ImportFormatError("CSV header must contain 'title' and 'content' columns")
+            continue
+        if len(row) != len(header):
+            yield f"Expected {len(header)} columns, got {len(row)}"
+            continue
+        values = dict(zip(header, row))
+        if values.get("history"):
+            try:
+                values["history"] = json.loads(values["history"])
+            except ValueError:
+                yield "Invalid JSON in history column"
+                continue
+        yield values
+    if any(part.strip() for part in parts):
+        yield "Unterminated quoted field"
+
+
+def _validate(raw: dict, with_history: bool) -> ImportRecord:
+    data = ResumeCreate.model_validate(raw)
+    if len(data.title) > TITLE_MAX_LENGTH:
+        raise ValueError(f"title longer than {TITLE_MAX_LENGTH} characters")
+    history: list = []
+    if with_history:
+        if "_revisions" in raw:
+            history = [r.get("content") for r in sorted(raw["_revisions"], key=lambda r: r.get("version") or 0)]
+        else:
+            history = raw.get("history") or []
+        if not isinstance(history, list) or not all(isinstance(h, str) for h in history):
+            raise ValueError("history must be a list of strings")
+    return ImportRecord(title=data.title, content=data.content, history=history)
+
+
+def _error_message(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+    return str(exc)
+
+
+async def _copy_batch(db: AsyncSession, user_id: int, batch: list[ImportRecord]) -> int:
+    ids = (await db.execute(
+        text("SELECT nextval(pg_get_serial_sequence('resumes', 'id')) FROM generate_series(1, :n)"),
+        {"n": len(batch)},
+    )).scalars().all()
+    raw = (await (await db.connection()).get_raw_connection()).driver_connection
+    await raw.copy_records_to_table(
+        Resume.__tablename__, columns=RESUME_COLUMNS,
+        records=[
+            (rid, r.title, r.content, user_id, len(r.history) + 1, len(r.history)) for rid, r in zip(ids, batch)
+        ],
+    )
+    revisions = [
+        (rid, *(rev[column] for column in REVISION_COLUMNS[1:]))
+        for rid, r in zip(ids, batch) if r.history
+        for rev in encode_history(r.history)
+    ]
+    if revisions:
+        await raw.copy_records_to_table(ResumeRevision.__tablename__, columns=REVISION_COLUMNS, records=revisions)
+    return len(revisions)
+
+
+async def _insert_batch(db: AsyncSession, user_id: int, batch: list[ImportRecord]) -> int:
+    # explicit ids, as with COPY: an ordered INSERT ... RETURNING runs row by row on SQLite.
+    # Core inserts, because the ORM would reset the version_id_col to 1.
+    first = (await db.scalar(select(func.coalesce(func.max(Resume.id), 0)))) + 1
+    ids = range(first, first + len(batch))
+    await db.execute(insert(Resume.__table__), [
+        {
+            "id": rid, "title": r.title, "content": r.content, "user_id": user_id,
+            "version": len(r.history) + 1, "revision_count": len(r.history),
+        }
+        for rid, r in zip(ids, batch)
+    ])
+    revisions = [
+        {"resume_id": rid, **rev}
+        for rid, r in zip(ids, batch) if r.history
+        for rev in encode_history(r.history)
+    ]
+    if revisions:
+        await db.execute(insert(ResumeRevision.__table__), revisions)
+    return len(revisions)
+
+
+async def load_batch(db: AsyncSession, user_id: int, batch: list[ImportRecord]) -> int:
+    """Insert validated records; returns the number of revisions written."""
+    if db.bind.dialect.name == "postgresql":
+        revisions = await _copy_batch(db, user_id, batch)
+    else:
+        revisions = await _insert_batch(db, user_id, batch)
+    await adjust_resume_count(db, user_id, len(batch))
+    return revisions
+
+
+async def import_resumes(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: int,
+    lines: AsyncIterator[bytes],
+    fmt: ImportFormat = "ndjson",
+    with_history: bool = True,
+    skip: int = 0,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_progress: Callable[[ImportStats], Awaitable[None] | None] | None = None,
+    stats: ImportStats | None = None,
+) -> ImportStats:
+    """Import resumes for a user from a stream of input lines.
+
+    The first `skip` records are consumed without being loaded; `on_progress`
+    is called after every committed batch. Pass in `stats` to still have the
+    checkpoint if the import fails half-way.
+    """
+    stats = stats if stats is not None else ImportStats()
+    records = _csv_records(lines) if fmt == "csv" else _ndjson_records(lines)
+    batch: list[ImportRecord] = []
+
+    async def flush() -> None:
+        if batch:
+            async with session_factory() as db:
+                stats.revisions += await load_batch(db, user_id, batch)
+                await db.commit()
+            stats.imported += len(batch)
+            batch.clear()
+        stats.checkpoint = stats.records
+        if on_progress is not None:
+            result = on_progress(stats)
+            if result is not None:
+                await result
+
+    async for raw in records:
+        stats.records += 1
+        if stats.records <= skip:
+            stats.skipped += 1
+            continue
+        if isinstance(raw, str):
+            stats.add_error(stats.records, raw)
+            continue
+        try:
+            batch.append(_validate(raw, with_history))
+        except (ValidationError, ValueError) as exc:
+            stats.add_error(stats.records, _error_message(exc))
+            continue
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+    stats.finished = time.perf_counter()
+    return stats
@@ -1,4 +1,6 @@
 from .user import User
 from .resume import Resume, ResumeRevision
+from .job import Job
+from .idempotency import IdempotencyKey
 
-__all__ = ["User", "Resume", "ResumeRevision"]
+__all__ = ["User", "Resume", "ResumeRevision", "Job", "IdempotencyKey"]
@@ -1,5 +1,8 @@
+from datetime import datetime
+
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import DateTime, Integer, String, Text, ForeignKey, UniqueConstraint, Index, LargeBinary, text
 from app.db.connect import Base
 from app.db.models.mixins import TimestampMixin
 
@@ -11,6 +14,11 @@ class Resume(TimestampMixin, Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    # number of resume_revisions rows, maintained like users.resume_count
+    revision_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+    # tombstone: deleted resumes are invisible to every read and write path and
+    # removed with their revisions by the background purger (app.db.purge)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     __mapper_args__ = {"version_id_col": version}
 
     revisions: Mapped[list["ResumeRevision"]] = relationship(
@@ -23,16 +31,49 @@ class Resume(TimestampMixin, Base):
 
     owner = relationship("User", back_populates="resumes")
 
+    __table_args__ = (
+        Index(
+            "ix_resumes_user_id_id_live", "user_id", "id",
+            postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_resumes_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"), sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
+    @hybrid_property
+    def live(self) -> bool:
+        return self.deleted_at is None
+
+    @live.inplace.expression
+    @classmethod
+    def _live_expression(cls):
+        return cls.deleted_at.is_(None)
+
 
 class ResumeRevision(TimestampMixin, Base):
     __tablename__ = "resume_revisions"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     resume_id: Mapped[int] = mapped_column(ForeignKey("resumes.id", ondelete="CASCADE"), index=True, nullable=False)
     version: Mapped[int] = mapped_column(Integer, nullable=False)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # "plain" rows keep the text in content; "full"/"delta" rows keep it encoded in payload
+    # (see app.db.revisions)
+    content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    storage: Mapped[str] = mapped_column(String(8), nullable=False, default="plain", server_default=text("'plain'"))
+    base_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    payload: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # characters of the materialized content, so metadata listings needn't decode payloads;
+    # NULL only for rows compacted before the column existed
+    content_length: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     resume: Mapped["Resume"] = relationship("Resume", back_populates="revisions")
 
     __table_args__ = (
         UniqueConstraint("resume_id", "version", name="uq_resume_revisions_resume_id_version"),
+        # the write path stores plain rows; the background compactor finds them through this
+        Index(
+            "ix_resume_revisions_plain", "resume_id", "version",
+            postgresql_where=text("storage = 'plain'"), sqlite_where=text("storage = 'plain'"),
+        ),
     )
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String
+from sqlalchemy import Integer, String, text
 from app.db.connect import Base
 from app.db.models.mixins import TimestampMixin
 
@@ -9,4 +9,7 @@ class User(TimestampMixin, Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text("1"))
+    # maintained by app.db.writes in the writing transaction; `manage.py reconcile-counters` repairs drift
+    resume_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
     resumes = relationship("Resume", back_populates="owner", cascade="all, delete-orphan")
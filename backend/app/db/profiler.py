@@ -0,0 +1,131 @@
+"""Opt-in per-request SQL profiling.
+
+install_profiler(engine) hooks before/after_cursor_execute on the engine.
+Statements executed while a QueryProfile is active (see profile_queries; the
+ProfilingMiddleware opens one per request) are counted with their DB time and
+returned rows. A statement shape seen N_PLUS_ONE_THRESHOLD times in one
+profile is flagged as a likely N+1, and statements slower than
+SQL_SLOW_QUERY_MS are logged with their parameters redacted to types.
+
+In tests:
+
+    with profile_queries() as prof:
+        await client.get("/resume/1/history")
+    assert prof.statements <= 3
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import SQL_SLOW_QUERY_MS, SQL_N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)\s*\)")
+_NUMBERED = re.compile(r"\$\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryProfile:
+    statements: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    shapes: Counter = field(default_factory=Counter)
+    slow: list[str] = field(default_factory=list)
+    parent: "QueryProfile | None" = None
+
+    def record(self, shape: str, elapsed: float, rows: int) -> None:
+        profile = self
+        while profile is not None:
+            profile.statements += 1
+            profile.db_time += elapsed
+            profile.rows += rows
+            profile.shapes[shape] += 1
+            profile = profile.parent
+
+    def repeated(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD) -> dict[str, int]:
+        """Statement shapes executed at least `threshold` times (likely N+1)."""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} queries, {self.rows} rows"'
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar("current_profile", default=None)
+enabled = False
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """Profile statements run inside the block; nested profiles also count towards the outer one."""
+    profile = QueryProfile(parent=current_profile.get())
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions that differ only in parameters compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _NUMBERED.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+
+
+def redact(parameters: Any) -> str:
+    """Parameter types and sizes only; values may hold personal data."""
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"[{len(parameters)} parameter sets]"
+    if isinstance(parameters, dict):
+        items = parameters.values()
+    elif isinstance(parameters, (list, tuple)):
+        items = parameters
+    else:
+        return "[]"
+    return "[" + ", ".join(_describe(value) for value in items) + "]"
+
+
+def _describe(value: Any) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_started = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._profiler_started
+    if elapsed * 1000 >= SQL_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query: %.1fms %s params=%s",
+            elapsed * 1000, _WHITESPACE.sub(" ", statement).strip()[:500], redact(parameters),
+        )
+    profile = current_profile.get()
+    if profile is None:
+        return
+    # the async adapters buffer result rows on the cursor; rowcount covers DML
+    rows = len(getattr(cursor, "_rows", None) or ()) or max(cursor.rowcount or 0, 0)
+    profile.record(statement_shape(statement), elapsed, rows)
+    if elapsed * 1000 >= SQL_SLOW_QUERY_MS:
+        profile.slow.append(statement_shape(statement))
+
+
+def install_profiler(engine: AsyncEngine) -> None:
+    global enabled
+    target = engine.sync_engine
+    if not event.contains(target, "before_cursor_execute", _before):
+        event.listen(target, "before_cursor_execute", _before)
+        event.listen(target, "after_cursor_execute", _after)
+    enabled = True
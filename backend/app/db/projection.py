@@ -0,0 +1,49 @@
+"""Column projections for list views that don't need the resume body.
+
+A projected list selects plain columns (no ORM entities, content never
+leaves the database) and returns them as dicts; the optional snippet is the
+first N characters of the content cut and HTML-escaped in SQL.
+"""
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models import Resume
+from app.db.search import html_escape
+
+SUMMARY_COLUMNS: dict[str, ColumnElement] = {
+    "id": Resume.id,
+    "title": Resume.title,
+    "version": Resume.version,
+    "created_at": Resume.created_at,
+    "updated_at": Resume.updated_at,
+}
+SUMMARY_FIELDS = (*SUMMARY_COLUMNS, "snippet")
+DEFAULT_SUMMARY_FIELDS = ("id", "title", "updated_at", "snippet")
+
+
+def parse_fields(fields: str | None, view: str) -> tuple[str, ...] | None:
+    """Fields of a projected list, or None for the full representation."""
+    if not fields:
+        return DEFAULT_SUMMARY_FIELDS if view == "summary" else None
+    wanted = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(wanted) - set(SUMMARY_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}; allowed: {', '.join(SUMMARY_FIELDS)}",
+        )
+    # id is always returned, it's what the client pages and links by
+    return tuple(dict.fromkeys(["id", *wanted]))
+
+
+def content_prefix(length: int, dialect: str) -> ColumnElement:
+    """The first `length` characters of the content, HTML-escaped like search snippets."""
+    if dialect == "postgresql":
+        return html_escape(func.left(Resume.content, length))
+    return html_escape(func.substr(Resume.content, 1, length))
+
+
+def summary_item(row, fields: tuple[str, ...]) -> dict:
+    # datetimes stay as they are; app.utils.fastjson renders them like pydantic would
+    return {name: getattr(row, name) for name in fields}
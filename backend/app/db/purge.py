@@ -0,0 +1,107 @@
+"""Background maintenance: purge of tombstoned resumes and expired idempotency keys,
+compaction of revisions the write path stored plain.
+
+Deleting a resume only sets resumes.deleted_at (app.db.writes.bulk_delete).
+The purger removes the revisions of tombstoned resumes PURGE_BATCH_SIZE rows
+per transaction, then the resume rows once nothing references them, so the
+ON DELETE CASCADE never has a large history to walk. Rows are claimed with
+FOR UPDATE SKIP LOCKED: purgers in several gunicorn workers split the work
+instead of queueing behind each other, and live rows are never locked.
+Each step also removes up to PURGE_BATCH_SIZE expired idempotency_keys rows
+and encodes up to PURGE_BATCH_SIZE plain revisions (app.db.revisions).
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import PURGE_BATCH_SIZE, PURGE_IDLE_SECONDS, PURGE_PAUSE_SECONDS
+from app.db.idempotency import purge_expired_keys
+from app.db.models import Resume, ResumeRevision
+from app.db.writes import id_in
+from app.db.revisions import compact_revisions
+from app.metrics import purge_backlog, purge_batch_duration, purge_rows, revisions_compacted
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_batch(db: AsyncSession, batch_size: int = PURGE_BATCH_SIZE) -> tuple[int, int]:
+    """Delete up to `batch_size` rows belonging to tombstoned resumes; returns (revisions, resumes)."""
+    dialect = db.bind.dialect.name
+    revision_ids = (await db.execute(
+        select(ResumeRevision.id)
+        .join(Resume, Resume.id == ResumeRevision.resume_id)
+        .where(~Resume.live)
+        .limit(batch_size)
+        .with_for_update(of=ResumeRevision, skip_locked=True)
+    )).scalars().all()
+    if revision_ids:
+        await db.execute(delete(ResumeRevision).where(id_in(ResumeRevision.id, revision_ids, dialect)))
+
+    resume_ids = []
+    if len(revision_ids) < batch_size:
+        resume_ids = (await db.execute(
+            select(Resume.id)
+            .where(~Resume.live, ~exists().where(ResumeRevision.resume_id == Resume.id))
+            .limit(batch_size - len(revision_ids))
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+        if resume_ids:
+            await db.execute(
+                delete(Resume)
+                .where(id_in(Resume.id, resume_ids, dialect), ~Resume.live)
+                .execution_options(synchronize_session=False)
+            )
+    return len(revision_ids), len(resume_ids)
+
+
+async def purge_step(session_factory: async_sessionmaker[AsyncSession], batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Run and commit one purge batch, recording metrics; returns the number of rows removed."""
+    started = time.perf_counter()
+    async with session_factory() as db:
+        revisions, resumes = await purge_batch(db, batch_size)
+        keys = await purge_expired_keys(db, batch_size)
+        await db.commit()
+        purge_backlog.set(await db.scalar(select(func.count()).select_from(Resume).where(~Resume.live)) or 0)
+    purge_batch_duration.observe(time.perf_counter() - started)
+    purge_rows.labels("resume_revisions").inc(revisions)
+    purge_rows.labels("resumes").inc(resumes)
+    purge_rows.labels("idempotency_keys").inc(keys)
+    if resumes:
+        logger.info("Purged %s tombstoned resumes (%s revisions in the last batch)", resumes, revisions)
+    return revisions + resumes + keys
+
+
+async def compact_step(session_factory: async_sessionmaker[AsyncSession], batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Encode and commit one batch of plain revisions; returns the number converted."""
+    async with session_factory() as db:
+        # converted rows drop out of the partial index, so every step starts from the beginning
+        converted, _ = await compact_revisions(db, batch_size)
+        await db.commit()
+    revisions_compacted.inc(converted)
+    return converted
+
+
+async def maintenance_step(
+    session_factory: async_sessionmaker[AsyncSession], batch_size: int = PURGE_BATCH_SIZE,
+) -> int:
+    """One purge step and one compaction step; returns the number of rows handled."""
+    removed = await purge_step(session_factory, batch_size)
+    return removed + await compact_step(session_factory, batch_size)
+
+
+async def run_purger(
+    session_factory: async_sessionmaker[AsyncSession],
+    batch_size: int = PURGE_BATCH_SIZE,
+    pause: float = PURGE_PAUSE_SECONDS,
+    idle: float = PURGE_IDLE_SECONDS,
+) -> None:
+    while True:
+        try:
+            removed = await maintenance_step(session_factory, batch_size)
+        except Exception:
+            logger.exception("Maintenance batch failed")
+            removed = 0
+        await asyncio.sleep(pause if removed else idle)
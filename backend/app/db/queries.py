@@ -0,0 +1,48 @@
+"""Statements of the hot read paths.
+
+The handlers build them here and app.db.warmup builds the same ones, so a
+warmed connection already has them in its prepared-statement cache. Change a
+shape here and both follow.
+"""
+from sqlalchemy import ColumnElement, Select, select
+
+from app.db.models import Resume, User
+
+
+def principal_row(where: ColumnElement[bool]) -> Select:
+    """The users columns a Principal is built from (get_user)."""
+    return select(User.id, User.email, User.token_version).where(where)
+
+
+def resume_count(user_id: int) -> Select:
+    return select(User.resume_count).where(User.id == user_id)
+
+
+def owned_resume(resume_id: int, user_id: int) -> tuple[ColumnElement[bool], ...]:
+    return Resume.id == resume_id, Resume.user_id == user_id, Resume.live
+
+
+def live_resumes(user_id: int) -> list[ColumnElement[bool]]:
+    return [Resume.user_id == user_id, Resume.live]
+
+
+def list_columns(snippet: ColumnElement, fast: bool) -> Select:
+    """Columns of the full list representation: plain columns for the fast path, else the entity."""
+    if fast:
+        return select(Resume.id, Resume.title, Resume.content, Resume.version, snippet.label("snippet"))
+    return select(Resume, snippet.label("snippet"))
+
+
+def resume_page(
+    stmt: Select,
+    filters: list[ColumnElement[bool]],
+    per_page: int,
+    page: int = 1,
+    before_id: int | None = None,
+    order_by: tuple[ColumnElement, ...] = (),
+) -> Select:
+    """One page (plus one row to detect a next page), by offset or before a keyset cursor."""
+    stmt = stmt.where(*filters).order_by(*order_by, Resume.id.desc()).limit(per_page + 1)
+    if before_id is not None:
+        return stmt.where(Resume.id < before_id)
+    return stmt.offset((page - 1) * per_page)
@@ -0,0 +1,200 @@
+"""Compact storage for resume revisions.
+
+Every REVISION_KEYFRAME_INTERVAL-th version (1, 1+N, 1+2N, ...) is a keyframe
+stored as a zlib-compressed full snapshot. The versions in between are
+compressed with the keyframe text as a zlib preset dictionary, which makes
+near-identical revisions cost a few dozen bytes. Reading any version needs at
+most the row itself and its keyframe. The write path stores new revisions
+"plain" (a single INSERT ... SELECT, no keyframe read under the row lock) and
+they are read as-is until compact_revisions() converts them: in the
+background maintenance loop (app.db.purge) or via manage.py.
+"""
+import zlib
+from typing import Iterable, Sequence
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    REVISION_KEYFRAME_INTERVAL, REVISION_CACHE_SIZE, REVISION_CACHE_TTL_SECONDS, REVISION_BODY_CACHE_SIZE,
+)
+from app.db.models import ResumeRevision
+from app.utils.cache import TTLCache
+
+PLAIN = "plain"
+FULL = "full"
+DELTA = "delta"
+
+COMPRESSION_LEVEL = 6
+
+# (resume_id, version) -> materialized content; revisions are immutable
+revision_cache: TTLCache[tuple[int, int], str] = TTLCache(REVISION_CACHE_SIZE, REVISION_CACHE_TTL_SECONDS)
+# (resume_id, version) -> encoded JSON body of the single-revision endpoint
+revision_body_cache: TTLCache[tuple[int, int], bytes] = TTLCache(REVISION_BODY_CACHE_SIZE, REVISION_CACHE_TTL_SECONDS)
+
+
+def keyframe_version(version: int, interval: int = REVISION_KEYFRAME_INTERVAL) -> int:
+    return version - (version - 1) % max(interval, 1)
+
+
+def encode(content: str, base: str | None = None) -> tuple[str, bytes]:
+    if base is None:
+        return FULL, zlib.compress(content.encode(), COMPRESSION_LEVEL)
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=base.encode())
+    return DELTA, compressor.compress(content.encode()) + compressor.flush()
+
+
+def decode(storage: str, payload: bytes | None, content: str | None, base: str | None = None) -> str:
+    if storage == PLAIN:
+        return content
+    if storage == FULL:
+        return zlib.decompress(payload).decode()
+    if storage == DELTA:
+        decompressor = zlib.decompressobj(zdict=base.encode())
+        return (decompressor.decompress(payload) + decompressor.flush()).decode()
+    raise ValueError(f"unknown revision storage: {storage!r}")
+
+
+def stored_size(rev: ResumeRevision) -> int:
+    return len(rev.payload) if rev.payload is not None else len((rev.content or "").encode())
+
+
+def encode_history(texts: Sequence[str]) -> list[dict]:
+    """Column values for revisions 1..len(texts) of one resume, oldest first, without touching the DB."""
+    rows = []
+    for version, text in enumerate(texts, 1):
+        base_version = keyframe_version(version)
+        base = texts[base_version - 1] if base_version != version else None
+        storage, payload = encode(text, base)
+        rows.append({
+            "version": version, "storage": storage, "payload": payload, "content": None,
+            "base_version": base_version if storage == DELTA else None, "content_length": len(text),
+        })
+    return rows
+
+
+async def _fetch(db: AsyncSession, resume_id: int, versions: Iterable[int]) -> list[ResumeRevision]:
+    versions = list(versions)
+    if not versions:
+        return []
+    stmt = select(ResumeRevision).where(
+        ResumeRevision.resume_id == resume_id, ResumeRevision.version.in_(versions)
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def materialize(db: AsyncSession, revisions: Sequence[ResumeRevision]) -> dict[tuple[int, int], str]:
+    """Return {(resume_id, version): content} for the given rows, loading missing keyframes in bulk."""
+    out: dict[tuple[int, int], str] = {}
+    bases_needed: dict[int, set[int]] = {}
+    for rev in revisions:
+        key = (rev.resume_id, rev.version)
+        cached = revision_cache.get(key)
+        if cached is not None:
+            out[key] = cached
+        elif rev.storage == DELTA:
+            bases_needed.setdefault(rev.resume_id, set()).add(rev.base_version)
+        else:
+            out[key] = decode(rev.storage, rev.payload, rev.content)
+            revision_cache.set(key, out[key])
+
+    bases: dict[tuple[int, int], str] = {}
+    for resume_id, versions in bases_needed.items():
+        missing = []
+        for version in versions:
+            key = (resume_id, version)
+            text = out[key] if key in out else revision_cache.get(key)
+            if text is None:
+                missing.append(version)
+            else:
+                bases[key] = text
+        for base in await _fetch(db, resume_id, missing):
+            key = (base.resume_id, base.version)
+            bases[key] = decode(base.storage, base.payload, base.content)
+            revision_cache.set(key, bases[key])
+
+    for rev in revisions:
+        key = (rev.resume_id, rev.version)
+        if key not in out:
+            out[key] = decode(rev.storage, rev.payload, rev.content, bases[(rev.resume_id, rev.base_version)])
+            revision_cache.set(key, out[key])
+    return out
+
+
+async def load_content(db: AsyncSession, resume_id: int, version: int) -> str | None:
+    """Materialized content of one revision, or None if it doesn't exist."""
+    text = revision_cache.get((resume_id, version))
+    if text is not None:
+        return text
+    rows = await _fetch(db, resume_id, [version])
+    return (await materialize(db, rows))[(resume_id, version)] if rows else None
+
+
+async def content_lengths(db: AsyncSession, resume_id: int, versions: Iterable[int]) -> dict[int, int]:
+    """{version: len(content)} for rows without a stored content_length (compacted before it existed)."""
+    rows = await _fetch(db, resume_id, versions)
+    contents = await materialize(db, rows)
+    return {version: len(text) for (_, version), text in contents.items()}
+
+
+async def _keyframe_text(db: AsyncSession, resume_id: int, version: int) -> str | None:
+    text = revision_cache.get((resume_id, version))
+    if text is not None:
+        return text
+    rows = await _fetch(db, resume_id, [version])
+    if not rows or rows[0].storage == DELTA:
+        return None
+    return (await materialize(db, rows))[(resume_id, version)]
+
+
+async def encode_revision(db: AsyncSession, resume_id: int, version: int, content: str) -> dict:
+    """Column values for storing `content` as revision `version` of the resume."""
+    base_version = keyframe_version(version)
+    base = None
+    if base_version != version:
+        base = await _keyframe_text(db, resume_id, base_version)
+    storage, payload = encode(content, base)
+    revision_cache.set((resume_id, version), content)
+    return {
+        "storage": storage,
+        "payload": payload,
+        "content": None,
+        "base_version": base_version if storage == DELTA else None,
+        "content_length": len(content),
+    }
+
+
+async def make_revision(db: AsyncSession, resume_id: int, version: int, content: str) -> ResumeRevision:
+    return ResumeRevision(
+        resume_id=resume_id, version=version,
+        **await encode_revision(db, resume_id, version, content),
+    )
+
+
+async def compact_revisions(
+    db: AsyncSession, batch_size: int = 500, after: tuple[int, int] = (0, 0),
+) -> tuple[int, tuple[int, int]]:
+    """Convert one batch of plain rows in place, walking (resume_id, version) from `after`.
+
+    Returns (converted, cursor); pass the cursor back for the next batch until converted == 0.
+    """
+    stmt = (
+        select(ResumeRevision)
+        .where(
+            tuple_(ResumeRevision.resume_id, ResumeRevision.version) > tuple_(*after),
+            ResumeRevision.storage == PLAIN,
+        )
+        .order_by(ResumeRevision.resume_id, ResumeRevision.version)
+        .limit(batch_size)
+        # compactors in several workers split the rows instead of encoding them twice
+        .with_for_update(skip_locked=True)
+    )
+    rows = list((await db.execute(stmt)).scalars().all())
+    for rev in rows:
+        # keyframes sort before their deltas, so later rows of a batch reuse the cached keyframe text
+        values = await encode_revision(db, rev.resume_id, rev.version, rev.content)
+        for name, value in values.items():
+            setattr(rev, name, value)
+    await db.flush()
+    cursor = (rows[-1].resume_id, rows[-1].version) if rows else after
+    return len(rows), cursor
@@ -0,0 +1,98 @@
+"""Routing of read-only handlers to the read engine (see app.db.connect).
+
+get_read_session serves safe GET handlers from ReadSessionLocal and never
+commits. A user who wrote within READ_YOUR_WRITES_SECONDS is pinned to the
+primary so they see their own write despite replication lag. The marker lives
+in-process and, when the response cache has a shared backend, there too, so
+it holds across gunicorn workers.
+
+check_shared_state refuses to start several workers whose per-process state
+would disagree: a "memory" response cache (invalidated only in the worker that
+took the write) or a replica without a shared backend for the markers.
+"""
+import logging
+from typing import AsyncGenerator
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import DB_REPLICA_HOST, READ_YOUR_WRITES_SECONDS, WEB_CONCURRENCY
+from app.db.connect import ReadSessionLocal
+from app.db.deps import get_session_factory
+from app.utils.cache import TTLCache
+from app.utils.current import Principal, get_principal
+from app.utils.response_cache import CacheBackend, MemoryBackend, response_cache
+
+logger = logging.getLogger(__name__)
+
+
+class RecentWrites:
+    """Per-user "wrote recently" markers that expire after `window` seconds."""
+
+    def __init__(self, window: float, shared: CacheBackend | None = None, maxsize: int = 100_000):
+        self.window = window
+        self.shared = shared
+        self._local: TTLCache[int, bool] = TTLCache(maxsize, window)
+
+    async def mark(self, user_id: int) -> None:
+        self._local.set(user_id, True)
+        if self.shared is not None:
+            try:
+                await self.shared.set(f"rw:{user_id}", b"1", self.window)
+            except Exception:
+                logger.warning("Recent-write marker not shared; user=%s", user_id, exc_info=True)
+
+    async def contains(self, user_id: int) -> bool:
+        if user_id in self._local:
+            return True
+        if self.shared is None:
+            return False
+        try:
+            return await self.shared.get(f"rw:{user_id}") is not None
+        except Exception:
+            # can't tell: the primary is always safe
+            return True
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+def _shared_backend() -> CacheBackend | None:
+    backend = response_cache.backend
+    return None if backend is None or isinstance(backend, MemoryBackend) else backend
+
+
+recent_writes = RecentWrites(READ_YOUR_WRITES_SECONDS, _shared_backend())
+
+
+def check_shared_state(workers: int = WEB_CONCURRENCY, replica: str = DB_REPLICA_HOST) -> None:
+    """Raise RuntimeError if `workers` processes would serve stale reads to a user after their own write."""
+    if workers <= 1:
+        return
+    if isinstance(response_cache.backend, MemoryBackend):
+        raise RuntimeError(
+            f"RESPONSE_CACHE_BACKEND=memory is per process; use redis://... or none with WEB_CONCURRENCY={workers}"
+        )
+    if replica and recent_writes.shared is None:
+        raise RuntimeError(
+            f"DB_REPLICA_HOST with WEB_CONCURRENCY={workers} needs RESPONSE_CACHE_BACKEND=redis://... "
+            "to keep users on the primary after their writes"
+        )
+
+
+def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    return ReadSessionLocal
+
+
+async def get_read_session(
+    user: Principal = Depends(get_principal),
+    read_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+    primary_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for handlers that only read; the transaction is rolled back, never committed."""
+    factory = primary_factory if await recent_writes.contains(user.id) else read_factory
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
@@ -0,0 +1,83 @@
+"""Resume search: substring (title) and full-text (title + content) matching.
+
+Snippets are HTML: the user's text is escaped and only the matches are
+wrapped in <mark>, so a client can render them as markup.
+"""
+import html
+import re
+from dataclasses import dataclass
+from typing import Literal
+
+from sqlalchemy import case, func, literal_column, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models import Resume
+
+SearchMode = Literal["substring", "fts"]
+
+# must match the expression of resumes.search_vector in the migration
+TS_CONFIG = "simple"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+SNIPPET_RADIUS = 80
+HTML_ENTITIES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+
+@dataclass
+class ResumeSearch:
+    where: ColumnElement
+    rank: ColumnElement
+    snippet: ColumnElement | None = None
+
+
+def html_escape(text: ColumnElement) -> ColumnElement:
+    """html.escape in SQL ("&" first, so entities aren't escaped twice)."""
+    for char, entity in HTML_ENTITIES:
+        text = func.replace(text, char, entity)
+    return text
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def build_search(q: str, mode: SearchMode, dialect: str) -> ResumeSearch:
+    pattern = _like_pattern(q)
+    title_match = Resume.title.ilike(pattern, escape="\\")
+
+    if dialect == "postgresql":
+        if mode == "fts":
+            tsq = func.websearch_to_tsquery(TS_CONFIG, q)
+            vector = literal_column("resumes.search_vector")
+            return ResumeSearch(
+                where=vector.op("@@")(tsq),
+                rank=func.ts_rank_cd(vector, tsq),
+                # escaped before ts_headline, which passes markup in the content through verbatim
+                snippet=func.ts_headline(TS_CONFIG, html_escape(Resume.content), tsq, HEADLINE_OPTIONS),
+            )
+        # ILIKE is served by the pg_trgm GIN index on title
+        return ResumeSearch(where=title_match, rank=func.similarity(Resume.title, q))
+
+    # portable fallback (SQLite test engine): plain LIKE with a coarse rank
+    if mode == "fts":
+        content_match = Resume.content.ilike(pattern, escape="\\")
+        return ResumeSearch(
+            where=or_(title_match, content_match),
+            rank=case((title_match, 2), else_=1),
+        )
+    prefix_match = Resume.title.ilike(pattern[1:], escape="\\")
+    return ResumeSearch(where=title_match, rank=case((prefix_match, 2), else_=1))
+
+
+def highlight(text: str, q: str, radius: int = SNIPPET_RADIUS) -> str | None:
+    """HTML snippet around the first match of `q` in `text`, or None without a match."""
+    m = re.search(re.escape(q), text, flags=re.IGNORECASE)
+    if not m:
+        return None
+    start, end = max(m.start() - radius, 0), min(m.end() + radius, len(text))
+    return (
+        ("…" if start else "")
+        + html.escape(text[start:m.start()]) + "<mark>" + html.escape(m.group(0)) + "</mark>"
+        + html.escape(text[m.end():end])
+        + ("…" if end < len(text) else "")
+    )
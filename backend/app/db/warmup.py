@@ -0,0 +1,60 @@
+"""Connection pool pre-warming.
+
+A fresh pooled connection pays the TCP/TLS/auth handshake, and with asyncpg
+also the dialect's first-connect setup and type introspection. Each connection
+also has its own prepared-statement cache, keyed by SQL text. warm_pool opens
+the connections up front and runs the hot statement shapes on each of them.
+The shapes come from app.db.queries, the builders the handlers use, so real
+requests hit both the engine's compiled cache and the connection's statement
+cache.
+"""
+import asyncio
+from contextlib import AsyncExitStack
+
+from sqlalchemy import null, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.sql import Executable
+
+from app.db.models import Resume, User
+from app.db.queries import list_columns, live_resumes, owned_resume, principal_row, resume_count, resume_page
+from app.utils import fastjson
+
+LIST_PER_PAGE = 10
+
+
+def hot_statements() -> list[Executable]:
+    """The most frequent handler queries; the ids match no row, only parse/plan work is done."""
+    return [
+        # get_user on a principal cache miss
+        principal_row(User.id == 0),
+        # list_resumes: total and first page in the full representation
+        resume_count(0),
+        resume_page(list_columns(null(), fastjson.enabled), live_resumes(0), LIST_PER_PAGE),
+        # get_resume, its If-None-Match probe and the write paths' ownership probe
+        select(Resume).where(*owned_resume(0, 0)),
+        select(Resume.version).where(*owned_resume(0, 0)),
+    ]
+
+
+async def _run(conn: AsyncConnection, statements: list[Executable]) -> None:
+    for stmt in statements:
+        await conn.execute(stmt)
+    await conn.rollback()
+
+
+async def warm_pool(engine: AsyncEngine, connections: int, statements: list[Executable] | None = None) -> int:
+    """Open `connections` connections at once, run `statements` on each and return them to the pool.
+
+    Capped at pool_size: overflow connections would be closed again on checkin.
+    """
+    pool = engine.sync_engine.pool
+    size = pool.size() if hasattr(pool, "size") else 1
+    connections = min(connections, size)
+    if connections <= 0:
+        return 0
+    statements = hot_statements() if statements is None else statements
+    async with AsyncExitStack() as stack:
+        # all held at once, otherwise the pool would hand the same connection out again
+        conns = [await stack.enter_async_context(engine.connect()) for _ in range(connections)]
+        await asyncio.gather(*(_run(conn, statements) for conn in conns))
+    return connections
@@ -0,0 +1,181 @@
+from typing import Any, Iterable
+
+from sqlalchemy import Integer, Row, String, Text, any_, bindparam, exists, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models import Resume, ResumeRevision, User
+from app.db.revisions import PLAIN
+
+RETURNING = (
+    Resume.id, Resume.title, Resume.content, Resume.user_id,
+    Resume.version, Resume.created_at, Resume.updated_at,
+)
+SNAPSHOT_COLUMNS = ["resume_id", "version", "content", "content_length", "storage"]
+
+
+async def snapshot_and_update(
+    db: AsyncSession,
+    resume_id: int,
+    user_id: int,
+    values: dict[str, Any],
+    expected_version: int | None = None,
+) -> Row | None:
+    """Copy the current row into resume_revisions and apply `values`, bumping the version.
+
+    `values` may contain SQL expressions over the old row (e.g. Resume.content + "...").
+    On PostgreSQL this is a single statement:
+
+        WITH old AS (SELECT ... FOR UPDATE),
+             rev AS (INSERT INTO resume_revisions SELECT ... FROM old)
+        UPDATE resumes ... FROM old RETURNING ...
+
+    With `expected_version` the write is optimistic instead: no FOR UPDATE and the UPDATE
+    is conditioned on the version. Either way the snapshot is only inserted if the UPDATE hit.
+
+    Returns the updated row, or None if the resume doesn't exist, isn't owned by the user
+    or is no longer at `expected_version`. revision_count is bumped by the same UPDATE.
+    Revisions are written as "plain" rows; `manage.py compact-revisions` encodes them later.
+    """
+    owned = [Resume.id == resume_id, Resume.user_id == user_id, Resume.live]
+    if expected_version is not None:
+        owned.append(Resume.version == expected_version)
+    changes = {**values, "version": Resume.version + 1, "revision_count": Resume.revision_count + 1}
+
+    if db.bind.dialect.name == "postgresql":
+        old = select(Resume.id, Resume.version, Resume.content).where(*owned)
+        if expected_version is None:
+            # after waiting for the lock `old` is the newest row, while the UPDATE's own scan still
+            # sees the statement snapshot: match on id only, the lock already pins the version
+            old = old.with_for_update().cte("old")
+            matches = [Resume.id == old.c.id]
+        else:
+            old = old.cte("old")
+            matches = [Resume.id == old.c.id, Resume.version == old.c.version]
+        upd = update(Resume).where(*matches).values(**changes).returning(*RETURNING).cte("upd")
+        snapshot = (
+            select(old.c.id, old.c.version, old.c.content, func.length(old.c.content), literal(PLAIN))
+            .where(exists(select(upd.c.id)))
+        )
+        rev = insert(ResumeRevision).from_select(SNAPSHOT_COLUMNS, snapshot).cte("rev")
+        stmt = select(upd).add_cte(rev)
+        return (await db.execute(stmt)).first()
+
+    # portable fallback (SQLite has no data-modifying CTEs): two statements
+    snapshot = insert(ResumeRevision).from_select(
+        SNAPSHOT_COLUMNS,
+        select(Resume.id, Resume.version, Resume.content, func.length(Resume.content), literal(PLAIN)).where(*owned),
+    )
+    if not (await db.execute(snapshot)).rowcount:
+        return None
+    stmt = update(Resume).where(*owned).values(**changes).returning(*RETURNING)
+    return (await db.execute(stmt)).first()
+
+
+def id_in(column: ColumnElement, ids: Iterable[int], dialect: str) -> ColumnElement:
+    """`column = ANY(:ids)` on PostgreSQL (one array parameter, stable statement text), IN elsewhere."""
+    ids = list(ids)
+    if dialect == "postgresql":
+        return column == any_(literal(ids, ARRAY(Integer)))
+    return column.in_(ids)
+
+
+async def lock_owned(db: AsyncSession, user_id: int, ids: Iterable[int]) -> set[int]:
+    """Return which of `ids` belong to the user, locking those rows in id order."""
+    ids = list(ids)
+    if not ids:
+        return set()
+    stmt = (
+        select(Resume.id)
+        .where(Resume.user_id == user_id, Resume.live, id_in(Resume.id, ids, db.bind.dialect.name))
+        .order_by(Resume.id)
+        .with_for_update()
+    )
+    return set((await db.execute(stmt)).scalars().all())
+
+
+async def adjust_resume_count(db: AsyncSession, user_id: int, delta: int) -> None:
+    """Apply `delta` to users.resume_count; call in the transaction that inserted or deleted the rows.
+
+    The increment is relative, so concurrent writers serialize on the user row instead of
+    overwriting each other's counts.
+    """
+    if delta:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(resume_count=User.resume_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def bulk_create(db: AsyncSession, user_id: int, items: list[dict[str, Any]]) -> list[Row]:
+    """Multi-row INSERT ... RETURNING; rows come back in the order of `items`."""
+    if not items:
+        return []
+    stmt = insert(Resume).returning(*RETURNING, sort_by_parameter_order=True)
+    params = [{"title": item["title"], "content": item["content"], "user_id": user_id} for item in items]
+    rows = list((await db.execute(stmt, params)).all())
+    await adjust_resume_count(db, user_id, len(rows))
+    return rows
+
+
+async def bulk_snapshot_and_update(
+    db: AsyncSession, user_id: int, changes: dict[int, dict[str, Any]],
+) -> dict[int, Row]:
+    """Snapshot all affected rows with one INSERT ... SELECT, then apply per-row changes.
+
+    Rows must already be locked and owned (see lock_owned); missing keys in a change keep the old value.
+    """
+    if not changes:
+        return {}
+    dialect = db.bind.dialect.name
+    owned = (Resume.user_id == user_id, Resume.live, id_in(Resume.id, changes, dialect))
+    await db.execute(
+        insert(ResumeRevision).from_select(
+            SNAPSHOT_COLUMNS,
+            select(
+                Resume.id, Resume.version, Resume.content, func.length(Resume.content), literal(PLAIN),
+            ).where(*owned),
+        )
+    )
+    table = Resume.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            title=func.coalesce(bindparam("b_title", type_=String), table.c.title),
+            content=func.coalesce(bindparam("b_content", type_=Text), table.c.content),
+            version=table.c.version + 1,
+            revision_count=table.c.revision_count + 1,
+        )
+    )
+    await db.execute(stmt, [
+        {"b_id": rid, "b_title": change.get("title"), "b_content": change.get("content")}
+        for rid, change in changes.items()
+    ])
+    rows = (await db.execute(select(*RETURNING).where(*owned))).all()
+    return {row.id: row for row in rows}
+
+
+async def bulk_delete(db: AsyncSession, user_id: int, ids: Iterable[int]) -> set[int]:
+    """Tombstone the user's resumes among `ids`; returns the ids that were live.
+
+    One UPDATE regardless of history size: the rows and their revisions are removed
+    later, in small batches, by app.db.purge.
+    """
+    ids = list(ids)
+    if not ids:
+        return set()
+    stmt = (
+        update(Resume)
+        .where(Resume.user_id == user_id, Resume.live, id_in(Resume.id, ids, db.bind.dialect.name))
+        .values(deleted_at=func.now())
+        .returning(Resume.id)
+        .execution_options(synchronize_session=False)
+    )
+    # counted from RETURNING: a row deleted concurrently by someone else is not decremented twice
+    deleted = set((await db.execute(stmt)).scalars().all())
+    await adjust_resume_count(db, user_id, -len(deleted))
+    return deleted
@@ -0,0 +1,57 @@
+"""Worker liveness, readiness and startup timing.
+
+/healthz answers as soon as the event loop runs. /readyz stays 503 until
+start_worker has created the engines and warmed DB_POOL_PREWARM connections
+per engine, and goes back to 503 once shutdown begins, so a load balancer only
+routes to warm workers during a rolling deploy. The time spent in each phase is
+logged and exported as worker_startup_seconds{phase}.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.warmup import warm_pool
+from app.metrics import worker_startup
+
+logger = logging.getLogger(__name__)
+
+WARMUP_RETRY_SECONDS = 1.0
+
+
+@dataclass
+class Startup:
+    ready: bool = False
+    phases: dict[str, float] = field(default_factory=dict)
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = seconds
+        worker_startup.labels(phase).set(seconds)
+
+
+startup = Startup()
+
+
+async def start_worker(engines: list[AsyncEngine], connections: int, started: float) -> None:
+    """Warm the pools, then mark the worker ready; `started` is the perf_counter() of the worker start.
+
+    Retries until the database answers: the worker stays live but not ready meanwhile.
+    """
+    warm_started = time.perf_counter()
+    while True:
+        try:
+            opened = [await warm_pool(engine, connections) for engine in engines]
+            break
+        except Exception:
+            logger.warning("Pool warm-up failed, retrying in %ss", WARMUP_RETRY_SECONDS, exc_info=True)
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+    now = time.perf_counter()
+    startup.record("warmup", now - warm_started)
+    startup.record("total", now - started)
+    startup.ready = True
+    logger.info(
+        "Worker ready in %.0fms (warm-up %.0fms, connections per engine %s)",
+        (now - started) * 1000, (now - warm_started) * 1000, opened,
+    )
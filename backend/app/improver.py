@@ -0,0 +1,28 @@
+"""Pluggable resume improvers used by improve jobs (see app.jobs).
+
+An improver is any object with ``async def improve(title, content) -> str``.
+IMPROVER in app.config selects one by "module:attribute"; a class is
+instantiated without arguments. CPU-bound implementations should move their
+work off the event loop themselves (e.g. asyncio.to_thread).
+"""
+import importlib
+from typing import Protocol
+
+IMPROVED_SUFFIX = " [Improved]"
+
+
+class Improver(Protocol):
+    async def improve(self, title: str, content: str) -> str: ...
+
+
+class SuffixImprover:
+    """Local deterministic stand-in: the same edit the synchronous endpoint makes."""
+
+    async def improve(self, title: str, content: str) -> str:
+        return content + IMPROVED_SUFFIX
+
+
+def load_improver(path: str) -> Improver:
+    module_name, _, attr = path.partition(":")
+    obj = getattr(importlib.import_module(module_name), attr)
+    return obj() if isinstance(obj, type) else obj
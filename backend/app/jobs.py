@@ -0,0 +1,237 @@
+"""Background improve jobs.
+
+POST /resume/{id}/improve?async=true records a Job row and hands it to the
+in-process JobRunner. The job reads the resume at the submitted version, runs
+the improver with no DB connection or row lock held, then applies the result
+with a version-checked write (snapshot_and_update with expected_version) in
+the same transaction that marks the job finished. If the resume moved on in
+the meantime the job ends as "conflict" and nothing is written.
+
+Job state lives in the database so GET /jobs/{id} works from any worker
+process; a partial unique index on in-flight (resume_id, base_version, kind)
+makes duplicate submissions coalesce onto the existing job. GET /jobs/{id}
+reads from the replica, so the submission and every status change mark the
+user as a recent writer (app.db.routing) once committed.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import IMPROVER, IMPROVE_WORKERS, IMPROVE_QUEUE_LIMIT, IMPROVE_JOB_TIMEOUT_SECONDS
+from app.db.models import Job, Resume
+from app.db.models.job import CONFLICT, FAILED, IN_FLIGHT, QUEUED, RUNNING, SUCCEEDED
+from app.db.writes import snapshot_and_update
+from app.db.routing import recent_writes
+from app.improver import Improver, load_improver
+from app.utils.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+IMPROVE = "improve"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobRunner:
+    """Bounded pool of asyncio workers for background jobs.
+
+    At most ``workers`` jobs run at once and at most ``queue_limit`` more may
+    wait; reserve() rejects anything beyond that with JobQueueFull. Workers
+    start lazily on the running loop, so each (forked) process gets its own.
+    """
+
+    def __init__(self, workers: int = 4, queue_limit: int = 100):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_limit
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._tasks = [loop.create_task(self._work(self._queue)) for _ in range(self.workers)]
+            self.pending = 0
+        return self._queue
+
+    def reserve(self) -> None:
+        """Claim a slot before doing any work for a new job; release() it if the job isn't submitted."""
+        self._ensure_started()
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise JobQueueFull()
+        self.pending += 1
+
+    def release(self) -> None:
+        self.pending -= 1
+
+    def submit(self, job: Callable[[], Awaitable[None]]) -> None:
+        """Queue a job for which reserve() succeeded."""
+        self._queue.put_nowait(job)
+
+    async def _work(self, q: asyncio.Queue) -> None:
+        while True:
+            job = await q.get()
+            try:
+                await job()
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Background job crashed")
+            finally:
+                self.pending -= 1
+                q.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued job has finished."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "queue_depth": max(self.pending - self.workers, 0),
+            "in_flight": min(self.pending, self.workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queue, self._loop = [], None, None
+        self.pending = 0
+
+
+job_runner = JobRunner(IMPROVE_WORKERS, IMPROVE_QUEUE_LIMIT)
+improver: Improver = load_improver(IMPROVER)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _in_flight(db: AsyncSession, resume_id: int, version: int) -> Job | None:
+    return await db.scalar(select(Job).where(
+        Job.resume_id == resume_id, Job.base_version == version, Job.kind == IMPROVE, Job.status.in_(IN_FLIGHT),
+    ))
+
+
+async def submit_improve(
+    session_factory: async_sessionmaker[AsyncSession], user_id: int, resume_id: int, version: int,
+) -> tuple[Job, bool]:
+    """Start (or join) the improve job for this version of the resume.
+
+    Returns (job, created); created is False when an in-flight job for the
+    same (resume_id, version) already existed. Raises JobQueueFull.
+    """
+    async with session_factory() as db:
+        job = await _in_flight(db, resume_id, version)
+        if job is not None:
+            # created_at comes back naive from SQLite
+            created = job.created_at if job.created_at.tzinfo else job.created_at.replace(tzinfo=timezone.utc)
+            if created > _now() - timedelta(seconds=IMPROVE_JOB_TIMEOUT_SECONDS):
+                return job, False
+            logger.warning("Improve job abandoned: job=%s resume_id=%s", job.id, resume_id)
+            job.status, job.error, job.finished_at = FAILED, "abandoned", _now()
+            await db.flush()
+
+        job_runner.reserve()
+        job = Job(
+            id=uuid.uuid4().hex, kind=IMPROVE, user_id=user_id,
+            resume_id=resume_id, base_version=version, status=QUEUED,
+        )
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # lost the race to a concurrent submission of the same version
+            job_runner.release()
+            await db.rollback()
+            existing = await _in_flight(db, resume_id, version)
+            if existing is None:
+                raise
+            return existing, False
+        except BaseException:
+            job_runner.release()
+            raise
+        await recent_writes.mark(user_id)
+        job_runner.submit(lambda: run_improve(session_factory, job.id))
+        return job, True
+
+
+async def run_improve(session_factory: async_sessionmaker[AsyncSession], job_id: str) -> None:
+    async with session_factory() as db:
+        job = await db.get(Job, job_id)
+        resume = (await db.execute(
+            select(Resume.title, Resume.content)
+            .where(
+                Resume.id == job.resume_id, Resume.user_id == job.user_id, Resume.live,
+                Resume.version == job.base_version,
+            )
+        )).first()
+        if resume is None:
+            job.status, job.finished_at = CONFLICT, _now()
+            await db.commit()
+            await recent_writes.mark(job.user_id)
+            logger.info("Improve job skipped, resume changed: job=%s resume_id=%s", job.id, job.resume_id)
+            return
+        job.status, job.started_at = RUNNING, _now()
+        await db.commit()
+    await recent_writes.mark(job.user_id)
+
+    try:
+        improved = await improver.improve(resume.title, resume.content)
+    except Exception as exc:
+        logger.exception("Improve job failed: job=%s resume_id=%s", job_id, job.resume_id)
+        await _finish(session_factory, job_id, job.user_id, FAILED, error=str(exc) or type(exc).__name__)
+        return
+
+    async with session_factory() as db:
+        row = await snapshot_and_update(
+            db, job.resume_id, job.user_id, {"content": improved}, expected_version=job.base_version,
+        )
+        await db.execute(update(Job).where(Job.id == job_id).values(
+            status=SUCCEEDED if row else CONFLICT,
+            result_version=row.version if row else None,
+            finished_at=_now(),
+        ))
+        await db.commit()
+    await recent_writes.mark(job.user_id)
+    if row:
+        await response_cache.invalidate_user(job.user_id)
+    logger.info(
+        "Improve job done: job=%s resume_id=%s status=%s v->%s",
+        job_id, job.resume_id, SUCCEEDED if row else CONFLICT, row.version if row else None,
+    )
+
+
+async def _finish(
+    session_factory: async_sessionmaker[AsyncSession], job_id: str, user_id: int, status: str, **values,
+) -> None:
+    async with session_factory() as db:
+        await db.execute(update(Job).where(Job.id == job_id).values(status=status, finished_at=_now(), **values))
+        await db.commit()
+    await recent_writes.mark(user_id)
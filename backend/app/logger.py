@@ -1,17 +1,159 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import random
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 from pathlib import Path
 
+from app.config import LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLING
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
 LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
-formatter = logging.Formatter(
-    "%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of INFO-and-below records per logger (and its children).
+
+    Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+        self._resolved: dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate, probe = 1.0, name
+            while probe:
+                if probe in self.rates:
+                    rate = self.rates[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that can be shared by several worker processes.
+
+    Rollover happens under an exclusive lock file and re-checks the size, so
+    only one process rotates; the others notice the new inode and reopen.
+    """
+
+    def __init__(self, filename, *args, **kwargs):
+        super().__init__(filename, *args, **kwargs)
+        self.lock_path = f"{self.baseFilename}.lock"
+
+    def _rotated_elsewhere(self) -> bool:
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self.stream.fileno())
+        return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
 
-file_handler = RotatingFileHandler(
+    def _reopen_if_rotated(self) -> None:
+        if self.stream is not None and self._rotated_elsewhere():
+            self.stream.close()
+            self.stream = self._open()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._reopen_if_rotated()
+        except OSError:
+            pass
+        super().emit(record)
+
+    def doRollover(self) -> None:
+        if fcntl is None:
+            super().doRollover()
+            return
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if self.stream is not None and self._rotated_elsewhere():
+                    self._reopen_if_rotated()
+                else:
+                    super().doRollover()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def parse_sampling(spec: str) -> dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+if LOG_FORMAT == "json":
+    formatter = JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S%z")
+else:
+    formatter = logging.Formatter(
+        "%(asctime)s [%(levelname)s] [%(name)s] [%(request_id)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+file_handler = SharedRotatingFileHandler(
     LOG_DIR / "app.log", maxBytes=5_000_000, backupCount=5, encoding="utf-8"
 )
 file_handler.setFormatter(formatter)
@@ -21,9 +163,55 @@ console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setFormatter(formatter)
 console_handler.setLevel(logging.DEBUG)
 
+# The event loop only enqueues records; formatting and I/O happen on the listener thread.
+log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = BoundedQueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+queue_handler.addFilter(RequestIdFilter())
+sampling_filter = SamplingFilter(parse_sampling(LOG_SAMPLING))
+queue_handler.addFilter(sampling_filter)
+
+listener: QueueListener | None = None
+
+
+def start_log_listener() -> None:
+    global listener
+    if listener is None:
+        listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+
+
+def stop_log_listener() -> None:
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def _restart_after_fork() -> None:
+    # the listener thread does not survive fork() and the queue's lock may be held
+    global listener, log_queue
+    listener = None
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler.queue = log_queue
+    start_log_listener()
+
+
+def log_queue_stats() -> dict:
+    return {
+        "depth": log_queue.qsize(),
+        "capacity": log_queue.maxsize,
+        "dropped": queue_handler.dropped,
+        "sampled_out": sampling_filter.sampled_out,
+    }
+
+
 logging.basicConfig(
     level=logging.DEBUG,
-    handlers=[file_handler, console_handler],
+    handlers=[queue_handler],
 )
+start_log_listener()
+atexit.register(stop_log_listener)
+os.register_at_fork(after_in_child=_restart_after_fork)
 
 logger = logging.getLogger("app")
@@ -0,0 +1,203 @@
+"""Prometheus metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set (entrypoint.sh does this for gunicorn)
+prometheus_client keeps values in per-process mmap files and /metrics
+aggregates every worker; without it the metrics are per process.
+
+Request and pool metrics are updated inline (a dict lookup and an mmap write
+each). Values that are cheap to read but would otherwise need a hook on a hot
+path (log queue, hashing and job pools, response cache) are sampled every
+METRICS_SAMPLE_SECONDS by a task started from the app lifespan.
+"""
+import asyncio
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import METRICS_SAMPLE_SECONDS
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "Requests currently being handled", ["method"], multiprocess_mode="livesum",
+)
+
+# engine: "primary" (writes) or "read" (replica / read-only connections), see app.db.connect
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", ["engine"],
+    buckets=WAIT_BUCKETS,
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out", "DB connections currently checked out", ["engine"], multiprocess_mode="livesum",
+)
+db_pool_overflow = Gauge(
+    "db_pool_overflow", "DB connections open beyond pool_size", ["engine"], multiprocess_mode="livesum",
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up waiting for a connection", ["engine"],
+)
+
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time including executor queueing",
+    ["op"], buckets=HASH_BUCKETS,
+)
+password_hash_rejected = Counter("password_hash_rejected_total", "Hash requests rejected because the queue was full")
+
+log_queue_depth = Gauge("log_queue_depth", "Records waiting in the log queue", multiprocess_mode="livesum")
+log_records_dropped = Gauge("log_records_dropped", "Log records dropped because the queue was full",
+                            multiprocess_mode="livesum")
+hash_queue_depth = Gauge("password_hash_queue_depth", "Hashes waiting for an executor worker",
+                         multiprocess_mode="livesum")
+job_queue_depth = Gauge("job_queue_depth", "Background jobs waiting for a worker", multiprocess_mode="livesum")
+admission_rejected = Counter(
+    "admission_rejected_total", "Requests shed by admission control", ["reason", "priority"],
+)
+admission_wait = Histogram(
+    "admission_wait_seconds", "Time spent queued for admission", ["priority"], buckets=WAIT_BUCKETS,
+)
+admission_in_flight = Gauge(
+    "admission_in_flight", "Admitted requests currently running", multiprocess_mode="livesum",
+)
+worker_startup = Gauge(
+    "worker_startup_seconds", "Worker startup time by phase", ["phase"], multiprocess_mode="liveall",
+)
+purge_rows = Counter("purge_rows_total", "Rows removed by the tombstone purger", ["table"])
+revisions_compacted = Counter("revisions_compacted_total", "Plain revisions encoded by the background compactor")
+purge_batch_duration = Histogram(
+    "purge_batch_duration_seconds", "Duration of one purge transaction", buckets=LATENCY_BUCKETS,
+)
+# every worker sees the same backlog
+purge_backlog = Gauge("purge_backlog_resumes", "Tombstoned resumes not yet purged", multiprocess_mode="max")
+response_cache_lookups = Gauge("response_cache_lookups", "Response cache lookups by result", ["result"],
+                               multiprocess_mode="livesum")
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection (labelled by instrument_pool)."""
+
+    engine_label = "primary"
+
+    def recreate(self) -> "TimedQueuePool":
+        # engine.dispose() swaps in a new pool; keep reporting under the same label
+        pool = super().recreate()
+        pool.engine_label = self.engine_label
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts.labels(self.engine_label).inc()
+            raise
+        finally:
+            db_pool_checkout_wait.labels(self.engine_label).observe(time.perf_counter() - started)
+
+
+def instrument_pool(engine: AsyncEngine, label: str = "primary") -> None:
+    pool = engine.sync_engine.pool
+    pool.engine_label = label
+    checked_out_gauge = db_pool_checked_out.labels(label)
+    overflow_gauge = db_pool_overflow.labels(label)
+    checked_out = 0
+
+    # the checkin event fires before the pool's own counters drop, so count here
+    def on_checkout(*_):
+        nonlocal checked_out
+        checked_out += 1
+        checked_out_gauge.set(checked_out)
+        overflow_gauge.set(max(checked_out - pool.size(), 0))
+
+    def on_checkin(*_):
+        nonlocal checked_out
+        checked_out -= 1
+        checked_out_gauge.set(checked_out)
+        overflow_gauge.set(max(checked_out - pool.size(), 0))
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # labelled children are looked up once; labels() takes a lock and builds a tuple per call
+        self._durations: dict[tuple[str, str, int], Histogram] = {}
+        self._in_progress: dict[str, Gauge] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = self._in_progress.get(method)
+        if in_progress is None:
+            in_progress = self._in_progress[method] = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # the route template, not the raw path, keeps label cardinality bounded
+            key = (method, getattr(scope.get("route"), "path", "unmatched"), status_code)
+            duration = self._durations.get(key)
+            if duration is None:
+                duration = self._durations[key] = http_request_duration.labels(key[0], key[1], str(status_code))
+            duration.observe(time.perf_counter() - started)
+
+
+def sample() -> None:
+    from app.jobs import job_runner
+    from app.logger import log_queue_stats
+    from app.utils.hashing import hash_executor
+    from app.utils.response_cache import response_cache
+
+    logs = log_queue_stats()
+    log_queue_depth.set(logs["depth"])
+    log_records_dropped.set(logs["dropped"])
+    hash_queue_depth.set(hash_executor.stats()["queue_depth"])
+    job_queue_depth.set(job_runner.stats()["queue_depth"])
+    cache = response_cache.stats()
+    for result in ("hits", "misses", "coalesced"):
+        response_cache_lookups.labels(result).set(cache[result])
+
+
+async def run_sampler(interval: float = METRICS_SAMPLE_SECONDS) -> None:
+    while True:
+        sample()
+        await asyncio.sleep(interval)
+
+
+def render() -> tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,19 +1,100 @@
-from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import time
+import uuid
+
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.logger import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.db import profiler
+from app.logger import logger, request_id_var
+from app.metrics import MetricsMiddleware
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class LoggingMiddleware:
+    """Pure ASGI request logging: request id propagation, status, size and wall time.
+
+    Unlike BaseHTTPMiddleware it doesn't wrap the app in an extra task or
+    re-stream the body, so streaming responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:MAX_REQUEST_ID_LENGTH]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        method, path = scope["method"], scope["path"]
+        status_code = 500
+        size = 0
+        started = time.perf_counter()
 
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()), (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+                ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info("→ %s %s", request.method, request.url.path)
+        logger.info("→ %s %s", method, path)
         try:
-            response = await call_next(request)
-            logger.info("← %s %s %s", request.method, request.url.path, response.status_code)
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception:
-            logger.exception("Error during request: %s %s", request.method, request.url.path)
+            logger.exception("Error during request: %s %s", method, path)
             raise
+        else:
+            logger.info(
+                "← %s %s %s %sB %.1fms",
+                method, path, status_code, size, (time.perf_counter() - started) * 1000,
+            )
+        finally:
+            request_id_var.reset(token)
+
+
+class ProfilingMiddleware:
+    """Per-request SQL profile: Server-Timing header and a warning for repeated statement shapes.
+
+    A pass-through unless the profiler is installed on the engine (SQL_PROFILING).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with profiler.profile_queries() as profile:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", ()), (b"server-timing", profile.server_timing().encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for shape, count in profile.repeated().items():
+            logger.warning(
+                "Possible N+1: %s %s ran %s times: %s", scope["method"], scope["path"], count, shape[:300],
+            )
 
 
 def setup_middleware(app: FastAPI):
@@ -26,5 +107,8 @@ def setup_middleware(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Request-ID", "ETag", "Server-Timing"],
     )
+    app.add_middleware(ProfilingMiddleware)
     app.add_middleware(LoggingMiddleware)
+    app.add_middleware(MetricsMiddleware)
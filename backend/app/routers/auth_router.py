@@ -5,7 +5,7 @@ from app.db.deps import get_session
 from app.db.models import User
 from app.schemas.requests import RegisterRequest
 from app.schemas.response import TokenResponse
-from app.utils.auth import verify_password, make_access_token, hash_password
+from app.utils.auth import make_access_token, hash_password_async, verify_and_update_password_async
 import logging
 logger = logging.getLogger(__name__)
 
@@ -36,11 +36,11 @@ async def register(
         logger.warning("Registration failed, email already registered: %s", data.email)
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = User(email=data.email, password_hash=hash_password(data.password))
+    user = User(email=data.email, password_hash=await hash_password_async(data.password))
     db.add(user)
     await db.flush()
 
-    token = make_access_token(user.email)
+    token = make_access_token(user.email, user.id, user.token_version)
     logger.info("User registered successfully: %s", data.email)
 
     return TokenResponse(access_token=token)
@@ -66,14 +66,21 @@ async def login(
     result = await db.execute(stmt)
     user = result.scalars().first()
 
-    if not user or not verify_password(data.password, user.password_hash):
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await verify_and_update_password_async(data.password, user.password_hash)
+    if not verified:
         logger.warning("Login failed for: %s", data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
 
-    token = make_access_token(user.email)
+    if new_hash:
+        user.password_hash = new_hash
+        logger.info("Password hash upgraded for: %s", data.email)
+
+    token = make_access_token(user.email, user.id, user.token_version)
     logger.info("Login successful: %s", data.email)
 
     return TokenResponse(access_token=token)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.health import startup
+
+router = APIRouter()
+
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz():
+    return {"status": "ok"}
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz():
+    if not startup.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "not ready"})
+    return {"status": "ready", "startup_seconds": startup.phases}
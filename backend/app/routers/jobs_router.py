@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.routing import get_read_session
+from app.db.models import Job
+from app.schemas.response import JobOut
+from app.utils.current import Principal, get_principal
+import logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobOut,
+    summary="Get background job status",
+    description=(
+        "Status of a job started by `POST /resume/{id}/improve?async=true`: "
+        "`queued`, `running`, `succeeded` (see `result_version`), `failed` (see `error`) "
+        "or `conflict` (the resume changed before the result could be applied; nothing was written)."
+    ),
+)
+async def get_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_read_session),
+    user: Principal = Depends(get_principal),
+):
+    job = await db.get(Job, job_id)
+    if not job or job.user_id != user.id:
+        logger.warning("Get job: not found or not owned; user=%s job_id=%s", user.id, job_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return job
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from app.metrics import render, sample
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    sample()
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
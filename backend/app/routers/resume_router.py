@@ -1,217 +1,669 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.db.deps import get_session
-from app.db.models import User, Resume, ResumeRevision
-from app.schemas.requests import ResumeCreate, ResumeUpdate
+from typing import Literal, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select, func, null
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import IMPORT_MAX_LINE_BYTES
+from app.admission import HeldStreamingResponse
+from app.db.deps import get_session, get_session_factory
+from app.db.idempotency import IdempotentRoute, idempotency
+from app.db.routing import get_read_session, recent_writes
+from app.db.export import export_ndjson
+from app.db.importer import ImportFormat, ImportFormatError, ImportStats, import_resumes
+from app.db.models import Resume, ResumeRevision
+from app.db.revisions import content_lengths, materialize, revision_body_cache
+from app.improver import IMPROVED_SUFFIX
+from app.jobs import JobQueueFull, submit_improve
+from app.db.writes import (
+    snapshot_and_update, lock_owned, bulk_create, bulk_snapshot_and_update, bulk_delete,
+)
+from app.db.queries import list_columns, live_resumes, owned_resume, resume_count, resume_page
+from app.db.projection import SUMMARY_COLUMNS, SUMMARY_FIELDS, content_prefix, parse_fields, summary_item
+from app.db.search import SearchMode, build_search, highlight
+from app.schemas.requests import (
+    ResumeCreate, ResumeUpdate,
+    ResumeBatchRequest, BatchCreateOp, BatchUpdateOp, BatchDeleteOp,
+)
 from app.schemas.response import (
-    ResumeOut, ResumePage, PageMeta,
-    ResumeRevisionPage,
+    ResumeOut, ResumePage, ResumeListItem,
+    ResumeRevisionOut, ResumeRevisionPage, ResumeRevisionMetaPage,
+    ResumeBatchResponse, BatchItemResult,
+    ResumeImportResult, JobOut, ResumeSummaryPage,
 )
-from app.utils.current import get_user
+from app.utils.current import Principal, get_principal
+from app.utils import fastjson
+from app.utils.etag import resume_etag, revision_etag, digest_etag, etag_matches, parse_if_match
+from app.utils.fastjson import FastJSONResponse
+from app.utils.streaming import LineTooLong, gzip_stream, gunzip_stream, iter_lines
+from app.utils.pagination import encode_cursor, decode_cursor, make_page_meta
+from app.utils.response_cache import response_cache
 import logging
 logger = logging.getLogger(__name__)
-router = APIRouter()
+# high-volume read lines, separately sampleable via LOG_SAMPLING
+read_logger = logging.getLogger(f"{__name__}.reads")
+router = APIRouter(route_class=IdempotentRoute)
+
+# revisions are private to their owner and never change
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def _commit_and_invalidate(db: AsyncSession, user_id: int) -> None:
+    # invalidate only once the write is visible, or a concurrent read could re-cache the old state
+    await db.commit()
+    await recent_writes.mark(user_id)
+    await response_cache.invalidate_user(user_id)
+
+
+async def _raise_missing_or_conflict(
+    db: AsyncSession, resume_id: int, user_id: int, expected_version: int | None, action: str,
+):
+    if expected_version is not None:
+        current = await db.scalar(
+            select(Resume.version).where(*owned_resume(resume_id, user_id))
+        )
+        if current is not None:
+            logger.warning(
+                "%s resume: version mismatch; user=%s resume_id=%s expected=%s current=%s",
+                action, user_id, resume_id, expected_version, current,
+            )
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Resume was modified",
+                headers={"ETag": resume_etag(resume_id, current)},
+            )
+    logger.warning("%s resume: not found or not owned; user=%s resume_id=%s", action, user_id, resume_id)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+
 @router.post(
     "",
     response_model=ResumeOut,
     status_code=status.HTTP_201_CREATED,
     summary="Create a resume",
-    description="Create a new resume for the current user and return the created entity."
+    description=(
+        "Create a new resume for the current user and return the created entity. "
+        "Retries sent with the same `Idempotency-Key` return the first response instead of creating a duplicate."
+    ),
+    dependencies=[Depends(idempotency)],
 )
 async def create_resume(
     data: ResumeCreate,
+    response: Response,
     db: AsyncSession = Depends(get_session),
-    user: User = Depends(get_user),
+    user: Principal = Depends(get_principal),
 ):
     logger.info("Create resume requested by user=%s, title=%r", user.id, data.title)
-    r = Resume(title=data.title, content=data.content, user_id=user.id)
-    db.add(r)
-    await db.flush()
-    await db.refresh(r)
+    # through bulk_create so users.resume_count is maintained in the same transaction
+    [r] = await bulk_create(db, user.id, [data.model_dump(include={"title", "content"})])
+    await _commit_and_invalidate(db, user.id)
     logger.info("Resume created: id=%s by user=%s", r.id, user.id)
+    response.headers["ETag"] = resume_etag(r.id, r.version)
     return r
 
 
+@router.post(
+    "/batch",
+    response_model=ResumeBatchResponse,
+    summary="Create, update and delete resumes in bulk",
+    description=(
+        "Apply up to `BATCH_MAX_OPERATIONS` create/update/delete operations in one request. "
+        "In `atomic` mode nothing is applied if any operation is invalid (409, per-item reasons in `results`); "
+        "in `best_effort` mode valid operations are applied and invalid ones reported. "
+        "Supports `Idempotency-Key` like `POST /resume`."
+    ),
+    dependencies=[Depends(idempotency)],
+)
+async def batch_resumes(
+    data: ResumeBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_session),
+    user: Principal = Depends(get_principal),
+):
+    results: dict[int, BatchItemResult] = {}
+    creates: list[tuple[int, BatchCreateOp]] = []
+    updates: dict[int, tuple[int, BatchUpdateOp]] = {}
+    deletes: dict[int, tuple[int, BatchDeleteOp]] = {}
+    for i, op in enumerate(data.operations):
+        if isinstance(op, BatchCreateOp):
+            creates.append((i, op))
+        elif op.id in updates or op.id in deletes:
+            results[i] = BatchItemResult(index=i, op=op.op, id=op.id, status=409, error="Duplicate id in batch")
+        else:
+            (updates if isinstance(op, BatchUpdateOp) else deletes)[op.id] = (i, op)
+
+    owned = await lock_owned(db, user.id, [*updates, *deletes])
+    for rid, (i, op) in [*updates.items(), *deletes.items()]:
+        if rid not in owned:
+            results[i] = BatchItemResult(index=i, op=op.op, id=rid, status=404, error="Not found")
+
+    if results and data.mode == "atomic":
+        for i, op in enumerate(data.operations):
+            results.setdefault(i, BatchItemResult(
+                index=i, op=op.op, id=getattr(op, "id", None), status=424, error="Not applied",
+            ))
+        logger.warning("Batch rejected: user=%s operations=%s invalid=%s",
+                       user.id, len(data.operations), sum(r.status != 424 for r in results.values()))
+        response.status_code = status.HTTP_409_CONFLICT
+        return ResumeBatchResponse(mode=data.mode, ok=False, results=sorted(results.values(), key=lambda r: r.index))
+
+    updated = await bulk_snapshot_and_update(db, user.id, {
+        rid: op.model_dump(include={"title", "content"}, exclude_none=True)
+        for rid, (i, op) in updates.items() if rid in owned
+    })
+    for rid, row in updated.items():
+        i = updates[rid][0]
+        results[i] = BatchItemResult(index=i, op="update", id=rid, status=200, item=ResumeOut.model_validate(row))
+
+    deleted = await bulk_delete(db, user.id, [rid for rid in deletes if rid in owned])
+    for rid in deleted:
+        i = deletes[rid][0]
+        results[i] = BatchItemResult(index=i, op="delete", id=rid, status=200)
+
+    created = await bulk_create(db, user.id, [op.model_dump(include={"title", "content"}) for i, op in creates])
+    for (i, op), row in zip(creates, created):
+        results[i] = BatchItemResult(index=i, op="create", id=row.id, status=201, item=ResumeOut.model_validate(row))
+
+    await _commit_and_invalidate(db, user.id)
+    ok = all(r.status < 400 for r in results.values())
+    logger.info(
+        "Batch applied: user=%s mode=%s created=%s updated=%s deleted=%s failed=%s",
+        user.id, data.mode, len(created), len(updated), len(deleted),
+        sum(r.status >= 400 for r in results.values()),
+    )
+    return ResumeBatchResponse(mode=data.mode, ok=ok, results=sorted(results.values(), key=lambda r: r.index))
+
+
+@router.post(
+    "/import",
+    response_model=ResumeImportResult,
+    summary="Bulk import resumes (NDJSON or CSV)",
+    description=(
+        "Stream resumes in the request body: NDJSON (one `{title, content, history?}` object per line, "
+        "or the output of `/resume/export`) or CSV with `title,content[,history]` columns. "
+        "Records are validated and loaded in batches, each committed on its own; invalid records are reported, "
+        "not fatal. `checkpoint` is the number of input records consumed by committed batches: "
+        "re-send the same body with `skip=checkpoint` to resume an interrupted import. "
+        "A gzip body (`Content-Encoding: gzip`) is accepted. "
+        "A line (or CSV record) longer than IMPORT_MAX_LINE_BYTES fails the import with 413."
+    ),
+)
+async def import_resumes_endpoint(
+    request: Request,
+    format: ImportFormat = Query("ndjson", description="Body format"),
+    history: bool = Query(True, description="Import revision history"),
+    skip: int = Query(0, ge=0, description="Input records to skip (a previous checkpoint)"),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    user: Principal = Depends(get_principal),
+):
+    body = request.stream()
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        body = gunzip_stream(body)
+
+    def progress(stats: ImportStats) -> None:
+        logger.info("Import progress: user=%s checkpoint=%s imported=%s invalid=%s rows/s=%.0f",
+                    user.id, stats.checkpoint, stats.imported, stats.invalid, stats.rows_per_sec)
+
+    stats = ImportStats()
+    try:
+        await import_resumes(
+            session_factory, user.id, iter_lines(body, IMPORT_MAX_LINE_BYTES), format,
+            with_history=history, skip=skip, on_progress=progress, stats=stats,
+        )
+    except LineTooLong as exc:
+        logger.warning("Import rejected: user=%s error=%s", user.id, exc)
+        return JSONResponse(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            content={"detail": str(exc), "checkpoint": stats.checkpoint})
+    except ImportFormatError as exc:
+        logger.warning("Import rejected: user=%s error=%s", user.id, exc)
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST,
+                            content={"detail": str(exc), "checkpoint": stats.checkpoint})
+    except Exception:
+        logger.exception("Import failed: user=%s checkpoint=%s", user.id, stats.checkpoint)
+        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            content={"detail": "Import failed", "checkpoint": stats.checkpoint})
+    finally:
+        if stats.imported:
+            await recent_writes.mark(user.id)
+            await response_cache.invalidate_user(user.id)
+    logger.info(
+        "Import done: user=%s records=%s imported=%s revisions=%s invalid=%s in %.2fs (%.0f rows/s)",
+        user.id, stats.records, stats.imported, stats.revisions, stats.invalid, stats.elapsed, stats.rows_per_sec,
+    )
+    return ResumeImportResult.model_validate(stats)
+
+
 @router.get(
     "",
-    response_model=ResumePage,
+    response_model=Union[ResumePage, ResumeSummaryPage],
     summary="List resumes (with search & pagination)",
-    description="List current user's resumes with optional title search (`q`) and pagination (`page`, `per_page`)."
+    description=(
+        "List current user's resumes with optional search (`q`) and pagination (`page`, `per_page`). "
+        "`mode=substring` matches titles, `mode=fts` runs ranked full-text search over title and content; "
+        "search results are ordered by relevance and carry a highlighted `snippet`. "
+        "Without `q`, pass `meta.next_cursor` back as `cursor` to seek to the next page without OFFSET; "
+        "`include_total=false` skips the count query. "
+        "`view=summary` or `fields=id,title,...` returns a projection (`ResumeSummaryPage`) that never loads "
+        "the resume body; its `snippet` is the first `snippet_chars` characters, or the search highlight."
+    ),
 )
 async def list_resumes(
+    response: Response,
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
-    q: str | None = Query(None, description="Title search (case-insensitive)"),
-    db: AsyncSession = Depends(get_session),
-    user: User = Depends(get_user),
+    q: str | None = Query(None, description="Search query (case-insensitive)"),
+    mode: SearchMode = Query("substring", description="`substring` (title) or `fts` (title + content)"),
+    cursor: str | None = Query(None, description="Opaque keyset cursor from `meta.next_cursor`"),
+    include_total: bool = Query(True, description="Compute `meta.total` (extra count query)"),
+    view: Literal["full", "summary"] = Query("full", description="`summary`: id, title, updated_at, snippet"),
+    fields: str | None = Query(None, description=f"Comma-separated projection of: {', '.join(SUMMARY_FIELDS)}"),
+    snippet_chars: int = Query(200, ge=1, le=2000, description="Snippet length for projections"),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+    user: Principal = Depends(get_principal),
 ):
-    offset = (page - 1) * per_page
-
-    filters = [Resume.user_id == user.id]
-    if q:
-        filters.append(Resume.title.ilike(f"%{q}%"))
-
-    total = await db.scalar(
-        select(func.count()).select_from(Resume).where(*filters)
-    ) or 0
-
-    stmt = (
-        select(Resume)
-        .where(*filters)
-        .order_by(Resume.id.desc())
-        .limit(per_page)
-        .offset(offset)
-    )
-    items = (await db.execute(stmt)).scalars().all()
+    projection = parse_fields(fields, view)
+    if q and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported for relevance-ordered search",
+        )
 
-    total_pages = (total + per_page - 1) // per_page if per_page else 1
-    meta = PageMeta(
-        page=page, per_page=per_page, total=total, total_pages=total_pages,
-        has_next=page < total_pages, has_prev=page > 1,
-    )
+    async def load() -> dict:
+        filters = live_resumes(user.id)
+        search = None
+        if q:
+            search = build_search(q, mode, db.bind.dialect.name)
+            filters.append(search.where)
+
+        total = None
+        if include_total and search is None:
+            total = await db.scalar(resume_count(user.id)) or 0
+        elif include_total:
+            total = await db.scalar(
+                select(func.count()).select_from(Resume).where(*filters)
+            ) or 0
+
+        snippet_col = search.snippet if search is not None and search.snippet is not None else null()
+        if projection is not None:
+            if "snippet" in projection and search is None:
+                snippet_col = content_prefix(snippet_chars, db.bind.dialect.name)
+            # the etag needs the version; a search snippet falls back to highlighting the title
+            extra = ["version", "title"] if q and "snippet" in projection else ["version"]
+            columns = [SUMMARY_COLUMNS[name] for name in dict.fromkeys([*projection, *extra]) if name != "snippet"]
+            stmt = select(*columns, snippet_col.label("snippet"))
+        else:
+            stmt = list_columns(snippet_col, fastjson.enabled)
+        last_id = decode_cursor(cursor, "id")[0] if cursor else None
+        stmt = resume_page(
+            stmt, filters, per_page, page, before_id=last_id,
+            order_by=(search.rank.desc(),) if search is not None else (),
+        )
+        rows = (await db.execute(stmt)).all()
+
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        if projection is not None:
+            items = [summary_item(row, projection) for row in rows]
+            if q and "snippet" in projection:
+                for item, row in zip(items, rows):
+                    if item["snippet"] is None:
+                        item["snippet"] = highlight(row.title, q)
+            versions = [(row.id, row.version) for row in rows]
+        elif fastjson.enabled:
+            # same shape as ResumeListItem, straight from the row tuples
+            items = []
+            for row in rows:
+                snippet = row.snippet
+                if q and snippet is None:
+                    snippet = (mode == "fts" and highlight(row.content, q)) or highlight(row.title, q)
+                items.append({"id": row.id, "title": row.title, "content": row.content, "snippet": snippet})
+            versions = [(row.id, row.version) for row in rows]
+        else:
+            items = []
+            for r, snippet in rows:
+                if q and snippet is None:
+                    snippet = (mode == "fts" and highlight(r.content, q)) or highlight(r.title, q)
+                item = ResumeListItem.model_validate(r).model_copy(update={"snippet": snippet})
+                items.append(item.model_dump(mode="json"))
+            versions = [(r.id, r.version) for r, _ in rows]
+        meta = make_page_meta(
+            page, per_page, total,
+            has_next=has_next, has_prev=bool(cursor) or page > 1,
+            next_cursor=encode_cursor(id=items[-1]["id"]) if has_next and not q else None,
+        )
+        etag = digest_etag(
+            user.id, q, mode, page, per_page, cursor, projection, snippet_chars, meta.model_dump(), versions,
+        )
+        return {"body": {"items": items, "meta": meta.model_dump(mode="json")}, "etag": etag}
 
-    logger.info(
-        "List resumes: user=%s q=%r page=%s per_page=%s total=%s returned=%s",
-        user.id, q, page, per_page, total, len(items)
+    cached = await response_cache.get_or_load(
+        "list", user.id, (q, mode, page, per_page, cursor, include_total, projection, snippet_chars), load,
+    )
+    body, etag = cached["body"], cached["etag"]
+    read_logger.info(
+        "List resumes: user=%s q=%r mode=%s page=%s per_page=%s cursor=%s total=%s returned=%s",
+        user.id, q, mode, page, per_page, bool(cursor), body["meta"]["total"], len(body["items"])
     )
-    return {"items": items, "meta": meta}
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    if projection is not None or fastjson.enabled:
+        # already plain JSON, no response_model round trip
+        return FastJSONResponse(body, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return body
+
+
+@router.get(
+    "/export",
+    summary="Export all resumes with history (NDJSON stream)",
+    description=(
+        "Stream every resume of the current user, each followed by its revisions, as newline-delimited JSON. "
+        "Rows are read through server-side cursors, so the response starts immediately and memory stays flat. "
+        "`gzip=true` compresses the stream (`Content-Encoding: gzip`)."
+    ),
+    response_class=StreamingResponse,
+)
+async def export_resumes(
+    request: Request,
+    history: bool = Query(True, description="Include revisions"),
+    gzip: bool = Query(False, description="Gzip-compress the stream"),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    user: Principal = Depends(get_principal),
+):
+    logger.info("Export requested: user=%s history=%s gzip=%s", user.id, history, gzip)
+    body = export_ndjson(session_factory, user.id, include_history=history)
+    headers = {"Content-Disposition": f'attachment; filename="resumes-{user.id}.ndjson"'}
+    if gzip:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return HeldStreamingResponse(request, body, media_type="application/x-ndjson", headers=headers)
 
 
 @router.get(
     "/{resume_id}/history",
-    response_model=ResumeRevisionPage,
+    response_model=Union[ResumeRevisionPage, ResumeRevisionMetaPage],
     summary="Get resume history (paginated)",
-    description="Return paginated change history (revisions) for the given resume belonging to the current user."
+    description=(
+        "Return paginated change history (revisions) for the given resume belonging to the current user. "
+        "Supports keyset pagination via `cursor` and skipping the count with `include_total=false`. "
+        "`view=meta` lists version, created_at and size only; fetch bodies from `/resume/{id}/history/{version}`."
+    )
 )
 async def list_resume_history(
     resume_id: int,
+    response: Response,
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
-    db: AsyncSession = Depends(get_session),
-    user: User = Depends(get_user),
+    cursor: str | None = Query(None, description="Opaque keyset cursor from `meta.next_cursor`"),
+    include_total: bool = Query(True, description="Compute `meta.total` (extra count query)"),
+    view: Literal["full", "meta"] = Query("full", description="`meta`: no content, see `size`"),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+    user: Principal = Depends(get_principal),
 ):
-    exists_stmt = select(func.count()).select_from(Resume).where(
-        Resume.id == resume_id, Resume.user_id == user.id
-    )
-    if not await db.scalar(exists_stmt):
-        logger.warning("History requested for non-owned/missing resume: user=%s resume_id=%s", user.id, resume_id)
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-
-    offset = (page - 1) * per_page
-
-    total = await db.scalar(
-        select(func.count()).select_from(ResumeRevision).where(ResumeRevision.resume_id == resume_id)
-    ) or 0
-
-    items_stmt = (
-        select(ResumeRevision)
-        .where(ResumeRevision.resume_id == resume_id)
-        .order_by(ResumeRevision.version.desc())
-        .limit(per_page)
-        .offset(offset)
+    async def load(probe: bool = False) -> dict:
+        owned = (Resume.id == resume_id, Resume.user_id == user.id, Resume.live)
+        # one statement: the join checks ownership and carries the maintained total
+        if view == "meta":
+            items_stmt = select(
+                ResumeRevision.id, ResumeRevision.resume_id, ResumeRevision.version, ResumeRevision.created_at,
+                ResumeRevision.content_length, Resume.revision_count,
+            )
+        elif fastjson.enabled:
+            # plain rows: no identity map or ORM instances for a read-only page
+            items_stmt = select(*ResumeRevision.__table__.c, Resume.revision_count)
+        else:
+            items_stmt = select(ResumeRevision, Resume.revision_count)
+        items_stmt = (
+            items_stmt
+            .join(Resume, Resume.id == ResumeRevision.resume_id)
+            .where(ResumeRevision.resume_id == resume_id, *owned)
+            .order_by(ResumeRevision.version.desc())
+            .limit(per_page + 1)
+        )
+        if cursor:
+            (last_version,) = decode_cursor(cursor, "version")
+            items_stmt = items_stmt.where(ResumeRevision.version < last_version)
+        else:
+            items_stmt = items_stmt.offset((page - 1) * per_page)
+        rows = (await db.execute(items_stmt)).all()
+
+        if rows:
+            total = rows[0].revision_count
+        else:
+            # an empty page doesn't tell a missing resume from one without (further) revisions
+            total = await db.scalar(select(Resume.revision_count).where(*owned))
+            if total is None:
+                logger.warning(
+                    "History requested for non-owned/missing resume: user=%s resume_id=%s", user.id, resume_id,
+                )
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        if not include_total:
+            total = None
+        if view == "full" and not fastjson.enabled:
+            rows = [rev for rev, _ in rows]
+
+        has_next = len(rows) > per_page
+        revisions = rows[:per_page]
+        meta = make_page_meta(
+            page, per_page, total,
+            has_next=has_next, has_prev=bool(cursor) or page > 1,
+            next_cursor=encode_cursor(version=revisions[-1].version) if has_next else None,
+        )
+        # revisions are immutable, so their versions identify the page content
+        etag = digest_etag(
+            resume_id, view, page, per_page, cursor, meta.model_dump(), [rev.version for rev in revisions],
+        )
+        if probe and etag_matches(if_none_match, etag):
+            return {"body": None, "etag": etag}
+
+        if view == "meta":
+            lengths = await content_lengths(
+                db, resume_id, [rev.version for rev in revisions if rev.content_length is None],
+            )
+            items = [
+                {
+                    "id": rev.id, "resume_id": rev.resume_id, "version": rev.version, "created_at": rev.created_at,
+                    "size": lengths[rev.version] if rev.content_length is None else rev.content_length,
+                }
+                for rev in revisions
+            ]
+            return {"body": {"items": items, "meta": meta.model_dump(mode="json")}, "etag": etag}
+
+        contents = await materialize(db, revisions)
+        if fastjson.enabled:
+            items = [
+                {
+                    "id": rev.id, "resume_id": rev.resume_id, "version": rev.version,
+                    "content": contents[(rev.resume_id, rev.version)], "comment": None,
+                    "created_at": rev.created_at,
+                }
+                for rev in revisions
+            ]
+            return {"body": {"items": items, "meta": meta.model_dump(mode="json")}, "etag": etag}
+        items = [
+            ResumeRevisionOut(
+                id=rev.id, resume_id=rev.resume_id, version=rev.version,
+                content=contents[(rev.resume_id, rev.version)], created_at=rev.created_at,
+            )
+            for rev in revisions
+        ]
+        body = {"items": [item.model_dump(mode="json") for item in items], "meta": meta.model_dump(mode="json")}
+        return {"body": body, "etag": etag}
+
+    if response_cache.enabled:
+        cached = await response_cache.get_or_load(
+            "history", user.id, (resume_id, view, page, per_page, cursor, include_total), load,
+        )
+    else:
+        # uncached, a matching If-None-Match is answered before materializing any content
+        cached = await load(probe=True)
+    body, etag = cached["body"], cached["etag"]
+    if body is None or etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    read_logger.info(
+        "History: user=%s resume_id=%s page=%s per_page=%s cursor=%s total=%s returned=%s",
+        user.id, resume_id, page, per_page, bool(cursor), body["meta"]["total"], len(body["items"])
     )
-    items = (await db.execute(items_stmt)).scalars().all()
+    if view == "meta" or fastjson.enabled:
+        return FastJSONResponse(body, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return body
 
-    total_pages = (total + per_page - 1) // per_page if per_page else 1
-    meta = PageMeta(
-        page=page, per_page=per_page, total=total, total_pages=total_pages,
-        has_next=page < total_pages, has_prev=page > 1
-    )
 
-    logger.info(
-        "History: user=%s resume_id=%s page=%s per_page=%s total=%s returned=%s",
-        user.id, resume_id, page, per_page, total, len(items)
+@router.get(
+    "/{resume_id}/history/{version}",
+    response_model=ResumeRevisionOut,
+    summary="Get one revision",
+    description=(
+        "Return a single revision of a resume belonging to the current user. Revisions never change, "
+        "so the response is `Cache-Control: immutable` with a per-version `ETag`."
+    ),
+)
+async def get_resume_revision(
+    resume_id: int,
+    version: int,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+    user: Principal = Depends(get_principal),
+):
+    owned = (
+        ResumeRevision.resume_id == resume_id, ResumeRevision.version == version,
+        Resume.id == resume_id, Resume.user_id == user.id, Resume.live,
     )
-    return {"items": items, "meta": meta}
+    etag = revision_etag(resume_id, version)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+    key = (resume_id, version)
+    body = revision_body_cache.get(key)
+    if body is not None or etag_matches(if_none_match, etag):
+        # the body can't change, but the resume can be deleted and isn't everyone's: probe ownership only
+        found = await db.scalar(
+            select(ResumeRevision.id).join(Resume, Resume.id == ResumeRevision.resume_id).where(*owned)
+        )
+    else:
+        rev = (await db.execute(
+            select(ResumeRevision).join(Resume, Resume.id == ResumeRevision.resume_id).where(*owned)
+        )).scalars().first()
+        found = rev is not None
+        if found:
+            contents = await materialize(db, [rev])
+            body = fastjson.dumps({
+                "id": rev.id, "resume_id": rev.resume_id, "version": rev.version,
+                "content": contents[key], "comment": None, "created_at": rev.created_at,
+            })
+            revision_body_cache.set(key, body)
+    if not found:
+        logger.warning("Revision not found or not owned: user=%s resume_id=%s version=%s", user.id, resume_id, version)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    read_logger.info("Get revision: user=%s resume_id=%s version=%s", user.id, resume_id, version)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @router.get(
     "/{resume_id}",
     response_model=ResumeOut,
     summary="Get a single resume",
-    description="Return a single resume by id for the current user."
+    description=(
+        "Return a single resume by id for the current user. "
+        "The `ETag` identifies `(id, version)`; send it as `If-None-Match` to get 304 when unchanged."
+    )
 )
 async def get_resume(
     resume_id: int,
-    db: AsyncSession = Depends(get_session),
-    user: User = Depends(get_user),
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+    user: Principal = Depends(get_principal),
 ):
-    stmt = select(Resume).where(Resume.id == resume_id, Resume.user_id == user.id)
-    r = (await db.execute(stmt)).scalars().first()
-    if not r:
-        logger.warning("Get resume: not found or not owned; user=%s resume_id=%s", user.id, resume_id)
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    logger.info("Get resume: user=%s resume_id=%s", user.id, resume_id)
-    return r
+    owned = owned_resume(resume_id, user.id)
+    if if_none_match and not response_cache.enabled:
+        # cheap probe: only the version, the content isn't read when the client is up to date
+        version = await db.scalar(select(Resume.version).where(*owned))
+        if version is not None and etag_matches(if_none_match, resume_etag(resume_id, version)):
+            read_logger.info("Get resume: not modified; user=%s resume_id=%s", user.id, resume_id)
+            return _not_modified(resume_etag(resume_id, version))
+
+    async def load() -> dict:
+        r = (await db.execute(select(Resume).where(*owned))).scalars().first()
+        if not r:
+            logger.warning("Get resume: not found or not owned; user=%s resume_id=%s", user.id, resume_id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        return {"body": ResumeOut.model_validate(r).model_dump(mode="json"), "etag": resume_etag(r.id, r.version)}
+
+    cached = await response_cache.get_or_load("resume", user.id, (resume_id,), load)
+    if etag_matches(if_none_match, cached["etag"]):
+        read_logger.info("Get resume: not modified; user=%s resume_id=%s", user.id, resume_id)
+        return _not_modified(cached["etag"])
+    read_logger.info("Get resume: user=%s resume_id=%s", user.id, resume_id)
+    response.headers["ETag"] = cached["etag"]
+    return cached["body"]
 
 
 @router.patch(
     "/{resume_id}",
     response_model=ResumeOut,
     summary="Update a resume (with history snapshot)",
-    description="Update title/content of a resume. The previous content is snapshotted into history and the version is incremented."
+    description=(
+        "Update title/content of a resume. The previous content is snapshotted into history and the version is incremented. "
+        "With `If-Match: <ETag>` the write is optimistic (no row lock) and fails with 412 if the resume changed."
+    )
 )
 async def update_resume(
     resume_id: int,
     data: ResumeUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_session),
-    user: User = Depends(get_user),
+    user: Principal = Depends(get_principal),
 ):
-    stmt = (
-        select(Resume)
-        .where(Resume.id == resume_id, Resume.user_id == user.id)
-        .with_for_update()
-    )
-    r = (await db.execute(stmt)).scalars().first()
-    if not r:
-        logger.warning("Update resume: not found or not owned; user=%s resume_id=%s", user.id, resume_id)
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-
-    db.add(
-        ResumeRevision(
-            resume_id=r.id,
-            version=r.version,
-            content=r.content,
-        )
-    )
-
-    before_title, before_len = r.title, len(r.content or "")
-
+    values = {}
     if data.title is not None:
-        r.title = data.title
+        values["title"] = data.title
     if data.content is not None:
-        r.content = data.content
+        values["content"] = data.content
 
-    r.version += 1
-    await db.flush()
-    await db.refresh(r)
+    expected = parse_if_match(if_match, resume_id)
+    r = await snapshot_and_update(db, resume_id, user.id, values, expected_version=expected)
+    if not r:
+        await _raise_missing_or_conflict(db, resume_id, user.id, expected, "Update")
+    await _commit_and_invalidate(db, user.id)
 
     logger.info(
-        "Updated resume: user=%s resume_id=%s v->%s title %r→%r content_len %s→%s",
-        user.id, resume_id, r.version, before_title, r.title, before_len, len(r.content or "")
+        "Updated resume: user=%s resume_id=%s v->%s title=%r content_len=%s",
+        user.id, resume_id, r.version, r.title, len(r.content or "")
     )
+    response.headers["ETag"] = resume_etag(r.id, r.version)
     return r
 
 
 @router.delete(
     "/{resume_id}",
     summary="Delete a resume",
-    description="Delete a resume owned by the current user."
+    description=(
+        "Delete a resume owned by the current user. The resume disappears immediately; "
+        "its rows and history are removed in the background."
+    )
 )
 async def delete_resume(
     resume_id: int,
     db: AsyncSession = Depends(get_session),
-    user: User = Depends(get_user),
+    user: Principal = Depends(get_principal),
 ):
-    stmt = select(Resume).where(Resume.id == resume_id, Resume.user_id == user.id)
-    r = (await db.execute(stmt)).scalars().first()
-    if not r:
+    if not await bulk_delete(db, user.id, [resume_id]):
         logger.warning("Delete resume: not found or not owned; user=%s resume_id=%s", user.id, resume_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
 
-    await db.delete(r)
+    await _commit_and_invalidate(db, user.id)
     logger.info("Deleted resume: user=%s resume_id=%s", user.id, resume_id)
     return {"ok": True}
 
@@ -220,38 +672,73 @@ async def delete_resume(
     "/{resume_id}/improve",
     response_model=ResumeOut,
     summary="Improve a resume (and snapshot previous)",
-    description="Apply an automatic improvement to the resume content. The previous content is stored as a new revision and the version is incremented."
+    description=(
+        "Apply an automatic improvement to the resume content. The previous content is stored as a new revision and the version is incremented. "
+        "Supports `If-Match` like PATCH. "
+        "With `async=true` the improvement runs as a background job: the response is 202 with the job "
+        "(poll `GET /jobs/{id}`), and repeated requests for the same resume version return the same job. "
+        "Supports `Idempotency-Key` like `POST /resume`: a retried improve is not applied twice."
+    ),
+    responses={status.HTTP_202_ACCEPTED: {"model": JobOut, "description": "Job accepted (async=true)"}},
+    dependencies=[Depends(idempotency)],
 )
 async def improve_resume(
     resume_id: int,
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Run as a background job"),
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_session),
-    user: User = Depends(get_user),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    user: Principal = Depends(get_principal),
 ):
-    stmt = (
-        select(Resume)
-        .where(Resume.id == resume_id, Resume.user_id == user.id)
-        .with_for_update()
+    expected = parse_if_match(if_match, resume_id)
+    if run_async:
+        return await _submit_improve_job(db, session_factory, resume_id, user.id, expected)
+
+    r = await snapshot_and_update(
+        db, resume_id, user.id, {"content": Resume.content + IMPROVED_SUFFIX}, expected_version=expected,
     )
-    r = (await db.execute(stmt)).scalars().first()
     if not r:
-        logger.warning("Improve resume: not found or not owned; user=%s resume_id=%s", user.id, resume_id)
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        await _raise_missing_or_conflict(db, resume_id, user.id, expected, "Improve")
+    await _commit_and_invalidate(db, user.id)
 
-    db.add(ResumeRevision(
-        resume_id=r.id,
-        version=r.version,
-        content=r.content,
-    ))
-
-    before_len = len(r.content or "")
-    r.content = (r.content or "") + " [Improved]"
-    r.version += 1
+    logger.info(
+        "Improved resume: user=%s resume_id=%s v->%s content_len=%s",
+        user.id, resume_id, r.version, len(r.content or "")
+    )
+    response.headers["ETag"] = resume_etag(r.id, r.version)
+    return r
 
-    await db.flush()
-    await db.refresh(r)
 
+async def _submit_improve_job(
+    db: AsyncSession,
+    session_factory: async_sessionmaker[AsyncSession],
+    resume_id: int,
+    user_id: int,
+    expected: int | None,
+) -> JSONResponse:
+    version = await db.scalar(
+        select(Resume.version).where(*owned_resume(resume_id, user_id))
+    )
+    if version is None or (expected is not None and expected != version):
+        await _raise_missing_or_conflict(db, resume_id, user_id, expected, "Improve")
+    # end the request's read transaction; the job opens its own sessions
+    await db.commit()
+    try:
+        job, created = await submit_improve(session_factory, user_id, resume_id, version)
+    except JobQueueFull:
+        logger.warning("Improve job rejected, queue full: user=%s resume_id=%s", user_id, resume_id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending jobs, retry later",
+            headers={"Retry-After": "1"},
+        )
     logger.info(
-        "Improved resume: user=%s resume_id=%s v->%s content_len %s→%s",
-        user.id, resume_id, r.version, before_len, len(r.content or "")
+        "Improve job %s: user=%s resume_id=%s version=%s job=%s",
+        "queued" if created else "coalesced", user_id, resume_id, version, job.id,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=JobOut.model_validate(job).model_dump(mode="json"),
+        headers={"Location": f"/jobs/{job.id}"},
     )
-    return r
\ No newline at end of file
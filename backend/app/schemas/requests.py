@@ -1,5 +1,9 @@
+from typing import Annotated, List, Literal, Optional, Union
+
 from pydantic import BaseModel, EmailStr, Field
 
+from app.config import BATCH_MAX_OPERATIONS
+
 class RegisterRequest(BaseModel):
     email: EmailStr
     password: str = Field(min_length=6)
@@ -13,3 +17,22 @@ class ResumeCreate(ResumeBase):
 
 class ResumeUpdate(ResumeBase):
     pass
+
+class BatchCreateOp(ResumeCreate):
+    op: Literal["create"]
+
+class BatchUpdateOp(BaseModel):
+    op: Literal["update"]
+    id: int
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+class BatchDeleteOp(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+BatchOperation = Annotated[Union[BatchCreateOp, BatchUpdateOp, BatchDeleteOp], Field(discriminator="op")]
+
+class ResumeBatchRequest(BaseModel):
+    mode: Literal["atomic", "best_effort"] = "atomic"
+    operations: List[BatchOperation] = Field(min_length=1, max_length=BATCH_MAX_OPERATIONS)
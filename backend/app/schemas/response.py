@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+SNIPPET_DESCRIPTION = "HTML-safe: the resume's text is escaped, search matches are wrapped in <mark>"
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -9,10 +11,11 @@ class TokenResponse(BaseModel):
 class PageMeta(BaseModel):
     page: int
     per_page: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 class ResumeOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -20,10 +23,41 @@ class ResumeOut(BaseModel):
     title: str
     content: str
 
+class ResumeListItem(ResumeOut):
+    snippet: Optional[str] = Field(None, description=SNIPPET_DESCRIPTION)
+
 class ResumePage(BaseModel):
-    items: List[ResumeOut]
+    items: List[ResumeListItem]
     meta: PageMeta
 
+class BatchItemResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[int] = None
+    item: Optional[ResumeOut] = None
+    error: Optional[str] = None
+
+class ResumeBatchResponse(BaseModel):
+    mode: str
+    ok: bool
+    results: List[BatchItemResult]
+
+class ImportRecordError(BaseModel):
+    record: int
+    error: str
+
+class ResumeImportResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    records: int
+    skipped: int
+    imported: int
+    revisions: int
+    invalid: int
+    checkpoint: int
+    rows_per_sec: float
+    errors: List[ImportRecordError]
+
 class ResumeRevisionOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
@@ -36,3 +70,41 @@ class ResumeRevisionOut(BaseModel):
 class ResumeRevisionPage(BaseModel):
     items: List[ResumeRevisionOut]
     meta: PageMeta
+
+class ResumeRevisionMeta(BaseModel):
+    """History entry without content (`view=meta`); the body is at /resume/{resume_id}/history/{version}."""
+    id: int
+    resume_id: int
+    version: int
+    created_at: datetime
+    size: int = Field(description="Length of the content in characters")
+
+class ResumeRevisionMetaPage(BaseModel):
+    items: List[ResumeRevisionMeta]
+    meta: PageMeta
+
+class JobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: str
+    kind: str
+    status: str
+    resume_id: int
+    base_version: int
+    result_version: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ResumeSummary(BaseModel):
+    """Projected list item (`view=summary` / `fields=`); only the requested fields are present."""
+    id: int
+    title: Optional[str] = None
+    version: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    snippet: Optional[str] = Field(None, description=SNIPPET_DESCRIPTION)
+
+class ResumeSummaryPage(BaseModel):
+    items: List[ResumeSummary]
+    meta: PageMeta
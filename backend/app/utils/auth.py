@@ -1,10 +1,14 @@
 import time, jwt
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
-from app.config import JWT_SECRET,ACCESS_TTL_SECONDS
+from app.config import JWT_SECRET,ACCESS_TTL_SECONDS,BCRYPT_ROUNDS
+from app.metrics import password_hash_duration, password_hash_rejected
+from app.utils.hashing import hash_executor, HashQueueFull
 
 JWT_ALG = "HS256"
+HASH_RETRY_AFTER_SECONDS = 1
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,10 +16,34 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
-def make_access_token(sub: str) -> str:
+def verify_and_update_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """Verify and, if the stored hash uses outdated settings (e.g. bcrypt cost), return a fresh one."""
+    return pwd_context.verify_and_update(password, password_hash)
+
+async def _run_hashing(op: str, fn, *args):
+    started = time.perf_counter()
+    try:
+        result = await hash_executor.run(fn, *args)
+    except HashQueueFull:
+        password_hash_rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is temporarily overloaded, retry later",
+            headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+        )
+    password_hash_duration.labels(op).observe(time.perf_counter() - started)
+    return result
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing("hash", hash_password, password)
+
+async def verify_and_update_password_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return await _run_hashing("verify", verify_and_update_password, password, password_hash)
+
+def make_access_token(sub: str, uid: int, ver: int = 1) -> str:
     now = int(time.time())
-    payload = {"sub": sub, "iat": now, "exp": now + ACCESS_TTL_SECONDS}
+    payload = {"sub": sub, "uid": uid, "ver": ver, "iat": now, "exp": now + ACCESS_TTL_SECONDS}
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
 
 def decode_token(token: str) -> dict:
-    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
\ No newline at end of file
+    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
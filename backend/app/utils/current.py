@@ -1,30 +1,98 @@
+import time
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
 from app.utils.auth import decode_token
+from app.utils.cache import TTLCache
 from app.db.deps import get_session
 from app.db.models import User
-from sqlalchemy import select
+from app.db.queries import principal_row
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-async def get_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_session),
-) -> User:
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    email: str
+    token_version: int = 1
+
+
+# token -> decoded claims; user id -> Principal snapshot of the users row
+token_cache: TTLCache[str, dict] = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+user_cache: TTLCache[int, Principal] = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached row; call whenever a user's email or token_version changes."""
+    user_cache.pop(user_id)
+
+
+def clear_principal_cache() -> None:
+    token_cache.clear()
+    user_cache.clear()
+
+
+def principal_cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
+def _decode(token: str) -> dict:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
-        payload = decode_token(token)  # sync ок
-        email: str | None = payload.get("sub")
-        if not email:
+        claims = decode_token(token)
+        if not claims.get("sub"):
             raise ValueError("empty sub")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    ttl = min(PRINCIPAL_CACHE_TTL_SECONDS, claims.get("exp", 0) - time.time())
+    token_cache.set(token, claims, ttl=ttl)
+    return claims
+
+
+def _check_version(principal: Principal, claims: dict) -> Principal:
+    if claims.get("ver", 1) < principal.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return principal
+
 
-    # 2) ищем пользователя в БД (async)
-    stmt = select(User).where(User.email == email)
-    result = await db.execute(stmt)
-    user = result.scalars().first()
+async def get_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_session),
+) -> Principal:
+    claims = _decode(token)
+    uid = claims.get("uid")
 
+    if uid is not None:
+        cached = user_cache.get(uid)
+        if cached is not None:
+            return _check_version(cached, claims)
+        where = User.id == uid
+    else:
+        # tokens issued before "uid" was added only carry the email
+        where = User.email == claims["sub"]
+
+    user = (await db.execute(principal_row(where))).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    return user
\ No newline at end of file
+    principal = Principal(id=user.id, email=user.email, token_version=user.token_version)
+    user_cache.set(user.id, principal)
+    return _check_version(principal, claims)
+
+
+async def get_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_session),
+) -> Principal:
+    """The current user as a cached Principal.
+
+    A cache miss loads (id, email, token_version) by primary key, so a bumped
+    token_version (invalidate_user) or a deleted user is rejected with 401
+    within PRINCIPAL_CACHE_TTL_SECONDS at most.
+    """
+    return await get_user(token, db)
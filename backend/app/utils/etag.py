@@ -0,0 +1,43 @@
+import hashlib
+
+from fastapi import HTTPException, status
+
+
+def resume_etag(resume_id: int, version: int) -> str:
+    return f'"{resume_id}-{version}"'
+
+
+def revision_etag(resume_id: int, version: int) -> str:
+    # distinct from resume_etag: a revision body is a different representation than the resume
+    return f'"{resume_id}-{version}-rev"'
+
+
+def digest_etag(*parts: object) -> str:
+    """Strong ETag for a derived representation (e.g. a list page) built from its identifying parts."""
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 prescribes for If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def parse_if_match(if_match: str | None, resume_id: int) -> int | None:
+    """Expected resume version from an If-Match header; None when absent or "*"."""
+    if not if_match or if_match.strip() == "*":
+        return None
+    tag = if_match.split(",")[0].strip()
+    try:
+        if tag.startswith("W/"):
+            raise ValueError("weak tag")
+        tag_id, _, version = tag.strip('"').partition("-")
+        if int(tag_id) != resume_id:
+            raise ValueError("tag for another resume")
+        return int(version)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Precondition failed")
@@ -0,0 +1,44 @@
+"""Fast JSON encoding for hot read responses.
+
+Handlers that already hold plain dicts can return FastJSONResponse to skip
+FastAPI's response_model validation and jsonable_encoder pass; keep
+response_model on the route so the OpenAPI schema still documents the shape.
+orjson is used when installed, otherwise the stdlib encoder with the same
+output (datetimes as pydantic renders them, UTC as "Z").
+"""
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.config import FAST_RESPONSES
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+enabled = FAST_RESPONSES
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if value.utcoffset() == timezone.utc.utcoffset(None) else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+def loads(raw: bytes | str) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.config import HASH_EXECUTOR, HASH_WORKERS, HASH_QUEUE_LIMIT
+
+
+class HashQueueFull(Exception):
+    pass
+
+
+class HashExecutor:
+    """Bounded pool for CPU-heavy password hashing, kept off the event loop.
+
+    At most ``workers`` hashes run at once and at most ``queue_limit`` more may
+    wait; anything beyond that is rejected immediately with HashQueueFull.
+    The pool is created lazily so that it belongs to the (forked) worker process.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 2, queue_limit: int = 32):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"unknown hash executor kind: {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._pool: Executor | None = None
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_limit
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash")
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise HashQueueFull()
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.pending -= 1
+            self.completed += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "queue_depth": max(self.pending - self.workers, 0),
+            "in_flight": min(self.pending, self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_avg_seconds": self.latency_total / self.completed if self.completed else 0.0,
+            "latency_max_seconds": self.latency_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+hash_executor = HashExecutor(HASH_EXECUTOR, HASH_WORKERS, HASH_QUEUE_LIMIT)
@@ -0,0 +1,35 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+from app.schemas.response import PageMeta
+
+
+def encode_cursor(**keys: int) -> str:
+    raw = json.dumps(keys, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *names: str) -> tuple[int, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return tuple(int(data[name]) for name in names)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def make_page_meta(
+    page: int,
+    per_page: int,
+    total: int | None,
+    has_next: bool,
+    has_prev: bool,
+    next_cursor: str | None = None,
+) -> PageMeta:
+    total_pages = (total + per_page - 1) // per_page if total is not None else None
+    return PageMeta(
+        page=page, per_page=per_page, total=total, total_pages=total_pages,
+        has_next=has_next, has_prev=has_prev, next_cursor=next_cursor,
+    )
@@ -0,0 +1,196 @@
+"""Read-through cache for resume read endpoints.
+
+Entries are JSON-encoded response bodies stored under
+
+    <kind>:<user_id>:<generation>:<digest of the request parameters>
+
+Each user has a generation token; any write by the user replaces it
+(invalidate_user), which makes all of their older entries unreachable; they
+age out through TTL/LRU. Resume bodies also carry their version, so a cached
+entry always matches the ETag it is served with.
+
+Concurrent misses for the same key in one process share a single load
+(single-flight). The backend is pluggable: MemoryBackend keeps entries per
+process (a single worker only, see app.db.routing.check_shared_state),
+RedisBackend shares them between gunicorn workers and accepts any client with
+async get/set(ex=)/delete, e.g. redis.asyncio or a local stand-in. Caching is
+off unless RESPONSE_CACHE_BACKEND names a backend.
+"""
+import asyncio
+import hashlib
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Protocol
+
+from app.config import RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS
+from app.utils import fastjson
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# generation tokens outlive entries; losing one only causes misses, never stale reads
+GENERATION_TTL_SECONDS = 24 * 3600
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int):
+        self._data: TTLCache[str, bytes] = TTLCache(maxsize, 0)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._data.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared backend over a Redis-like client; entries are evicted by the server (TTL + its LRU policy)."""
+
+    def __init__(self, client: Any, prefix: str = "rc:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            import redis.asyncio
+        except ImportError as exc:  # optional dependency
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis://... requires the 'redis' package") from exc
+        return cls(redis.asyncio.from_url(url))
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, ex=max(int(ttl), 1))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+
+def make_backend(spec: str) -> CacheBackend | None:
+    if spec in ("", "none", "off"):
+        return None
+    if spec == "memory":
+        return MemoryBackend(RESPONSE_CACHE_SIZE)
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(spec)
+    raise ValueError(f"unknown RESPONSE_CACHE_BACKEND: {spec!r}")
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend | None, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    async def _generation(self, user_id: int) -> str:
+        key = f"gen:{user_id}"
+        gen = await self.backend.get(key)
+        if gen is None:
+            gen = uuid.uuid4().hex[:12].encode()
+            await self.backend.set(key, gen, GENERATION_TTL_SECONDS)
+        return gen.decode() if isinstance(gen, bytes) else str(gen)
+
+    async def get_or_load(
+        self, kind: str, user_id: int, params: tuple, load: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        """Return the cached body for (kind, user, params), calling `load` on a miss.
+
+        Exceptions from `load` (e.g. a 404) are not cached. Backend failures
+        degrade to a plain load.
+        """
+        if not self.enabled:
+            return await load()
+        try:
+            digest = hashlib.blake2b(repr(params).encode(), digest_size=12).hexdigest()
+            key = f"{kind}:{user_id}:{await self._generation(user_id)}:{digest}"
+            raw = await self.backend.get(key)
+        except Exception:
+            self.errors += 1
+            logger.warning("Response cache unavailable, reading through", exc_info=True)
+            return await load()
+        if raw is not None:
+            self.hits += 1
+            return fastjson.loads(raw)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await load()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()  # mark retrieved when nobody was waiting
+            raise
+        else:
+            future.set_result(body)
+        finally:
+            del self._inflight[key]
+        try:
+            await self.backend.set(key, fastjson.dumps(body), self.ttl)
+        except Exception:
+            self.errors += 1
+            logger.warning("Response cache write failed", exc_info=True)
+        return body
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached read of the user; call after the write has committed."""
+        if not self.enabled:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.delete(f"gen:{user_id}")
+        except Exception:
+            self.errors += 1
+            logger.warning("Response cache invalidation failed; user=%s", user_id, exc_info=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.coalesced = self.invalidations = self.errors = 0
+
+
+response_cache = ResponseCache(make_backend(RESPONSE_CACHE_BACKEND), RESPONSE_CACHE_TTL_SECONDS)
@@ -0,0 +1,60 @@
+import zlib
+from typing import AsyncIterator
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Gzip an async byte stream, flushing after every chunk so the client sees data as it's produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class LineTooLong(ValueError):
+    def __init__(self, limit: int):
+        super().__init__(f"Input line longer than {limit} bytes")
+        self.limit = limit
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line: int | None = None) -> AsyncIterator[bytes]:
+    """Split an async byte stream into lines (without the trailing newline).
+
+    Raises LineTooLong as soon as a line grows past `max_line` bytes, before
+    the rest of it is buffered.
+    """
+    pending = bytearray()
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            if max_line is not None and len(pending) + end - start > max_line:
+                raise LineTooLong(max_line)
+            if pending:
+                pending += chunk[start:end]
+                line = bytes(pending)
+                pending.clear()
+            else:
+                line = chunk[start:end]
+            yield line.rstrip(b"\r")
+            start = end + 1
+        pending += chunk[start:]
+        if max_line is not None and len(pending) > max_line:
+            raise LineTooLong(max_line)
+    if pending.strip():
+        yield bytes(pending).rstrip(b"\r")
+
+
+async def gunzip_stream(chunks: AsyncIterator[bytes], max_chunk: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Decompress a gzip (or zlib) byte stream in pieces of at most `max_chunk` bytes."""
+    decompressor = zlib.decompressobj(47)  # gzip or zlib header, detected automatically
+    async for chunk in chunks:
+        # bounded output per call: a small, highly compressed chunk can't expand in one piece
+        while chunk:
+            data = decompressor.decompress(chunk, max_chunk)
+            if data:
+                yield data
+            chunk = decompressor.unconsumed_tail
+    tail = decompressor.flush()
+    if tail:
+        yield tail
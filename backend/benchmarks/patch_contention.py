@@ -0,0 +1,97 @@
+"""Lock-contention benchmark: concurrent PATCHes of a single resume, old vs new write path.
+
+Runs against the PostgreSQL database from app.config (DB_* env vars) and creates
+its own throwaway user and resume:
+
+    python -m benchmarks.patch_contention --concurrency 32 --seconds 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.connect import AsyncSessionLocal, dispose_engines, init_engines
+from app.db.models import Resume, ResumeRevision, User
+from app.db.writes import snapshot_and_update
+
+
+async def legacy_patch(db: AsyncSession, resume_id: int, user_id: int, content: str) -> bool:
+    # the pre-CTE path: SELECT ... FOR UPDATE, INSERT revision, versioned UPDATE, refresh
+    stmt = select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id).with_for_update()
+    r = (await db.execute(stmt)).scalars().first()
+    db.add(ResumeRevision(resume_id=r.id, version=r.version, content=r.content))
+    r.content = content
+    r.version += 1
+    await db.flush()
+    await db.refresh(r)
+    return True
+
+
+async def cte_patch(db: AsyncSession, resume_id: int, user_id: int, content: str) -> bool:
+    return await snapshot_and_update(db, resume_id, user_id, {"content": content}) is not None
+
+
+async def run(write, resume_id: int, user_id: int, concurrency: int, seconds: float) -> tuple[list[float], int]:
+    """Latencies of the applied patches and the number of attempts that applied nothing (rolled back)."""
+    latencies: list[float] = []
+    failed = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(n: int) -> None:
+        nonlocal failed
+        i = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                if await write(db, resume_id, user_id, f"worker {n} edit {i}"):
+                    await db.commit()
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    await db.rollback()
+                    failed += 1
+            i += 1
+
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return latencies, failed
+
+
+def report(name: str, latencies: list[float], failed: int, seconds: float) -> None:
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:>7}: {len(latencies) / seconds:8.1f} patches/s  "
+        f"p50={q[49] * 1000:6.1f}ms  p99={q[98] * 1000:6.1f}ms  failed={failed}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    init_engines()
+
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        resume = Resume(title="bench", content="initial", user_id=user.id)
+        db.add(resume)
+        await db.commit()
+
+    try:
+        for name, write in (("legacy", legacy_patch), ("cte", cte_patch)):
+            latencies, failed = await run(write, resume.id, user.id, args.concurrency, args.seconds)
+            report(name, latencies, failed, args.seconds)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
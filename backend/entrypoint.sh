@@ -1,7 +1,7 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-echo "Waiting for database ${DB_HOST}:${DB_PORT}..."
+echo "Waiting for database ${DB_HOST:-localhost}:${DB_PORT:-5432}..."
 python - <<'PY'
 import os, time, sys, asyncio, asyncpg
 host = os.getenv("DB_HOST", "localhost")
@@ -11,44 +11,32 @@ pwd  = os.getenv("DB_PASSWORD", "postgres")
 db   = os.getenv("DB_NAME", "postgres")
 
 dsn = f"postgresql://{user}:{pwd}@{host}:{port}/{db}"
-for i in range(60):
+
+async def ping():
+    conn = await asyncpg.connect(dsn, timeout=2)
+    await conn.close()
+
+deadline = time.monotonic() + 60
+while True:
     try:
-        async def ping():
-            conn = await asyncpg.connect(dsn)
-            await conn.close()
         asyncio.run(ping())
         print("DB is ready")
         sys.exit(0)
     except Exception:
-        time.sleep(1)
-print("DB not ready after 60s"); sys.exit(1)
+        if time.monotonic() > deadline:
+            print("DB not ready after 60s"); sys.exit(1)
+        time.sleep(0.5)
 PY
 
-echo "Alembic state BEFORE:"
-alembic heads || true
-alembic current -v || true
-alembic history --verbose | tail -n 20 || true
-
-VERS_DIR="alembic/versions"
-
-if [ ! -d "$VERS_DIR" ]; then
-  echo "No versions directory found — creating: $VERS_DIR"
-  mkdir -p "$VERS_DIR"
+# Migrations are committed to alembic/versions and never generated here. Set RUN_MIGRATIONS=0
+# when a separate release step applies them, so workers start without touching alembic at all.
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+  echo "Running alembic upgrade head..."
+  alembic upgrade head
 fi
 
-if [ -z "$(ls -A "$VERS_DIR" 2>/dev/null || true)" ] || [ -z "$(alembic heads -q || true)" ]; then
-  echo "No migrations found — generating initial migration (autogenerate)"
-  alembic revision -m "init schema" --autogenerate
-else
-  echo "Migrations already exist, skipping autogenerate"
-fi
-
-echo "Running alembic upgrade head..."
-alembic upgrade head
-
-echo "Alembic state AFTER:"
-alembic heads || true
-alembic current -v || true
-
 echo "Starting app..."
-exec gunicorn -w 4 -k uvicorn.workers.UvicornWorker --timeout 300 -b 0.0.0.0:8000 main:app
+# shared by the workers so /metrics aggregates all of them; cleared by gunicorn on start
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+# workers report ready on /readyz once their pools are warm (app.health)
+exec gunicorn -c gunicorn.conf.py main:app
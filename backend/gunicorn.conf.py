@@ -0,0 +1,23 @@
+"""gunicorn settings (entrypoint.sh: gunicorn -c gunicorn.conf.py main:app)."""
+import os
+import shutil
+
+bind = "0.0.0.0:8000"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 300
+
+
+def on_starting(server):
+    # per-worker prometheus_client files from a previous run would be summed into /metrics
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,10 +1,54 @@
-from fastapi import FastAPI
+import time
+
+STARTED = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.admission import admit, pool_timeout_handler
+from app.config import DB_POOL_PREWARM, PURGE_ENABLED
+from app.db.connect import AsyncSessionLocal, dispose_engines, init_engines
+from app.db.purge import run_purger
+from app.db.routing import check_shared_state
+from app.health import start_worker, startup
 from app.middleware import setup_middleware
-from app.routers import auth_router, resume_router
+from app.jobs import job_runner
+from app.metrics import run_sampler
+from app.routers import auth_router, health_router, jobs_router, metrics_router, resume_router
+from app.utils.hashing import hash_executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup.record("import", time.perf_counter() - STARTED)
+    check_shared_state()
+    # created here, in the worker, so nothing pooled is shared across gunicorn's fork
+    engines = init_engines()
+    tasks = [
+        asyncio.create_task(run_sampler()),
+        # /healthz answers meanwhile; /readyz once the pools are warm
+        asyncio.create_task(start_worker(list(engines), DB_POOL_PREWARM, STARTED)),
+    ]
+    if PURGE_ENABLED:
+        tasks.append(asyncio.create_task(run_purger(AsyncSessionLocal)))
+    yield
+    startup.ready = False
+    for task in tasks:
+        task.cancel()
+    await job_runner.shutdown()
+    hash_executor.shutdown()
+    await dispose_engines()
+
 
-app = FastAPI(title="Resume App")
+app = FastAPI(title="Resume App", lifespan=lifespan)
 
 setup_middleware(app)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
 
 app.include_router(auth_router.router, prefix="/auth", tags=["auth"])
-app.include_router(resume_router.router, prefix="/resume", tags=["resume"])
+# admission runs before the handlers' own dependencies open a session
+app.include_router(resume_router.router, prefix="/resume", tags=["resume"], dependencies=[Depends(admit)])
+app.include_router(jobs_router.router, prefix="/jobs", tags=["jobs"], dependencies=[Depends(admit)])
+app.include_router(metrics_router.router)
+app.include_router(health_router.router)
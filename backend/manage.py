@@ -0,0 +1,181 @@
+"""Maintenance commands.
+
+    python manage.py compact-revisions [--batch-size 500]
+    python manage.py import-resumes FILE --email user@example.com [--format csv] [--checkpoint FILE]
+    python manage.py reconcile-counters [--fix] [--batch-size 1000]
+    python manage.py purge-deleted [--batch-size 500] [--pause 0.2]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from app.config import IMPORT_BATCH_SIZE, IMPORT_MAX_LINE_BYTES, PURGE_BATCH_SIZE, PURGE_PAUSE_SECONDS
+from app.db.connect import AsyncSessionLocal, dispose_engines, init_engines
+from app.db.counters import COUNTERS, reconcile_counters
+from app.db.purge import purge_step
+from app.db.importer import ImportStats, import_resumes
+from app.db.models import User
+from app.db.revisions import compact_revisions
+from app.logger import logger
+from app.utils.streaming import iter_lines
+
+READ_CHUNK_BYTES = 1 << 20
+
+
+async def run_compact_revisions(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    cursor, total = (0, 0), 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            converted, cursor = await compact_revisions(db, args.batch_size, cursor)
+            await db.commit()
+        if not converted:
+            break
+        total += converted
+        logger.info("compact-revisions: converted=%s cursor=%s", total, cursor)
+        if args.pause:
+            await asyncio.sleep(args.pause)
+    logger.info("compact-revisions: done, %s rows in %.1fs", total, time.perf_counter() - started)
+
+
+async def _file_chunks(path: Path) -> AsyncIterator[bytes]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, READ_CHUNK_BYTES):
+            yield chunk
+
+
+def _load_checkpoint(path: Path | None, source: Path) -> int:
+    if path is None or not path.exists():
+        return 0
+    state = json.loads(path.read_text())
+    if state.get("source") != str(source) or state.get("size") != source.stat().st_size:
+        raise SystemExit(f"{path} belongs to another input; remove it to start over")
+    return state["records"]
+
+
+def _save_checkpoint(path: Path, source: Path, stats: ImportStats) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"source": str(source), "size": source.stat().st_size, "records": stats.checkpoint}))
+    os.replace(tmp, path)
+
+
+async def run_import_resumes(args: argparse.Namespace) -> None:
+    source = Path(args.file).resolve()
+    checkpoint = Path(args.checkpoint) if args.checkpoint else None
+    async with AsyncSessionLocal() as db:
+        user_id = args.user_id or await db.scalar(select(User.id).where(User.email == args.email))
+    if user_id is None:
+        raise SystemExit(f"no user with email {args.email}")
+    fmt = args.format or ("csv" if ".csv" in source.suffixes else "ndjson")
+    skip = _load_checkpoint(checkpoint, source)
+    if skip:
+        logger.info("import-resumes: resuming after record %s", skip)
+
+    def progress(stats: ImportStats) -> None:
+        if checkpoint is not None:
+            _save_checkpoint(checkpoint, source, stats)
+        logger.info("import-resumes: records=%s imported=%s invalid=%s %.0f rows/s",
+                    stats.checkpoint, stats.imported, stats.invalid, stats.rows_per_sec)
+
+    stats = await import_resumes(
+        AsyncSessionLocal, user_id, iter_lines(_file_chunks(source), IMPORT_MAX_LINE_BYTES), fmt,
+        with_history=not args.no_history, skip=skip, batch_size=args.batch_size, on_progress=progress,
+    )
+    for error in stats.errors:
+        logger.warning("import-resumes: record %s: %s", error["record"], error["error"])
+    logger.info(
+        "import-resumes: done, %s imported (%s revisions), %s invalid in %.1fs, %.0f rows/s",
+        stats.imported, stats.revisions, stats.invalid, stats.elapsed, stats.rows_per_sec,
+    )
+
+
+async def run_reconcile_counters(args: argparse.Namespace) -> None:
+    drifted = 0
+    for counter in COUNTERS:
+        cursor, checked = 0, 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                n, drifts, cursor = await reconcile_counters(db, counter, args.batch_size, cursor, fix=args.fix)
+                await db.commit()
+            if not n:
+                break
+            checked += n
+            drifted += len(drifts)
+            for d in drifts:
+                logger.warning("reconcile-counters: %s id=%s stored=%s actual=%s%s",
+                               counter, d.id, d.stored, d.actual, " (fixed)" if args.fix else "")
+        logger.info("reconcile-counters: %s checked=%s", counter, checked)
+    logger.info("reconcile-counters: done, %s drifted%s", drifted, " and fixed" if args.fix and drifted else "")
+    if drifted and not args.fix:
+        # non-zero exit so a scheduled check can alert
+        raise SystemExit(1)
+
+
+async def run_purge_deleted(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    total = 0
+    while removed := await purge_step(AsyncSessionLocal, args.batch_size):
+        total += removed
+        logger.info("purge-deleted: removed=%s", total)
+        if args.pause:
+            await asyncio.sleep(args.pause)
+    logger.info("purge-deleted: done, %s rows in %.1fs", total, time.perf_counter() - started)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="manage.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser(
+        "compact-revisions", help="convert plain resume_revisions rows to keyframe/delta storage",
+    )
+    compact.add_argument("--batch-size", type=int, default=500)
+    compact.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    compact.set_defaults(handler=run_compact_revisions)
+
+    imp = commands.add_parser("import-resumes", help="bulk load resumes from an NDJSON or CSV file (.gz ok)")
+    imp.add_argument("file")
+    owner = imp.add_mutually_exclusive_group(required=True)
+    owner.add_argument("--user-id", type=int)
+    owner.add_argument("--email")
+    imp.add_argument("--format", choices=["ndjson", "csv"], help="default: from the file extension")
+    imp.add_argument("--no-history", action="store_true", help="ignore history, import current contents only")
+    imp.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    imp.add_argument("--checkpoint", help="file recording progress; an existing one resumes the import")
+    imp.set_defaults(handler=run_import_resumes)
+
+    reconcile = commands.add_parser(
+        "reconcile-counters", help="compare users.resume_count / resumes.revision_count with real counts",
+    )
+    reconcile.add_argument("--fix", action="store_true", help="rewrite drifted counters")
+    reconcile.add_argument("--batch-size", type=int, default=1000)
+    reconcile.set_defaults(handler=run_reconcile_counters)
+
+    purge = commands.add_parser(
+        "purge-deleted", help="remove tombstoned resumes, their revisions and expired idempotency keys now",
+    )
+    purge.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    purge.add_argument("--pause", type=float, default=PURGE_PAUSE_SECONDS, help="seconds to sleep between batches")
+    purge.set_defaults(handler=run_purge_deleted)
+    return parser
+
+
+async def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    init_engines()
+    try:
+        await args.handler(args)
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
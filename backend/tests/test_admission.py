@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from main import app
+from app.admission import CHEAP, EXPENSIVE, Gate, Overloaded, RateLimiter, admission, parse_route_limits
+from app.db.deps import get_session
+
+
+@pytest.fixture
+def fast_waits(monkeypatch):
+    monkeypatch.setattr(admission, "waits", (0.05, 0.05))
+
+
+@pytest.mark.anyio
+async def test_gate_wakes_cheap_waiters_first():
+    gate = Gate(1)
+    await gate.acquire()
+    order = []
+
+    async def wait(priority, name):
+        await gate.acquire(priority, timeout=1)
+        order.append(name)
+        gate.release()
+
+    expensive = asyncio.create_task(wait(EXPENSIVE, "expensive"))
+    await asyncio.sleep(0)
+    cheap = asyncio.create_task(wait(CHEAP, "cheap"))
+    await asyncio.sleep(0)
+    assert gate.waiting == 2
+    gate.release()
+    await asyncio.gather(expensive, cheap)
+    assert order == ["cheap", "expensive"]
+    assert gate.active == 0 and gate.waiting == 0
+
+
+@pytest.mark.anyio
+async def test_gate_bounded_wait_and_cancellation():
+    gate = Gate(1)
+    await gate.acquire()
+    with pytest.raises(Overloaded):
+        await gate.acquire(timeout=0)
+    with pytest.raises(Overloaded):
+        await gate.acquire(timeout=0.01)
+    assert gate.waiting == 0
+
+    waiter = asyncio.create_task(gate.acquire(timeout=1))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert gate.waiting == 0
+    gate.release()
+    assert gate.active == 0
+
+
+def test_rate_limiter_and_route_limits():
+    limiter = RateLimiter(rate=10, burst=2)
+    assert limiter.take(1) == 0 and limiter.take(1) == 0
+    assert 0 < limiter.take(1) <= 0.1
+    assert limiter.take(2) == 0
+    assert RateLimiter(0, 0).take(1) == 0
+
+    assert parse_route_limits("POST /resume/import=2, GET /resume/{resume_id}/history=4,") == {
+        ("POST", "/resume/import"): 2, ("GET", "/resume/{resume_id}/history"): 4,
+    }
+    with pytest.raises(ValueError):
+        parse_route_limits("/resume=2")
+
+
+@pytest.mark.anyio
+async def test_rate_limited_user_gets_429(client):
+    admission.limiter = RateLimiter(rate=1, burst=2)
+    assert (await client.get("/resume")).status_code == 200
+    assert (await client.get("/resume")).status_code == 200
+    r = await client.get("/resume")
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "1"
+
+
+@pytest.mark.anyio
+async def test_full_capacity_sheds_with_503(client, monkeypatch, fast_waits):
+    rid = (await client.post("/resume", json={"title": "A", "content": "x"})).json()["id"]
+    monkeypatch.setattr(admission, "capacity", Gate(0))
+    r = await client.get(f"/resume/{rid}")
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
+
+
+@pytest.mark.anyio
+async def test_expensive_requests_cannot_take_the_whole_capacity(client, monkeypatch, fast_waits):
+    rid = (await client.post("/resume", json={"title": "A", "content": "x"})).json()["id"]
+    monkeypatch.setattr(admission, "expensive", Gate(0))
+    assert (await client.get(f"/resume/{rid}/history")).status_code == 503
+    assert (await client.get("/resume", params={"q": "A"})).status_code == 503
+    assert (await client.get("/resume")).status_code == 200
+    assert (await client.get(f"/resume/{rid}")).status_code == 200
+
+
+@pytest.mark.anyio
+async def test_slots_are_released(client):
+    rid = (await client.post("/resume", json={"title": "A", "content": "x"})).json()["id"]
+    for _ in range(3):
+        assert (await client.get(f"/resume/{rid}/history")).status_code == 200
+    assert (await client.get("/resume/export")).status_code == 200
+    assert (await client.get("/resume/404404")).status_code == 404
+    assert admission.capacity.active == 0 and admission.expensive.active == 0
+    assert all(gate.active == 0 for gate in admission.routes.values())
+
+
+@pytest.mark.anyio
+async def test_export_slots_are_released_when_the_client_disconnects(client):
+    await client.post("/resume", json={"title": "A", "content": "x"})
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/resume/export", "raw_path": b"/resume/export", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"test")], "client": ("test", 1), "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(0)
+
+    await app(scope, receive, send)
+    # gone before the body was read: the export's slots are back all the same
+    assert admission.capacity.active == 0 and admission.expensive.active == 0
+    assert all(gate.active == 0 for gate in admission.routes.values())
+
+
+@pytest.mark.anyio
+async def test_pool_timeout_is_answered_503(client):
+    async def exhausted_pool():
+        raise PoolTimeoutError("QueuePool limit of size 10 overflow 20 reached")
+        yield
+
+    app.dependency_overrides[get_session] = exhausted_pool
+    r = await client.post("/resume", json={"title": "A", "content": "x"})
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
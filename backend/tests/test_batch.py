@@ -0,0 +1,58 @@
+import pytest
+
+
+async def _create(client, title):
+    r = await client.post("/resume", json={"title": title, "content": f"{title} body"})
+    return r.json()["id"]
+
+
+@pytest.mark.anyio
+async def test_batch_best_effort(client):
+    a = await _create(client, "A")
+    b = await _create(client, "B")
+
+    r = await client.post("/resume/batch", json={"mode": "best_effort", "operations": [
+        {"op": "create", "title": "C", "content": "c"},
+        {"op": "update", "id": a, "content": "A v2"},
+        {"op": "delete", "id": b},
+        {"op": "delete", "id": 9999},
+        {"op": "update", "id": a, "title": "dup"},
+        {"op": "create", "title": "D", "content": "d"},
+    ]})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["ok"] is False
+    statuses = [x["status"] for x in data["results"]]
+    assert statuses == [201, 200, 200, 404, 409, 201]
+    assert data["results"][1]["item"] == {"id": a, "title": "A", "content": "A v2"}
+    assert [x["item"]["title"] for x in data["results"] if x["op"] == "create"] == ["C", "D"]
+
+    r = await client.get("/resume")
+    assert sorted(x["title"] for x in r.json()["items"]) == ["A", "C", "D"]
+    r = await client.get(f"/resume/{a}/history")
+    assert [x["content"] for x in r.json()["items"]] == ["A body"]
+
+
+@pytest.mark.anyio
+async def test_batch_atomic_rejects_everything(client):
+    a = await _create(client, "A")
+
+    r = await client.post("/resume/batch", json={"operations": [
+        {"op": "update", "id": a, "title": "changed"},
+        {"op": "create", "title": "C", "content": "c"},
+        {"op": "delete", "id": 9999},
+    ]})
+    assert r.status_code == 409
+    assert [x["status"] for x in r.json()["results"]] == [424, 424, 404]
+
+    r = await client.get("/resume")
+    assert [x["title"] for x in r.json()["items"]] == ["A"]
+
+
+@pytest.mark.anyio
+async def test_batch_limits(client):
+    r = await client.post("/resume/batch", json={"operations": []})
+    assert r.status_code == 422
+    ops = [{"op": "create", "title": "x", "content": "y"}] * 101
+    r = await client.post("/resume/batch", json={"operations": ops})
+    assert r.status_code == 422
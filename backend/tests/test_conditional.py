@@ -0,0 +1,74 @@
+import pytest
+
+
+@pytest.mark.anyio
+async def test_get_resume_if_none_match(client):
+    r = await client.post("/resume", json={"title": "CV", "content": "text"})
+    resume_id = r.json()["id"]
+    etag = r.headers["ETag"]
+    assert etag == f'"{resume_id}-1"'
+
+    r = await client.get(f"/resume/{resume_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+    assert r.content == b""
+
+    await client.post(f"/resume/{resume_id}/improve")
+    r = await client.get(f"/resume/{resume_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] == f'"{resume_id}-2"'
+
+
+@pytest.mark.anyio
+async def test_list_pages_if_none_match(client):
+    r = await client.post("/resume", json={"title": "CV", "content": "text"})
+    resume_id = r.json()["id"]
+
+    r = await client.get("/resume")
+    etag = r.headers["ETag"]
+    r = await client.get("/resume", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    r = await client.get("/resume?per_page=5", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+    await client.patch(f"/resume/{resume_id}", json={"title": "CV", "content": "new"})
+    r = await client.get("/resume", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+    r = await client.get(f"/resume/{resume_id}/history")
+    history_etag = r.headers["ETag"]
+    r = await client.get(f"/resume/{resume_id}/history", headers={"If-None-Match": history_etag})
+    assert r.status_code == 304
+
+
+@pytest.mark.anyio
+async def test_if_match_optimistic_writes(client):
+    r = await client.post("/resume", json={"title": "CV", "content": "v1"})
+    resume_id = r.json()["id"]
+    etag_v1 = r.headers["ETag"]
+
+    r = await client.patch(
+        f"/resume/{resume_id}", json={"title": "CV", "content": "v2"}, headers={"If-Match": etag_v1},
+    )
+    assert r.status_code == 200
+    etag_v2 = r.headers["ETag"]
+
+    r = await client.patch(
+        f"/resume/{resume_id}", json={"title": "CV", "content": "lost"}, headers={"If-Match": etag_v1},
+    )
+    assert r.status_code == 412
+    assert r.headers["ETag"] == etag_v2
+    r = await client.post(f"/resume/{resume_id}/improve", headers={"If-Match": etag_v1})
+    assert r.status_code == 412
+
+    r = await client.post(f"/resume/{resume_id}/improve", headers={"If-Match": etag_v2})
+    assert r.status_code == 200
+    assert r.json()["content"] == "v2 [Improved]"
+
+    r = await client.get(f"/resume/{resume_id}/history")
+    assert [x["version"] for x in r.json()["items"]] == [2, 1]
+
+    r = await client.patch("/resume/999", json={"title": "x", "content": "y"}, headers={"If-Match": '"999-1"'})
+    assert r.status_code == 404
+    r = await client.patch(f"/resume/{resume_id}", json={"title": "x", "content": "y"}, headers={"If-Match": "junk"})
+    assert r.status_code == 412
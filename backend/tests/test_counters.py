@@ -0,0 +1,134 @@
+import asyncio
+import json
+import random
+
+import pytest
+from sqlalchemy import event, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.connect import Base
+from app.db.counters import COUNTERS, reconcile_counters
+from app.db.models import Resume, ResumeRevision, User
+from app.db.profiler import profile_queries
+from app.db.writes import bulk_create, bulk_delete, snapshot_and_update
+
+
+async def _assert_exact(db):
+    for counter in COUNTERS:
+        checked, drifts, _ = await reconcile_counters(db, counter)
+        assert drifts == [], counter
+
+
+@pytest.mark.anyio
+async def test_counters_follow_every_write_path(client, session):
+    a = (await client.post("/resume", json={"title": "A", "content": "a1"})).json()["id"]
+    r = await client.post("/resume/batch", json={"operations": [
+        {"op": "create", "title": "B", "content": "b1"},
+        {"op": "create", "title": "C", "content": "c1"},
+        {"op": "update", "id": a, "content": "a2"},
+    ]})
+    b, c = [item["id"] for item in r.json()["results"][:2]]
+    await client.patch(f"/resume/{a}", json={"title": "A", "content": "a3"})
+    await client.post(f"/resume/{a}/improve")
+    lines = [{"title": "D", "content": "d3", "history": ["d1", "d2"]}, {"title": "E", "content": "e1"}]
+    await client.post("/resume/import", content="\n".join(json.dumps(x) for x in lines).encode())
+    await client.delete(f"/resume/{b}")
+    await client.post("/resume/batch", json={"operations": [{"op": "delete", "id": c}]})
+    assert (await client.delete(f"/resume/{c}")).status_code == 404
+
+    await _assert_exact(session)
+    user = await session.get(User, 1)
+    await session.refresh(user)
+    assert user.resume_count == 3
+    assert await session.scalar(select(Resume.revision_count).where(Resume.id == a)) == 3
+
+    listing = (await client.get("/resume?per_page=1")).json()
+    assert listing["meta"]["total"] == 3
+
+    with profile_queries() as prof:
+        history = (await client.get(f"/resume/{a}/history?per_page=2")).json()
+    assert history["meta"]["total"] == 3 and len(history["items"]) == 2
+    assert prof.statements == 1  # ownership, total and page in one query
+
+    empty = await client.get(f"/resume/{a}/history?page=5")
+    assert empty.status_code == 200 and empty.json()["meta"]["total"] == 3
+    assert (await client.get(f"/resume/{c}/history")).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_parallel_writes_keep_counters_exact(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/counters.db", connect_args={"timeout": 30})
+    # SQLite reuses the highest rowid after a delete; without FK enforcement a recreated
+    # resume would inherit the orphaned revisions of the deleted one
+    event.listen(engine.sync_engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(User(id=1, email="a@example.com", password_hash="x"))
+        await db.commit()
+        [shared] = await bulk_create(db, 1, [{"title": "shared", "content": "0"}])
+        await db.commit()
+
+    rng = random.Random(7)
+
+    async def worker(n: int) -> None:
+        for step in range(10):
+            action = rng.choice(["create", "update", "update_shared", "delete"])
+            async with factory() as db:
+                ids = (await db.execute(
+                    select(Resume.id).where(Resume.id != shared.id, Resume.live)
+                )).scalars().all()
+            async with factory() as db:
+                if action == "create":
+                    await bulk_create(db, 1, [{"title": f"w{n}", "content": str(step)}] * rng.randint(1, 3))
+                elif action == "update_shared":
+                    await snapshot_and_update(db, shared.id, 1, {"content": f"{n}.{step}"})
+                elif ids and action == "update":
+                    await snapshot_and_update(db, rng.choice(ids), 1, {"content": f"{n}.{step}"})
+                elif ids:
+                    # several workers often race to delete the same rows
+                    await bulk_delete(db, 1, rng.sample(ids, min(len(ids), 2)))
+                await db.commit()
+            await asyncio.sleep(0)
+
+    try:
+        await asyncio.gather(*(worker(n) for n in range(12)))
+        async with factory() as db:
+            await _assert_exact(db)
+            stored = await db.scalar(select(User.resume_count).where(User.id == 1))
+            assert stored == await db.scalar(select(func.count()).select_from(Resume).where(Resume.live))
+            revisions = await db.scalar(select(Resume.revision_count).where(Resume.id == shared.id))
+            assert revisions == await db.scalar(
+                select(func.count()).select_from(ResumeRevision).where(ResumeRevision.resume_id == shared.id)
+            ) > 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_reconcile_detects_and_repairs_drift(client, session):
+    ids = [(await client.post("/resume", json={"title": t, "content": t})).json()["id"] for t in "ABC"]
+    await client.patch(f"/resume/{ids[0]}", json={"title": "A", "content": "A2"})
+    await session.execute(update(User).values(resume_count=10))
+    await session.execute(update(Resume.__table__).where(Resume.id.in_(ids[:2])).values(revision_count=7))
+
+    drifts = []
+    for counter in COUNTERS:
+        cursor = 0
+        while True:
+            checked, found, cursor = await reconcile_counters(session, counter, batch_size=1, after=cursor)
+            if not checked:
+                break
+            drifts += found
+    assert sorted((d.counter, d.id, d.stored, d.actual) for d in drifts) == [
+        ("resumes.revision_count", ids[0], 7, 1),
+        ("resumes.revision_count", ids[1], 7, 0),
+        ("users.resume_count", 1, 10, 3),
+    ]
+
+    for counter in COUNTERS:
+        await reconcile_counters(session, counter, fix=True)
+    await _assert_exact(session)
+    # repaired without touching the optimistic-locking version
+    assert await session.scalar(select(Resume.version).where(Resume.id == ids[1])) == 1
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from app.db.revisions import compact_revisions
+
+
+@pytest.mark.anyio
+async def test_export_ndjson_stream(client, session):
+    a = (await client.post("/resume", json={"title": "A", "content": "a1"})).json()["id"]
+    b = (await client.post("/resume", json={"title": "B", "content": "b1"})).json()["id"]
+    for i in range(2, 5):
+        await client.patch(f"/resume/{a}", json={"title": "A", "content": f"a{i}"})
+    await compact_revisions(session)
+    await session.commit()
+
+    r = await client.get("/resume/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines[0]["type"] == "export"
+    assert [(x["type"], x.get("id") or x.get("resume_id"), x.get("content")) for x in lines[1:-1]] == [
+        ("resume", a, "a4"),
+        ("revision", a, "a1"),
+        ("revision", a, "a2"),
+        ("revision", a, "a3"),
+        ("resume", b, "b1"),
+    ]
+    assert lines[-1] == {"type": "end", "resumes": 2, "revisions": 3}
+
+    r = await client.get("/resume/export?gzip=true&history=false")
+    assert r.headers["content-encoding"] == "gzip"
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [x["type"] for x in lines] == ["export", "resume", "resume", "end"]
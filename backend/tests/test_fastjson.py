@@ -0,0 +1,97 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.schemas.requests import ResumeBatchRequest
+from app.utils import fastjson
+from app.utils.response_cache import response_cache
+
+
+async def _seed(client, resumes: int, revisions: int, size: int) -> int:
+    body = "Senior engineer. Café ü — " + "x" * size
+    ops = [{"op": "create", "title": f"Resume {i}", "content": body} for i in range(resumes)]
+    for start in range(0, len(ops), 100):
+        r = await client.post("/resume/batch", json={"operations": ops[start:start + 100]})
+        assert r.status_code == 200, r.text
+    rid = (await client.get("/resume?per_page=1")).json()["items"][0]["id"]
+    for i in range(revisions):
+        await client.patch(f"/resume/{rid}", json={"title": "Resume", "content": f"{body} {i}"})
+    return rid
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("cached", [False, True])
+async def test_fast_path_matches_validated_responses(client, monkeypatch, cached):
+    rid = await _seed(client, resumes=12, revisions=6, size=50)
+    if not cached:
+        monkeypatch.setattr(response_cache, "backend", None)
+    urls = [
+        "/resume?per_page=5",
+        "/resume?per_page=5&page=2&include_total=false",
+        "/resume?q=resume%201",
+        "/resume?q=senior&mode=fts",
+        "/resume?view=summary&per_page=3",
+        f"/resume/{rid}/history?per_page=4",
+        f"/resume/{rid}/history?per_page=4&page=2",
+    ]
+    for url in urls:
+        monkeypatch.setattr(fastjson, "enabled", False)
+        slow = await client.get(url)
+        monkeypatch.setattr(fastjson, "enabled", True)
+        fast = await client.get(url)
+        assert fast.status_code == slow.status_code == 200, url
+        assert fast.content == slow.content, url
+        assert fast.headers["etag"] == slow.headers["etag"]
+        assert fast.headers["content-type"] == slow.headers["content-type"]
+        r = await client.get(url, headers={"If-None-Match": fast.headers["etag"]})
+        assert r.status_code == 304
+
+
+def test_stdlib_fallback_encodes_like_orjson(monkeypatch):
+    value = {
+        "text": "naïve “quotes”  ",
+        "at": datetime(2024, 5, 1, 12, 30, 0, 250000, tzinfo=timezone.utc),
+        "local": datetime(2024, 5, 1, 12, 30),
+        "items": [1, None, True, 2.5],
+    }
+    expected = fastjson.dumps(value)
+    monkeypatch.setattr(fastjson, "orjson", None)
+    assert fastjson.dumps(value) == expected
+    assert fastjson.loads(expected)["at"] == "2024-05-01T12:30:00.250000Z"
+
+
+async def _requests_per_cpu_second(client, url: str, n: int) -> float:
+    for _ in range(3):
+        await client.get(url)
+    started = time.process_time()
+    for _ in range(n):
+        assert (await client.get(url)).status_code == 200
+    return n / (time.process_time() - started)
+
+
+@pytest.mark.anyio
+async def test_fast_path_benchmark(client, monkeypatch):
+    rid = await _seed(client, resumes=150, revisions=100, size=2000)
+    pages = {"list": "/resume?per_page=100", "history": f"/resume/{rid}/history?per_page=100"}
+    results = {}
+    for cached in (False, True):
+        if not cached:
+            monkeypatch.setattr(response_cache, "backend", None)
+        else:
+            monkeypatch.undo()
+        for name, url in pages.items():
+            for fast in (False, True):
+                monkeypatch.setattr(fastjson, "enabled", fast)
+                results[name, cached, fast] = await _requests_per_cpu_second(client, url, 30)
+
+    print()
+    for (name, cached, fast), rate in results.items():
+        if fast:
+            base = results[name, cached, False]
+            print(
+                f"{name} page x100 ({'cached' if cached else 'uncached'}): "
+                f"{base:.0f} -> {rate:.0f} req/s per core ({rate / base:.2f}x)"
+            )
+    # a loose bound; the printed numbers are the benchmark
+    assert results["list", True, True] > results["list", True, False]
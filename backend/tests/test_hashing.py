@@ -0,0 +1,33 @@
+import pytest
+from passlib.hash import bcrypt
+from sqlalchemy import select
+
+from app.db.models import User
+from app.utils.hashing import hash_executor
+
+
+@pytest.mark.anyio
+async def test_login_rehashes_outdated_cost(client, session):
+    old_hash = bcrypt.using(rounds=4).hash("123456")
+    session.add(User(email="old@b.c", password_hash=old_hash))
+    await session.flush()
+
+    r = await client.post("/auth/login", json={"email": "old@b.c", "password": "123456"})
+    assert r.status_code == 200, r.text
+    user = (await session.execute(select(User).where(User.email == "old@b.c"))).scalars().one()
+    assert user.password_hash != old_hash
+    assert bcrypt.verify("123456", user.password_hash)
+
+    r = await client.post("/auth/login", json={"email": "old@b.c", "password": "wrong1"})
+    assert r.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_hash_queue_full_returns_503(client, monkeypatch):
+    monkeypatch.setattr(hash_executor, "queue_limit", -hash_executor.workers)
+    rejected = hash_executor.rejected
+
+    r = await client.post("/auth/register", json={"email": "busy@b.c", "password": "123456"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+    assert hash_executor.stats()["rejected"] == rejected + 1
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.health as health
+from main import app
+from app.db.connect import Base
+from app.db.profiler import profile_queries, statement_shape
+from app.db.warmup import hot_statements, warm_pool
+from app.health import start_worker, startup
+from app.utils import fastjson
+from app.utils.auth import make_access_token
+from app.utils.current import Principal, clear_principal_cache, get_principal, get_user
+from app.utils.response_cache import response_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_startup():
+    yield
+    startup.ready = False
+    startup.phases.clear()
+
+
+@pytest.fixture
+async def pooled_engine(tmp_path):
+    eng = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/warm.db", pool_size=3, max_overflow=5)
+    async with eng.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await eng.dispose()
+    try:
+        yield eng
+    finally:
+        await eng.dispose()
+
+
+@pytest.mark.anyio
+async def test_probes(client, pooled_engine):
+    assert (await client.get("/healthz")).json() == {"status": "ok"}
+    assert (await client.get("/readyz")).status_code == 503
+
+    await start_worker([pooled_engine], 2, time.perf_counter())
+    r = await client.get("/readyz")
+    assert r.status_code == 200
+    assert set(r.json()["startup_seconds"]) == {"warmup", "total"}
+    assert pooled_engine.sync_engine.pool.checkedin() == 2
+
+
+@pytest.mark.anyio
+async def test_warm_pool_is_capped_at_pool_size(pooled_engine):
+    assert await warm_pool(pooled_engine, 10) == 3
+    pool = pooled_engine.sync_engine.pool
+    assert pool.checkedin() == 3 and pool.checkedout() == 0
+
+
+@pytest.mark.anyio
+async def test_not_ready_until_the_database_answers(monkeypatch, pooled_engine):
+    calls = []
+
+    async def flaky(engine, connections):
+        calls.append(connections)
+        if len(calls) == 1:
+            raise ConnectionRefusedError()
+        return connections
+
+    monkeypatch.setattr(health, "warm_pool", flaky)
+    monkeypatch.setattr(health, "WARMUP_RETRY_SECONDS", 0.01)
+    await start_worker([pooled_engine], 2, time.perf_counter())
+    assert calls == [2, 2] and startup.ready
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.anyio
+async def test_hot_statements_match_the_handlers(client, session, engine, monkeypatch, fast):
+    monkeypatch.setattr(fastjson, "enabled", fast)
+    # the If-None-Match version probe only runs without the response cache
+    monkeypatch.setattr(response_cache, "backend", None)
+    rid = (await client.post("/resume", json={"title": "A", "content": "x"})).json()["id"]
+    token = make_access_token("test@example.com", 1)
+    clear_principal_cache()
+    # the conftest override loads the whole User; the real dependency's query runs via get_user below
+    app.dependency_overrides[get_principal] = lambda: Principal(1, "test@example.com")
+    with profile_queries() as prof:
+        await get_user(token, session)
+        await client.get("/resume")
+        await client.get(f"/resume/{rid}")
+        await client.get(f"/resume/{rid}", headers={"If-None-Match": '"0-0"'})
+    warmed = {statement_shape(str(stmt.compile(dialect=engine.dialect))) for stmt in hot_statements()}
+    assert warmed == set(prof.shapes)
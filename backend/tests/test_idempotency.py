@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.requests import Request
+
+import app.db.idempotency as idempotency
+from app.db.idempotency import Claim, _in_flight, fingerprint, replay_cache
+from app.db.models import IdempotencyKey, Resume
+from app.db.profiler import profile_queries
+from app.db.purge import purge_step
+
+
+def _key(key):
+    return {"Idempotency-Key": key}
+
+
+async def _count(session, model):
+    return await session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.anyio
+async def test_retried_create_returns_the_first_response(client, session):
+    body = {"title": "A", "content": "x"}
+    first = await client.post("/resume", json=body, headers=_key("k1"))
+    assert first.status_code == 201 and "idempotent-replayed" not in first.headers
+
+    with profile_queries() as prof:
+        again = await client.post("/resume", json=body, headers=_key("k1"))
+    assert again.status_code == 201
+    assert again.json() == first.json()
+    assert again.headers["etag"] == first.headers["etag"]
+    assert again.headers["idempotent-replayed"] == "true"
+    # served from the replay cache: nothing touches resumes or idempotency_keys
+    assert not [s for s in prof.shapes if "resumes" in s or "idempotency_keys" in s]
+
+    # another worker (cold cache) replays from the stored row
+    replay_cache.clear()
+    third = await client.post("/resume", json=body, headers=_key("k1"))
+    assert third.json() == first.json() and third.headers["idempotent-replayed"] == "true"
+
+    assert await _count(session, Resume) == 1
+    assert (await client.post("/resume", json=body, headers=_key("k2"))).json()["id"] != first.json()["id"]
+    assert (await client.post("/resume", json=body)).status_code == 201
+    assert await _count(session, Resume) == 3
+
+
+@pytest.mark.anyio
+async def test_key_reused_for_another_request_is_rejected(client):
+    await client.post("/resume", json={"title": "A", "content": "x"}, headers=_key("k"))
+    r = await client.post("/resume", json={"title": "B", "content": "x"}, headers=_key("k"))
+    assert r.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_retried_improve_is_applied_once(client):
+    rid = (await client.post("/resume", json={"title": "A", "content": "x"})).json()["id"]
+    first = await client.post(f"/resume/{rid}/improve", headers=_key("imp"))
+    again = await client.post(f"/resume/{rid}/improve", headers=_key("imp"))
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    # one version bump: the resume is still at the ETag the first improve returned
+    assert (await client.get(f"/resume/{rid}")).headers["etag"] == first.headers["etag"] == again.headers["etag"]
+    assert (await client.get(f"/resume/{rid}/history")).json()["meta"]["total"] == 1
+
+
+@pytest.mark.anyio
+async def test_failed_request_releases_the_key(client, session):
+    r = await client.post("/resume/404404/improve", headers=_key("gone"))
+    assert r.status_code == 404
+    assert await _count(session, IdempotencyKey) == 0
+    # the key is free again; a later success is what gets stored
+    rid = (await client.post("/resume", json={"title": "A", "content": "x"})).json()["id"]
+    assert (await client.post(f"/resume/{rid}/improve", headers=_key("gone"))).status_code == 200
+
+
+def _request_fingerprint(path: str, body: bytes) -> str:
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": []}
+    return fingerprint(Request(scope), body)
+
+
+@pytest.mark.anyio
+async def test_duplicate_waits_for_the_in_flight_original(client, session, monkeypatch):
+    factory = async_sessionmaker(bind=session.bind, expire_on_commit=False)
+    body = b'{"title":"A","content":"x"}'
+    claim = _in_flight[(1, "k")] = Claim(factory, 1, "k", _request_fingerprint("/resume", body))
+    try:
+        waiter = asyncio.create_task(client.post(
+            "/resume", content=body, headers={**_key("k"), "Content-Type": "application/json"},
+        ))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        await claim.complete(JSONResponse({"id": 99}, status_code=201))
+        r = await waiter
+        assert r.status_code == 201 and r.json() == {"id": 99}
+        assert await _count(session, Resume) == 0
+
+        monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+        _in_flight[(1, "slow")] = Claim(factory, 1, "slow", _request_fingerprint("/resume", body))
+        r = await client.post("/resume", content=body, headers={**_key("slow"), "Content-Type": "application/json"})
+        assert r.status_code == 409 and r.headers["retry-after"] == "1"
+    finally:
+        _in_flight.clear()
+
+
+@pytest.mark.anyio
+async def test_abandoned_and_expired_keys(client, session):
+    await client.post("/resume", json={"title": "seed", "content": "x"})
+    old = datetime.now(timezone.utc) - timedelta(hours=2)
+    # in flight on a worker that died: taken over once the lease is up
+    session.add(IdempotencyKey(user_id=1, key="dead", fingerprint="-",
+                               created_at=old, expires_at=old + timedelta(days=1)))
+    session.add(IdempotencyKey(user_id=1, key="expired", fingerprint="-", status_code=201,
+                               created_at=old, expires_at=old + timedelta(minutes=1)))
+    await session.commit()
+
+    r = await client.post("/resume", json={"title": "A", "content": "x"}, headers=_key("dead"))
+    assert r.status_code == 201 and "idempotent-replayed" not in r.headers
+
+    factory = async_sessionmaker(bind=session.bind, expire_on_commit=False)
+    assert await purge_step(factory, 100) == 1
+    keys = (await session.execute(select(IdempotencyKey.key))).scalars().all()
+    assert keys == ["dead"]
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+import app.jobs
+from app.db.routing import recent_writes
+from app.jobs import JobQueueFull, JobRunner, job_runner
+
+
+class GatedImprover:
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.calls = 0
+
+    async def improve(self, title, content):
+        self.calls += 1
+        await self.gate.wait()
+        return content.upper()
+
+
+@pytest.fixture
+async def runner():
+    yield job_runner
+    await job_runner.shutdown()
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    improver = GatedImprover()
+    monkeypatch.setattr(app.jobs, "improver", improver)
+    return improver
+
+
+@pytest.mark.anyio
+async def test_async_improve_job(client, runner):
+    rid = (await client.post("/resume", json={"title": "A", "content": "text"})).json()["id"]
+
+    r = await client.post(f"/resume/{rid}/improve?async=true")
+    assert r.status_code == 202
+    job = r.json()
+    assert job["status"] == "queued" and job["base_version"] == 1
+    assert r.headers["location"] == f"/jobs/{job['id']}"
+
+    await runner.join()
+    job = (await client.get(f"/jobs/{job['id']}")).json()
+    assert (job["status"], job["result_version"]) == ("succeeded", 2)
+    assert (await client.get(f"/resume/{rid}")).json()["content"] == "text [Improved]"
+    history = (await client.get(f"/resume/{rid}/history")).json()["items"]
+    assert [(h["version"], h["content"]) for h in history] == [(1, "text")]
+
+    assert (await client.get("/jobs/nope")).status_code == 404
+    assert (await client.post("/resume/999/improve?async=true")).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_duplicate_jobs_coalesce(client, runner, gated):
+    rid = (await client.post("/resume", json={"title": "A", "content": "text"})).json()["id"]
+
+    first = (await client.post(f"/resume/{rid}/improve?async=true")).json()
+    second = (await client.post(f"/resume/{rid}/improve?async=true")).json()
+    assert second["id"] == first["id"]
+
+    gated.gate.set()
+    await runner.join()
+    assert gated.calls == 1
+    assert (await client.get(f"/resume/{rid}")).json()["content"] == "TEXT"
+
+    # the next version gets a new job
+    third = (await client.post(f"/resume/{rid}/improve?async=true")).json()
+    assert third["id"] != first["id"] and third["base_version"] == 2
+    await runner.join()
+
+
+@pytest.mark.anyio
+async def test_job_result_not_applied_over_newer_write(client, runner, gated):
+    rid = (await client.post("/resume", json={"title": "A", "content": "text"})).json()["id"]
+    job = (await client.post(f"/resume/{rid}/improve?async=true")).json()
+    await asyncio.sleep(0)  # let the job start and block in the improver
+
+    await client.patch(f"/resume/{rid}", json={"title": "A", "content": "edited meanwhile"})
+    gated.gate.set()
+    await runner.join()
+
+    job = (await client.get(f"/jobs/{job['id']}")).json()
+    assert (job["status"], job["result_version"]) == ("conflict", None)
+    resume = await client.get(f"/resume/{rid}")
+    assert resume.json()["content"] == "edited meanwhile"
+    assert resume.headers["etag"] == f'"{rid}-2"'
+
+
+@pytest.mark.anyio
+async def test_failed_job_and_if_match(client, runner, monkeypatch):
+    class Broken:
+        async def improve(self, title, content):
+            raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(app.jobs, "improver", Broken())
+    rid = (await client.post("/resume", json={"title": "A", "content": "text"})).json()["id"]
+
+    r = await client.post(f"/resume/{rid}/improve?async=true", headers={"If-Match": f'"{rid}-7"'})
+    assert r.status_code == 412
+
+    job = (await client.post(f"/resume/{rid}/improve?async=true")).json()
+    await runner.join()
+    job = (await client.get(f"/jobs/{job['id']}")).json()
+    assert (job["status"], job["error"]) == ("failed", "model unavailable")
+    assert (await client.get(f"/resume/{rid}")).json()["content"] == "text"
+
+
+@pytest.mark.anyio
+async def test_job_status_changes_pin_reads_to_the_primary(client, runner, gated, monkeypatch):
+    rid = (await client.post("/resume", json={"title": "A", "content": "text"})).json()["id"]
+    marked = []
+    mark = recent_writes.mark
+
+    async def spy(user_id):
+        marked.append(user_id)
+        await mark(user_id)
+
+    monkeypatch.setattr(recent_writes, "mark", spy)
+    await client.post(f"/resume/{rid}/improve?async=true")
+    # the client follows Location right away: the queued job must be readable
+    assert marked and await recent_writes.contains(1)
+
+    gated.gate.set()
+    await runner.join()
+    assert marked == [1, 1, 1]  # queued, running, succeeded
+
+
+@pytest.mark.anyio
+async def test_runner_is_bounded():
+    runner = JobRunner(workers=1, queue_limit=1)
+    gate = asyncio.Event()
+    for _ in range(2):
+        runner.reserve()
+        runner.submit(gate.wait)
+    with pytest.raises(JobQueueFull):
+        runner.reserve()
+    await asyncio.sleep(0)
+    assert runner.stats()["in_flight"] == 1 and runner.stats()["queue_depth"] == 1
+
+    gate.set()
+    await runner.join()
+    assert runner.stats()["completed"] == 2 and runner.stats()["rejected"] == 1
+    await runner.shutdown()
@@ -0,0 +1,58 @@
+import json
+import logging
+import queue
+
+from app.logger import (
+    BoundedQueueHandler, JsonFormatter, SamplingFilter, SharedRotatingFileHandler, parse_sampling,
+)
+
+
+def _record(name="app.routers.resume_router.reads", level=logging.INFO, msg="List resumes: %s"):
+    return logging.LogRecord(name, level, __file__, 1, msg, ("x",), None)
+
+
+def test_sampling_filter_per_logger():
+    rates = parse_sampling("app.routers.resume_router.reads=0, app.noisy=1")
+    assert rates == {"app.routers.resume_router.reads": 0.0, "app.noisy": 1.0}
+    f = SamplingFilter(rates)
+
+    assert not f.filter(_record())
+    assert f.filter(_record(level=logging.WARNING))
+    assert f.filter(_record(name="app.routers.resume_router"))
+    assert f.filter(_record(name="app.noisy.child"))
+    assert f.sampled_out == 1
+
+
+def test_bounded_queue_handler_drops_when_full():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(_record())
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_json_formatter():
+    record = _record()
+    record.request_id = "abc"
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "List resumes: x"
+    assert payload["request_id"] == "abc"
+    assert payload["level"] == "INFO"
+
+
+def test_shared_rotation_between_handlers(tmp_path):
+    path = tmp_path / "app.log"
+    first = SharedRotatingFileHandler(path, maxBytes=200, backupCount=20, encoding="utf-8")
+    second = SharedRotatingFileHandler(path, maxBytes=200, backupCount=20, encoding="utf-8")
+    try:
+        for i in range(20):
+            (first if i % 2 else second).handle(_record(msg=f"line {i:02d} " + "x" * 20 + " %s"))
+    finally:
+        first.close()
+        second.close()
+
+    files = [p for p in tmp_path.glob("app.log*") if not p.name.endswith(".lock")]
+    lines = [line for p in files for line in p.read_text().splitlines()]
+    assert sorted(lines) == [f"line {i:02d} " + "x" * 20 + " x" for i in range(20)]
+    assert len(files) > 1
+    assert all(p.stat().st_size <= 200 for p in files)
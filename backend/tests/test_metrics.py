@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.metrics import MetricsMiddleware, TimedQueuePool, instrument_pool
+from tests.test_middleware import _make_app, _per_request_us
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint(client):
+    rid = (await client.post("/resume", json={"title": "A", "content": "x"})).json()["id"]
+    before = _value("http_request_duration_seconds_count", method="GET", route="/resume/{resume_id}", status="200")
+    await client.get(f"/resume/{rid}")
+    await client.get("/no/such/path")
+
+    r = await client.get("/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    assert _value(
+        "http_request_duration_seconds_count", method="GET", route="/resume/{resume_id}", status="200",
+    ) == before + 1
+    assert 'route="unmatched",status="404"' in r.text
+    for name in ("http_requests_in_progress", "log_queue_depth", "password_hash_queue_depth", "db_pool_checked_out"):
+        assert f"# TYPE {name}" in r.text
+
+
+@pytest.mark.anyio
+async def test_pool_wait_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=TimedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    instrument_pool(engine, "read")
+    waits = _value("db_pool_checkout_wait_seconds_count", engine="read")
+    timeouts = _value("db_pool_timeouts_total", engine="read")
+    primary_waits = _value("db_pool_checkout_wait_seconds_count", engine="primary")
+    try:
+        async with engine.connect():
+            assert _value("db_pool_checked_out", engine="read") == 1
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+        assert _value("db_pool_checked_out", engine="read") == 0
+    finally:
+        await engine.dispose()
+    assert _value("db_pool_checkout_wait_seconds_count", engine="read") == waits + 2
+    assert _value("db_pool_timeouts_total", engine="read") == timeouts + 1
+    assert _value("db_pool_checkout_wait_seconds_count", engine="primary") == primary_waits
+
+    # dispose() replaced the pool; it still reports as the read engine
+    async with engine.connect():
+        pass
+    await engine.dispose()
+    assert _value("db_pool_checkout_wait_seconds_count", engine="read") == waits + 3
+
+
+def test_multiprocess_aggregation(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": ROOT}
+    worker = textwrap.dedent("""
+        from app.metrics import http_request_duration, http_requests_in_progress
+        http_request_duration.labels("GET", "/resume", "200").observe(0.01)
+        http_requests_in_progress.labels("GET").inc()
+    """)
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True, cwd=ROOT)
+    scrape = "from app.metrics import render; print(render()[0].decode())"
+    out = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, cwd=ROOT,
+                         capture_output=True, text=True).stdout
+    assert 'http_request_duration_seconds_count{method="GET",route="/resume",status="200"} 2.0' in out
+
+
+@pytest.mark.anyio
+async def test_metrics_middleware_overhead():
+    n = 300
+    for app in (_make_app(), _make_app(MetricsMiddleware)):
+        await _per_request_us(app, 20)
+    bare = await _per_request_us(_make_app(), n)
+    metered = await _per_request_us(_make_app(MetricsMiddleware), n)
+    print(f"\nmetrics middleware: +{metered - bare:.1f}us per request (bare {bare:.1f}us)")
+    assert metered - bare < 100
@@ -0,0 +1,88 @@
+import logging
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.logger import request_id_var
+from app.middleware import LoggingMiddleware
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware-based implementation, kept for comparison."""
+
+    async def dispatch(self, request, call_next):
+        logging.getLogger("app").info("→ %s %s", request.method, request.url.path)
+        response = await call_next(request)
+        logging.getLogger("app").info("← %s %s %s", request.method, request.url.path, response.status_code)
+        return response
+
+
+async def _ok(request):
+    return PlainTextResponse(request_id_var.get())
+
+
+def _make_app(middleware=None):
+    app = Starlette(routes=[Route("/", _ok)])
+    if middleware:
+        app.add_middleware(middleware)
+    return app
+
+
+async def _call(app, headers=()):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "",
+        "query_string": b"", "headers": list(headers), "server": ("test", 80), "client": ("test", 1),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+async def _per_request_us(app, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        await _call(app)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+@pytest.mark.anyio
+async def test_request_id_is_propagated():
+    messages = await _call(_make_app(LoggingMiddleware), headers=[(b"x-request-id", b"abc123")])
+    start, body = messages[0], messages[1]
+    assert start["status"] == 200
+    assert (b"x-request-id", b"abc123") in start["headers"]
+    assert body["body"] == b"abc123"
+
+    messages = await _call(_make_app(LoggingMiddleware))
+    generated = dict(messages[0]["headers"])[b"x-request-id"]
+    assert len(generated) == 32
+    assert request_id_var.get() == "-"
+
+
+@pytest.mark.anyio
+async def test_middleware_overhead_benchmark(caplog):
+    caplog.set_level(logging.WARNING, logger="app")
+    n = 300
+    for app in (_make_app(), _make_app(LoggingMiddleware), _make_app(LegacyLoggingMiddleware)):
+        await _per_request_us(app, 20)  # warm up
+
+    bare = await _per_request_us(_make_app(), n)
+    asgi = await _per_request_us(_make_app(LoggingMiddleware), n)
+    legacy = await _per_request_us(_make_app(LegacyLoggingMiddleware), n)
+    print(
+        f"\nper-request: bare={bare:.1f}us pure-asgi=+{asgi - bare:.1f}us "
+        f"base-http-middleware=+{legacy - bare:.1f}us"
+    )
+    assert asgi < legacy
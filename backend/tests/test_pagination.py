@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.mark.anyio
+async def test_resume_list_cursor_pagination(client):
+    ids = []
+    for i in range(5):
+        r = await client.post("/resume", json={"title": f"CV {i}", "content": "text"})
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+
+    seen = []
+    r = await client.get("/resume?per_page=2&include_total=false")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["meta"]["total"] is None
+    seen += [x["id"] for x in data["items"]]
+    while data["meta"]["next_cursor"]:
+        r = await client.get(f"/resume?per_page=2&include_total=false&cursor={data['meta']['next_cursor']}")
+        assert r.status_code == 200
+        data = r.json()
+        seen += [x["id"] for x in data["items"]]
+    assert seen == sorted(ids, reverse=True)
+    assert data["meta"]["has_next"] is False
+
+    r = await client.get("/resume?page=2&per_page=2")
+    meta = r.json()["meta"]
+    assert meta["total"] == 5 and meta["total_pages"] == 3
+    assert meta["has_next"] and meta["has_prev"]
+
+    r = await client.get("/resume?cursor=garbage")
+    assert r.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_history_cursor_pagination(client):
+    r = await client.post("/resume", json={"title": "CV", "content": "v1"})
+    resume_id = r.json()["id"]
+    for i in range(4):
+        await client.patch(f"/resume/{resume_id}", json={"title": "CV", "content": f"v{i + 2}"})
+
+    r = await client.get(f"/resume/{resume_id}/history?per_page=3")
+    first = r.json()
+    assert [x["version"] for x in first["items"]] == [4, 3, 2]
+    assert first["meta"]["total"] == 4
+
+    r = await client.get(f"/resume/{resume_id}/history?per_page=3&cursor={first['meta']['next_cursor']}")
+    second = r.json()
+    assert [x["version"] for x in second["items"]] == [1]
+    assert second["meta"]["next_cursor"] is None
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import update
+
+from main import app
+from app.db.models import User
+from app.utils.auth import make_access_token
+from app.utils.current import get_user, get_principal, user_cache, token_cache, invalidate_user
+
+
+@pytest.fixture
+def real_auth():
+    app.dependency_overrides.pop(get_user, None)
+    app.dependency_overrides.pop(get_principal, None)
+
+
+@pytest.mark.anyio
+async def test_principal_is_cached(client, session, real_auth):
+    r = await client.post("/auth/register", json={"email": "cache@b.c", "password": "123456"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    r = await client.post("/resume", json={"title": "CV", "content": "text"}, headers=headers)
+    assert r.status_code == 201, r.text
+    r = await client.get("/resume", headers=headers)
+    assert r.json()["meta"]["total"] == 1
+    assert token_cache.hits >= 1
+
+    r = await client.get("/resume", headers={"Authorization": "Bearer nope"})
+    assert r.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_token_version_revocation(client, session, real_auth):
+    user = User(email="rev@b.c", password_hash="x")
+    session.add(user)
+    await session.flush()
+    token = make_access_token(user.email, user.id, user.token_version)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert await get_user(token, session) is not None
+    assert user.id in user_cache
+
+    await session.execute(update(User).where(User.id == user.id).values(token_version=2))
+    invalidate_user(user.id)
+
+    r = await client.get("/resume", headers=headers)
+    assert r.status_code == 401
+    with pytest.raises(Exception) as exc:
+        await get_user(token, session)
+    assert exc.value.status_code == 401
+    r = await client.get("/resume", headers=headers)
+    assert r.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_deleted_user_token_is_rejected(client, session, real_auth):
+    user = User(email="gone@b.c", password_hash="x")
+    session.add(user)
+    await session.flush()
+    headers = {"Authorization": f"Bearer {make_access_token(user.email, user.id, user.token_version)}"}
+    assert (await client.get("/resume", headers=headers)).status_code == 200
+
+    await session.delete(user)
+    await session.flush()
+    invalidate_user(user.id)
+    assert (await client.get("/resume", headers=headers)).status_code == 401
@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+from sqlalchemy import select
+
+import app.db.profiler as profiler
+from app.db.models import Resume
+from app.db.profiler import profile_queries, redact, statement_shape
+
+
+@pytest.mark.anyio
+async def test_endpoint_query_budget(client):
+    rid = (await client.post("/resume", json={"title": "A", "content": "v1"})).json()["id"]
+    for i in range(2, 5):
+        await client.patch(f"/resume/{rid}", json={"title": "A", "content": f"v{i}"})
+
+    with profile_queries() as prof:
+        r = await client.get(f"/resume/{rid}/history")
+    assert r.status_code == 200
+    assert prof.statements <= 4
+    assert prof.rows >= 3
+    assert not prof.repeated()
+
+    timing = r.headers["server-timing"]
+    assert timing.startswith("db;dur=") and f'"{prof.statements} queries' in timing
+
+    # served from the response cache: no statements beyond the principal lookup
+    with profile_queries() as cached:
+        await client.get(f"/resume/{rid}/history")
+    assert cached.statements <= 1
+
+
+@pytest.mark.anyio
+async def test_repeated_statements_are_flagged(client, session):
+    ids = [(await client.post("/resume", json={"title": f"r{i}", "content": "x"})).json()["id"] for i in range(6)]
+    with profile_queries() as prof:
+        for rid in ids:
+            await session.scalar(select(Resume.title).where(Resume.id == rid))
+        await session.scalar(select(Resume.id).where(Resume.id.in_(ids[:2])))
+        await session.scalar(select(Resume.id).where(Resume.id.in_(ids)))
+    repeated = prof.repeated(threshold=5)
+    assert list(repeated.values()) == [6]
+    assert len(prof.shapes) == 2  # IN lists of different length share a shape
+
+
+@pytest.mark.anyio
+async def test_slow_query_log_redacts_parameters(session, caplog, monkeypatch):
+    monkeypatch.setattr(profiler, "SQL_SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.db.profiler"):
+        await session.scalar(select(Resume.id).where(Resume.title == "secret@example.com"))
+    [message] = [r.getMessage() for r in caplog.records if r.name == "app.db.profiler"]
+    assert "Slow query" in message and "<str len=18>" in message
+    assert "secret" not in message
+
+
+def test_shape_and_redact():
+    assert statement_shape("SELECT 1\n  WHERE id IN ($1, $2, $3)") == statement_shape("SELECT 1 WHERE id IN ($7, $8)")
+    assert redact((1, "abc", None)) == "[<int>, <str len=3>, <NoneType>]"
+    assert redact([{"a": 1}, {"a": 2}]) == "[2 parameter sets]"
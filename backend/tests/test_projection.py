@@ -0,0 +1,50 @@
+import pytest
+
+from app.db.profiler import profile_queries
+
+
+@pytest.mark.anyio
+async def test_summary_view_never_selects_content(client):
+    body = "Python developer with ten years of experience. " * 200
+    for i in range(3):
+        await client.post("/resume", json={"title": f"Resume {i}", "content": body})
+
+    with profile_queries() as prof:
+        r = await client.get("/resume?view=summary&snippet_chars=16")
+    assert r.status_code == 200
+    items = r.json()["items"]
+    assert [set(item) for item in items] == [{"id", "title", "updated_at", "snippet"}] * 3
+    assert [item["title"] for item in items] == ["Resume 2", "Resume 1", "Resume 0"]
+    assert items[0]["snippet"] == "Python developer"
+    [listing] = [shape for shape in prof.shapes if "ORDER BY" in shape]
+    assert "resumes.content" not in listing.replace("substr(resumes.content", "")
+
+    full = await client.get("/resume")
+    assert full.json()["items"][0]["content"] == body
+    assert full.headers["etag"] != r.headers["etag"]
+
+
+@pytest.mark.anyio
+async def test_fields_projection(client):
+    await client.post("/resume", json={"title": "Backend engineer", "content": "Go, Python"})
+    await client.post("/resume", json={"title": "Designer", "content": "Figma"})
+
+    r = await client.get("/resume?fields=title,version")
+    assert r.json()["items"] == [
+        {"id": r.json()["items"][0]["id"], "title": "Designer", "version": 1},
+        {"id": r.json()["items"][1]["id"], "title": "Backend engineer", "version": 1},
+    ]
+    assert r.json()["meta"]["total"] == 2
+
+    r = await client.get("/resume?fields=title,snippet&q=backend")
+    [item] = r.json()["items"]
+    assert item["snippet"] == "<mark>Backend</mark> engineer"
+
+    # the highlight needs the title even when it isn't projected
+    r = await client.get("/resume?fields=id,snippet&q=backend")
+    assert r.status_code == 200
+    [item] = r.json()["items"]
+    assert set(item) == {"id", "snippet"} and item["snippet"] == "<mark>Backend</mark> engineer"
+
+    r = await client.get("/resume?fields=title,content")
+    assert r.status_code == 400 and "content" in r.json()["detail"]
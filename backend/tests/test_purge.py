@@ -0,0 +1,92 @@
+import json
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.counters import COUNTERS, reconcile_counters
+from app.db.importer import import_resumes
+from app.db.models import Resume, ResumeRevision
+from app.db.profiler import profile_queries
+from app.db.purge import purge_step
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def _lines(*records):
+    for record in records:
+        yield json.dumps(record).encode() + b"\n"
+
+
+async def _count(session, model, **where):
+    stmt = select(func.count()).select_from(model).filter_by(**where)
+    return await session.scalar(stmt)
+
+
+@pytest.mark.anyio
+async def test_deleted_resume_is_hidden_everywhere(client, session):
+    keep = (await client.post("/resume", json={"title": "Keep", "content": "k"})).json()["id"]
+    rid = (await client.post("/resume", json={"title": "Gone", "content": "v1"})).json()["id"]
+    await client.patch(f"/resume/{rid}", json={"title": "Gone", "content": "v2"})
+    etag = (await client.get(f"/resume/{rid}")).headers["etag"]
+
+    assert (await client.delete(f"/resume/{rid}")).status_code == 200
+    assert (await client.delete(f"/resume/{rid}")).status_code == 404
+    # a tombstone: the rows are still there until the purger runs
+    assert await _count(session, ResumeRevision, resume_id=rid) == 1
+
+    assert (await client.get(f"/resume/{rid}")).status_code == 404
+    assert (await client.get(f"/resume/{rid}/history")).status_code == 404
+    assert (await client.get(f"/resume/{rid}/history/1")).status_code == 404
+    assert (await client.patch(f"/resume/{rid}", json={"title": "T", "content": "x"})).status_code == 404
+    assert (await client.patch(f"/resume/{rid}", json={"title": "T", "content": "x"}, headers={"If-Match": etag})).status_code == 404
+    assert (await client.post(f"/resume/{rid}/improve")).status_code == 404
+    for op in ({"op": "update", "id": rid, "content": "x"}, {"op": "delete", "id": rid}):
+        r = await client.post("/resume/batch", json={"mode": "best_effort", "operations": [op]})
+        assert r.json()["results"][0]["status"] == 404
+    listing = (await client.get("/resume")).json()
+    assert [item["id"] for item in listing["items"]] == [keep] and listing["meta"]["total"] == 1
+    assert [item["id"] for item in (await client.get("/resume?q=gone")).json()["items"]] == []
+    exported = [json.loads(line) for line in (await client.get("/resume/export")).text.splitlines()]
+    assert {line.get("id") for line in exported if line["type"] == "resume"} == {keep}
+    for counter in COUNTERS:
+        assert (await reconcile_counters(session, counter))[1] == []
+
+
+@pytest.mark.anyio
+async def test_delete_is_constant_and_purged_in_batches(client, session):
+    factory = async_sessionmaker(bind=session.bind, expire_on_commit=False)
+    history = [f"version {i}" for i in range(10_000)]
+    await import_resumes(factory, 1, _lines({"title": "Big", "content": "now", "history": history}))
+    big = await session.scalar(select(Resume.id).where(Resume.title == "Big"))
+    small = (await client.post("/resume", json={"title": "Small", "content": "s"})).json()["id"]
+    keep = (await client.post("/resume", json={"title": "Keep", "content": "k"})).json()["id"]
+    await client.patch(f"/resume/{keep}", json={"title": "Keep", "content": "k2"})
+
+    timings = {}
+    for rid in (small, big):
+        with profile_queries() as prof:
+            started = time.perf_counter()
+            assert (await client.delete(f"/resume/{rid}")).status_code == 200
+            timings[rid] = time.perf_counter() - started
+        assert not any("resume_revisions" in shape for shape in prof.shapes)
+        timings[rid, "statements"] = prof.statements
+    print(f"\ndelete: 1 revision {timings[small] * 1000:.1f}ms, 10k revisions {timings[big] * 1000:.1f}ms")
+    assert timings[big, "statements"] == timings[small, "statements"]
+
+    purged = _value("purge_rows_total", table="resume_revisions")
+    steps = 0
+    while await purge_step(factory, batch_size=1000):
+        steps += 1
+    assert steps == 11  # 10 batches of revisions, the last also takes both resume rows
+    assert _value("purge_rows_total", table="resume_revisions") == purged + 10_000
+    assert _value("purge_backlog_resumes") == 0
+    assert _value("purge_batch_duration_seconds_count") >= steps
+
+    assert await _count(session, Resume) == 1
+    assert await _count(session, ResumeRevision) == 1
+    assert (await client.get(f"/resume/{keep}/history")).json()["meta"]["total"] == 1
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.response_cache import RedisBackend, ResponseCache, response_cache
+
+
+class LocalRedis:
+    """Stand-in for a redis.asyncio client: one dict shared by every "worker" that uses it."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        value, expires = self.data.get(key, (None, 0))
+        return value if expires > time.monotonic() else None
+
+    async def set(self, key, value, ex):
+        self.data[key] = (value, time.monotonic() + ex)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class DownRedis:
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    set = delete = get
+
+
+@pytest.mark.anyio
+async def test_reads_are_cached_and_writes_invalidate(client):
+    rid = (await client.post("/resume", json={"title": "A", "content": "v1"})).json()["id"]
+
+    first = await client.get(f"/resume/{rid}")
+    second = await client.get(f"/resume/{rid}")
+    assert second.json() == first.json() and second.headers["etag"] == first.headers["etag"]
+    assert (await client.get(f"/resume/{rid}", headers={"If-None-Match": first.headers["etag"]})).status_code == 304
+    await client.get("/resume")
+    await client.get("/resume")
+    stats = response_cache.stats()
+    assert (stats["misses"], stats["hits"]) == (2, 3)
+
+    await client.patch(f"/resume/{rid}", json={"title": "A", "content": "v2"})
+    r = await client.get(f"/resume/{rid}")
+    assert r.json()["content"] == "v2" and r.headers["etag"] == f'"{rid}-2"'
+    assert [x["content"] for x in (await client.get("/resume")).json()["items"]] == ["v2"]
+    assert [x["content"] for x in (await client.get(f"/resume/{rid}/history")).json()["items"]] == ["v1"]
+
+    await client.delete(f"/resume/{rid}")
+    assert (await client.get(f"/resume/{rid}")).status_code == 404
+    assert (await client.get("/resume")).json()["items"] == []
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_share_one_load():
+    cache = ResponseCache(RedisBackend(LocalRedis()), ttl=30)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"n": calls}
+
+    results = await asyncio.gather(*(cache.get_or_load("resume", 1, (7,), load) for _ in range(5)))
+    assert results == [{"n": 1}] * 5 and calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+    async def missing():
+        raise LookupError
+
+    with pytest.raises(LookupError):
+        await cache.get_or_load("resume", 1, (8,), missing)
+    assert await cache.get_or_load("resume", 1, (8,), load) == {"n": 2}
+
+
+@pytest.mark.anyio
+async def test_shared_backend_invalidation_reaches_other_workers():
+    shared = LocalRedis()
+    worker_a = ResponseCache(RedisBackend(shared), ttl=30)
+    worker_b = ResponseCache(RedisBackend(shared), ttl=30)
+    state = {"title": "old"}
+
+    async def load():
+        return dict(state)
+
+    assert await worker_a.get_or_load("resume", 1, (1,), load) == {"title": "old"}
+    assert await worker_b.get_or_load("resume", 1, (1,), load) == {"title": "old"}
+    assert worker_b.stats()["hits"] == 1
+
+    state["title"] = "new"
+    await worker_a.invalidate_user(1)
+    assert await worker_b.get_or_load("resume", 1, (1,), load) == {"title": "new"}
+    # other users keep their entries
+    assert await worker_b.get_or_load("resume", 2, (1,), load) == {"title": "new"}
+    state["title"] = "newer"
+    assert await worker_a.get_or_load("resume", 2, (1,), load) == {"title": "new"}
+
+
+@pytest.mark.anyio
+async def test_unavailable_backend_reads_through():
+    cache = ResponseCache(RedisBackend(DownRedis()), ttl=30)
+
+    async def load():
+        return {"ok": True}
+
+    assert await cache.get_or_load("resume", 1, (1,), load) == {"ok": True}
+    await cache.invalidate_user(1)
+    assert cache.stats()["errors"] == 2
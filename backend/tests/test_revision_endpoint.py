@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import update
+
+from app.db.models import ResumeRevision
+from app.db.profiler import profile_queries
+from app.db.revisions import compact_revisions, revision_body_cache, revision_cache
+
+
+async def _resume_with_history(client, versions: int) -> int:
+    rid = (await client.post("/resume", json={"title": "CV", "content": "v1 ü"})).json()["id"]
+    for i in range(2, versions + 1):
+        await client.patch(f"/resume/{rid}", json={"title": "CV", "content": f"v{i} " + "x" * i})
+    return rid
+
+
+@pytest.mark.anyio
+async def test_single_revision_is_immutable_and_cached(client):
+    rid = await _resume_with_history(client, 4)
+    history = (await client.get(f"/resume/{rid}/history")).json()["items"]
+
+    r = await client.get(f"/resume/{rid}/history/1")
+    assert r.status_code == 200
+    assert r.json() == history[-1] and r.json()["content"] == "v1 ü"
+    assert r.headers["cache-control"] == "private, max-age=31536000, immutable"
+    assert r.headers["etag"] == f'"{rid}-1-rev"'
+    assert (rid, 1) in revision_body_cache
+
+    with profile_queries() as prof:
+        again = await client.get(f"/resume/{rid}/history/1")
+        not_modified = await client.get(f"/resume/{rid}/history/1", headers={"If-None-Match": r.headers["etag"]})
+    assert again.content == r.content
+    assert not_modified.status_code == 304 and not_modified.headers["cache-control"] == r.headers["cache-control"]
+    # ownership probes only: no content leaves the database
+    assert sum(n for shape, n in prof.shapes.items() if "resume_revisions" in shape) == 2
+    assert not any("resume_revisions.content" in shape for shape in prof.shapes)
+
+    assert (await client.get(f"/resume/{rid}/history/4")).status_code == 404
+    assert (await client.get(f"/resume/{rid}/history/9", headers={"If-None-Match": "*"})).status_code == 404
+
+    await client.delete(f"/resume/{rid}")
+    assert (await client.get(f"/resume/{rid}/history/1")).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_history_metadata_view(client, session):
+    rid = await _resume_with_history(client, 5)
+    full = await client.get(f"/resume/{rid}/history?per_page=3")
+
+    r = await client.get(f"/resume/{rid}/history?per_page=3&view=meta")
+    assert r.status_code == 200 and r.headers["etag"] != full.headers["etag"]
+    items = r.json()["items"]
+    assert [set(item) for item in items] == [{"id", "resume_id", "version", "created_at", "size"}] * 3
+    assert [(i["version"], i["size"]) for i in items] == [(v, len(x["content"])) for v, x in
+                                                          zip((4, 3, 2), full.json()["items"])]
+    assert r.json()["meta"] == full.json()["meta"]
+
+    # rows compacted before content_length existed are decoded for their size
+    await compact_revisions(session)
+    await session.execute(update(ResumeRevision).values(content_length=None))
+    revision_cache.clear()
+    r = await client.get(f"/resume/{rid}/history?per_page=10&view=meta&include_total=false")
+    assert [i["size"] for i in r.json()["items"]] == [7, 6, 5, 4]
@@ -0,0 +1,140 @@
+import random
+import time
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.models import Resume, ResumeRevision
+from app.db.purge import maintenance_step
+from app.db.revisions import (
+    DELTA, FULL, PLAIN, compact_revisions, encode, decode, make_revision, materialize, revision_cache,
+    stored_size,
+)
+
+
+def _edit(text, rng):
+    words = text.split(" ")
+    words[rng.randrange(len(words))] = f"edit{rng.randrange(1000)}"
+    return " ".join(words)
+
+
+def test_encode_roundtrip():
+    base = "Python developer. " * 50
+    storage, payload = encode(base)
+    assert storage == FULL and decode(storage, payload, None) == base
+
+    changed = base.replace("developer", "engineer", 1)
+    storage, payload = encode(changed, base)
+    assert storage == DELTA and len(payload) < 40
+    assert decode(storage, payload, None, base) == changed
+
+
+@pytest.mark.anyio
+async def test_history_is_reconstructed(client, session):
+    r = await client.post("/resume", json={"title": "CV", "content": "v1 " * 100})
+    resume_id = r.json()["id"]
+    for i in range(2, 15):
+        await client.patch(f"/resume/{resume_id}", json={"title": "CV", "content": f"v{i} " * 100})
+
+    stmt = select(ResumeRevision).where(ResumeRevision.resume_id == resume_id).order_by(ResumeRevision.version)
+    rows = (await session.execute(stmt)).scalars().all()
+    assert {r.storage for r in rows} == {PLAIN}
+
+    converted, _ = await compact_revisions(session)
+    assert converted == 13
+    assert [r.storage for r in rows[:3]] == [FULL, DELTA, DELTA]
+    assert rows[10].storage == FULL and rows[10].version == 11
+    assert all(r.content is None for r in rows)
+
+    revision_cache.clear()
+    r = await client.get(f"/resume/{resume_id}/history?per_page=20")
+    items = r.json()["items"]
+    assert [x["version"] for x in items] == list(range(13, 0, -1))
+    assert all(x["content"] == f"v{x['version']} " * 100 for x in items)
+
+
+@pytest.mark.anyio
+async def test_compact_plain_rows(session):
+    resume = Resume(title="CV", content="latest", user_id=1)
+    session.add(resume)
+    await session.flush()
+    texts = [f"revision {v} " + "body " * 40 for v in range(1, 13)]
+    session.add_all(ResumeRevision(resume_id=resume.id, version=v, content=t) for v, t in enumerate(texts, 1))
+    await session.flush()
+
+    cursor, converted_total = (0, 0), 0
+    while True:
+        converted, cursor = await compact_revisions(session, batch_size=5, after=cursor)
+        if not converted:
+            break
+        converted_total += converted
+    assert converted_total == 12
+
+    revision_cache.clear()
+    rows = (await session.execute(
+        select(ResumeRevision).where(ResumeRevision.resume_id == resume.id).order_by(ResumeRevision.version)
+    )).scalars().all()
+    assert PLAIN not in {r.storage for r in rows}
+    contents = await materialize(session, rows)
+    assert [contents[(resume.id, v)] for v in range(1, 13)] == texts
+
+
+@pytest.mark.anyio
+async def test_revision_storage_benchmark(session):
+    rng = random.Random(7)
+    resume = Resume(title="CV", content="", user_id=1)
+    session.add(resume)
+    await session.flush()
+
+    text = " ".join(f"word{rng.randrange(5000)}" for _ in range(800))
+    raw_bytes = encoded_bytes = 0
+    started = time.perf_counter()
+    for version in range(1, 501):
+        rev = await make_revision(session, resume.id, version, text)
+        session.add(rev)
+        raw_bytes += len(text.encode())
+        encoded_bytes += stored_size(rev)
+        text = _edit(text, rng)
+    await session.flush()
+    write_ms = (time.perf_counter() - started) * 1000
+
+    revision_cache.clear()
+    rows = (await session.execute(
+        select(ResumeRevision).where(ResumeRevision.resume_id == resume.id)
+    )).scalars().all()
+    started = time.perf_counter()
+    await materialize(session, rows)
+    read_ms = (time.perf_counter() - started) * 1000
+
+    ratio = encoded_bytes / raw_bytes
+    print(
+        f"\n500 revisions: raw={raw_bytes / 1024:.0f}KiB stored={encoded_bytes / 1024:.0f}KiB "
+        f"ratio={ratio:.3f} encode+insert={write_ms:.0f}ms materialize-all(cold)={read_ms:.0f}ms"
+    )
+    assert ratio < 0.2
+
+
+@pytest.mark.anyio
+async def test_api_revisions_are_compacted_in_the_background(client, session):
+    rid = (await client.post("/resume", json={"title": "CV", "content": "v1 " * 100})).json()["id"]
+    for i in range(2, 13):
+        await client.patch(f"/resume/{rid}", json={"title": "CV", "content": f"v{i} " * 100})
+    await client.post(f"/resume/{rid}/improve")
+    before = (await client.get(f"/resume/{rid}/history", params={"per_page": 100})).json()["items"]
+
+    factory = async_sessionmaker(bind=session.bind, expire_on_commit=False)
+    assert await maintenance_step(factory, batch_size=5) == 5
+    while await maintenance_step(factory, batch_size=5):
+        pass
+
+    rows = (await session.execute(
+        select(ResumeRevision).where(ResumeRevision.resume_id == rid).order_by(ResumeRevision.version)
+    )).scalars().all()
+    assert len(rows) == 12
+    assert {r.storage for r in rows} == {FULL, DELTA}
+    assert all(r.content is None for r in rows)
+    revision_cache.clear()
+    contents = await materialize(session, rows)
+    assert [contents[(rid, v)] for v in range(1, 13)] == [f"v{v} " * 100 for v in range(1, 13)]
+    assert (await client.get(f"/resume/{rid}/history", params={"per_page": 100})).json()["items"] == before
@@ -0,0 +1,138 @@
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from main import app
+from app.config import READ_STATEMENT_TIMEOUT_MS
+from app.db.connect import ReadSessionLocal, create_read_engine
+from app.db.deps import get_session_factory
+from app.db.models import Resume, User
+from app.db.routing import RecentWrites, check_shared_state, get_read_session, recent_writes
+from app.utils.current import Principal, get_principal
+from app.utils.response_cache import MemoryBackend, RedisBackend, response_cache
+from tests.test_response_cache import LocalRedis
+
+
+class FakeSession:
+    def __init__(self, name, log):
+        self.name, self.log = name, log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def rollback(self):
+        self.log.append(f"{self.name}:rollback")
+
+    async def commit(self):  # pragma: no cover - must not be called
+        self.log.append(f"{self.name}:commit")
+
+
+async def _route(user_id, log):
+    gen = get_read_session(
+        Principal(id=user_id, email="u@x.y", token_version=1),
+        lambda: FakeSession("replica", log),
+        lambda: FakeSession("primary", log),
+    )
+    session = await gen.__anext__()
+    with pytest.raises(StopAsyncIteration):
+        await gen.__anext__()
+    return session.name
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_replica_unless_user_wrote_recently():
+    log = []
+    assert await _route(1, log) == "replica"
+    await recent_writes.mark(1)
+    assert await _route(1, log) == "primary"
+    assert await _route(2, log) == "replica"
+    assert log == ["replica:rollback", "primary:rollback", "replica:rollback"]
+
+
+@pytest.mark.anyio
+async def test_write_pins_user_to_primary(client):
+    assert not await recent_writes.contains(1)
+    await client.post("/resume", json={"title": "A", "content": "x"})
+    assert await recent_writes.contains(1)
+
+
+@pytest.mark.anyio
+async def test_recent_writes_window_is_shared_between_workers():
+    shared = LocalRedis()
+    worker_a = RecentWrites(5, RedisBackend(shared))
+    worker_b = RecentWrites(5, RedisBackend(shared))
+    await worker_a.mark(7)
+    assert await worker_b.contains(7)
+    assert not await worker_b.contains(8)
+
+    expired = RecentWrites(0.0)
+    await expired.mark(7)
+    assert not await expired.contains(7)
+
+
+def test_workers_refuse_per_process_state(monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend(10))
+    check_shared_state(workers=1, replica="replica")
+    with pytest.raises(RuntimeError, match="memory"):
+        check_shared_state(workers=4, replica="")
+
+    monkeypatch.setattr(response_cache, "backend", None)
+    check_shared_state(workers=4, replica="")
+    monkeypatch.setattr(recent_writes, "shared", None)
+    with pytest.raises(RuntimeError, match="DB_REPLICA_HOST"):
+        check_shared_state(workers=4, replica="replica")
+    monkeypatch.setattr(recent_writes, "shared", RedisBackend(LocalRedis()))
+    check_shared_state(workers=4, replica="replica")
+
+
+@pytest.fixture
+async def read_sessions(pg_engine):
+    """ReadSessionLocal bound to a read engine on the test database, as init_engines binds it."""
+    read_engine = create_read_engine(pg_engine.url.render_as_string(hide_password=False))
+    ReadSessionLocal.configure(bind=read_engine)
+    try:
+        yield read_engine
+    finally:
+        ReadSessionLocal.configure(bind=None)
+        await read_engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_reads_run_on_read_only_connections(client, pg_engine, read_sessions, monkeypatch):
+    primary = async_sessionmaker(bind=pg_engine, expire_on_commit=False)
+    async with primary() as db:
+        user = User(email="reader@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        resume = Resume(title="CV", content="text", user_id=user.id)
+        db.add(resume)
+        await db.commit()
+
+    monkeypatch.setattr(response_cache, "backend", None)
+    statements, primary_statements = [], []
+    event.listen(read_sessions.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    event.listen(pg_engine.sync_engine, "before_cursor_execute", lambda *args: primary_statements.append(args[2]))
+    del app.dependency_overrides[get_read_session]
+    app.dependency_overrides[get_session_factory] = lambda: primary
+    app.dependency_overrides[get_principal] = lambda: Principal(user.id, user.email, user.token_version)
+
+    r = await client.get(f"/resume/{resume.id}")
+    assert r.status_code == 200 and r.json()["content"] == "text"
+    assert any("FROM resumes" in s for s in statements)
+    assert not primary_statements
+
+    # a recent writer is served by the primary instead
+    statements.clear()
+    await recent_writes.mark(user.id)
+    assert (await client.get(f"/resume/{resume.id}")).status_code == 200
+    assert not statements and any("FROM resumes" in s for s in primary_statements)
+
+    async with ReadSessionLocal() as db:
+        timeout = await db.scalar(text("SELECT setting FROM pg_settings WHERE name = 'statement_timeout'"))
+        assert int(timeout) == READ_STATEMENT_TIMEOUT_MS
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            await db.execute(insert(Resume).values(title="x", content="x", user_id=user.id))
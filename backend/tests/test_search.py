@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import func, literal, select
+
+from app.db.search import HEADLINE_OPTIONS, TS_CONFIG, highlight, html_escape
+
+
+@pytest.mark.anyio
+async def test_search_modes(client):
+    await client.post("/resume", json={"title": "Senior Python developer", "content": "Django, FastAPI"})
+    await client.post("/resume", json={"title": "Python", "content": "asyncio"})
+    await client.post("/resume", json={"title": "Go engineer", "content": "Loves python tooling"})
+    await client.post("/resume", json={"title": "100% remote", "content": "anything"})
+
+    r = await client.get("/resume?q=python")
+    assert r.status_code == 200
+    items = r.json()["items"]
+    assert [x["title"] for x in items] == ["Python", "Senior Python developer"]
+    assert items[0]["snippet"] == "<mark>Python</mark>"
+
+    r = await client.get("/resume?q=python&mode=fts")
+    data = r.json()
+    assert data["meta"]["total"] == 3
+    go = next(x for x in data["items"] if x["title"] == "Go engineer")
+    assert "<mark>python</mark>" in go["snippet"]
+
+    r = await client.get("/resume?q=%25")
+    assert [x["title"] for x in r.json()["items"]] == ["100% remote"]
+
+    r = await client.get("/resume?q=python&mode=regex")
+    assert r.status_code == 422
+
+    r = await client.get("/resume?q=python&cursor=abc")
+    assert r.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_snippets_escape_user_markup(client):
+    await client.post("/resume", json={"title": "<img src=x onerror=alert(1)> Python", "content": "a < b & c"})
+
+    item = (await client.get("/resume?q=python")).json()["items"][0]
+    assert item["snippet"] == "&lt;img src=x onerror=alert(1)&gt; <mark>Python</mark>"
+    item = (await client.get("/resume?q=b %26 c&mode=fts")).json()["items"][0]
+    assert item["snippet"] == "a &lt; <mark>b &amp; c</mark>"
+    item = (await client.get("/resume?fields=snippet")).json()["items"][0]
+    assert item["snippet"] == "a &lt; b &amp; c"
+
+    assert highlight("<b>x</b>", "<b>") == "<mark>&lt;b&gt;</mark>x&lt;/b&gt;"
+
+
+@pytest.mark.anyio
+async def test_fts_headline_escapes_content(pg_engine):
+    doc = "<script>alert('python')</script> Tom & Jerry python"
+    stmt = select(func.ts_headline(
+        TS_CONFIG, html_escape(literal(doc)), func.websearch_to_tsquery(TS_CONFIG, "python"), HEADLINE_OPTIONS,
+    ))
+    async with pg_engine.connect() as conn:
+        snippet = await conn.scalar(stmt)
+    assert "<mark>python</mark>" in snippet and "Tom &amp; Jerry" in snippet
+    text = snippet.replace("<mark>", "").replace("</mark>", "")
+    assert "<" not in text and ">" not in text and "&lt;/script&gt;" in text
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from main import app
+from app.db.deps import get_session
+from app.db.models import Resume, ResumeRevision, User
+from app.utils.current import Principal, get_principal
+
+
+@pytest.fixture
+def statements(engine):
+    seen = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+
+@pytest.mark.anyio
+async def test_update_and_improve_snapshot(client, session, statements):
+    r = await client.post("/resume", json={"title": "CV", "content": "first"})
+    resume_id = r.json()["id"]
+
+    statements.clear()
+    r = await client.patch(f"/resume/{resume_id}", json={"title": "CV 2", "content": "second"})
+    assert r.status_code == 200
+    assert r.json() == {"id": resume_id, "title": "CV 2", "content": "second"}
+    writes = [s for s in statements if not s.startswith("SELECT users")]
+    assert len(writes) <= 2  # one statement on PostgreSQL, INSERT + UPDATE on SQLite
+
+    r = await client.post(f"/resume/{resume_id}/improve")
+    assert r.json()["content"] == "second [Improved]"
+
+    resume = await session.get(Resume, resume_id)
+    await session.refresh(resume)
+    assert resume.version == 3
+    revs = (await session.execute(
+        select(ResumeRevision.version, ResumeRevision.content)
+        .where(ResumeRevision.resume_id == resume_id)
+        .order_by(ResumeRevision.version)
+    )).all()
+    assert [tuple(x) for x in revs] == [(1, "first"), (2, "second")]
+
+    r = await client.patch("/resume/999", json={"title": "x", "content": "y"})
+    assert r.status_code == 404
+    r = await client.post("/resume/999/improve")
+    assert r.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_concurrent_patches_of_one_resume_both_apply(client, pg_engine):
+    factory = async_sessionmaker(bind=pg_engine, expire_on_commit=False)
+    async with factory() as db:
+        user = User(email="pg@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        resume = Resume(title="CV", content="v1", user_id=user.id)
+        db.add(resume)
+        await db.commit()
+
+    async def pg_session():
+        async with factory() as s:
+            try:
+                yield s
+                await s.commit()
+            except BaseException:
+                await s.rollback()
+                raise
+
+    app.dependency_overrides[get_session] = pg_session
+    app.dependency_overrides[get_principal] = lambda: Principal(user.id, user.email, user.token_version)
+
+    # both statements start while the row is locked, so both run from the snapshot at version 1
+    async with factory() as locker:
+        await locker.execute(select(Resume.id).where(Resume.id == resume.id).with_for_update())
+        patches = [
+            asyncio.create_task(client.patch(f"/resume/{resume.id}", json={"title": "CV", "content": f"edit {n}"}))
+            for n in (1, 2)
+        ]
+        await asyncio.sleep(0.2)
+        assert not any(p.done() for p in patches)
+        await locker.commit()
+    responses = await asyncio.gather(*patches)
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert sorted(r.headers["etag"] for r in responses) == [f'"{resume.id}-2"', f'"{resume.id}-3"']
+    first = min(responses, key=lambda r: r.headers["etag"]).json()["content"]
+    async with factory() as db:
+        revisions = (await db.execute(
+            select(ResumeRevision.version, ResumeRevision.content).order_by(ResumeRevision.version)
+        )).all()
+        assert [tuple(r) for r in revisions] == [(1, "v1"), (2, first)]
+        assert (await db.get(Resume, resume.id)).version == 3
@@ -81,7 +81,8 @@ export default function ResumeView() {
 
   function goHistoryPage(to: number) {
     if (!history) return;
-    const p = Math.max(1, Math.min(to, history.meta.total_pages || 1));
+    const last = history.meta.total_pages;
+    const p = Math.max(1, last ? Math.min(to, last) : to);
     loadHistory(p, history.meta.per_page);
   }
 
@@ -166,7 +167,7 @@ export default function ResumeView() {
             <h3 className="text-lg font-semibold">История изменений</h3>
             {history?.meta && (
               <div className="text-sm text-gray-600">
-                Всего: {history.meta.total} • Стр. {history.meta.page} из {history.meta.total_pages}
+                Всего: {history.meta.total ?? "—"} • Стр. {history.meta.page} из {history.meta.total_pages ?? "—"}
               </div>
             )}
           </div>
@@ -208,7 +209,7 @@ export default function ResumeView() {
                 <div className="text-gray-600">Пока нет ревизий.</div>
               )}
 
-              {history && history.meta.total_pages > 1 && (
+              {history && (history.meta.has_next || history.meta.has_prev) && (
                 <div className="flex items-center justify-between mt-4">
                   <button
                     onClick={() => goHistoryPage((history.meta.page ?? 1) - 1)}
@@ -220,7 +221,7 @@ export default function ResumeView() {
                     ← Назад
                   </button>
                   <div className="text-sm text-gray-600">
-                    Стр. {history.meta.page} / {history.meta.total_pages}
+                    Стр. {history.meta.page} / {history.meta.total_pages ?? "—"}
                   </div>
                   <button
                     onClick={() => goHistoryPage((history.meta.page ?? 1) + 1)}
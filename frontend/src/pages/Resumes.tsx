@@ -94,7 +94,7 @@ export default function Resumes() {
               ← Назад
             </button>
             <div className="text-sm text-gray-700">
-              {meta ? `${meta.page} / ${meta.total_pages}` : "— / —"}
+              {meta ? `${meta.page} / ${meta.total_pages ?? "—"}` : "— / —"}
             </div>
             <button
               onClick={() => setPage((p) => (meta?.has_next ? p + 1 : p))}
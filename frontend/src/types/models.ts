@@ -4,6 +4,7 @@ export interface Resume {
   id: number;
   title: string;
   content: string;
+  snippet?: string | null;
   created_at?: string;
   updated_at?: string;
 }
@@ -26,10 +27,12 @@ export interface TokenResponse {
 export interface PageMeta {
   page: number;
   per_page: number;
-  total: number;
-  total_pages: number;
+  // null when the page was requested with include_total=false
+  total?: number | null;
+  total_pages?: number | null;
   has_next: boolean;
   has_prev: boolean;
+  next_cursor?: string | null;
 }
 export interface ResumeRevision {
   id: number;
@@ -46,4 +49,15 @@ export interface ResumePage {
 export interface ResumeRevisionPage {
   items: ResumeRevision[];
   meta: PageMeta;
-}
\ No newline at end of file
+}
+export interface ResumeRevisionMeta {
+  id: number;
+  resume_id: number;
+  version: number;
+  created_at: string;
+  size: number;
+}
+export interface ResumeRevisionMetaPage {
+  items: ResumeRevisionMeta[];
+  meta: PageMeta;
+}